@@ -1,235 +1,478 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Wed Apr 23 19:08:42 2025
-
-@author: Damian
-"""
-
-import openvsp as vsp
-import numpy as np
-import os
-import time
-import Organizador as org
-import test1 as t1
-import minimo as min
-
-
-inicio = time.perf_counter()
-
-print("Beginning CP analysis with parametric wing")
-
-# Cargar las configuraciones desde el archivo .npy
-try:
-    configurations = np.load('wing_configurations.npy')
-    print(f"✅ Loaded {len(configurations)} configurations from wing_configurations.npy")
-    print("Column order: [Wing Area, Aspect Ratio, Taper Ratio, Sweep Angle, Flight Speed, Air Density]")
-except FileNotFoundError:
-    print("❌ Error: wing_configurations.npy not found. Please generate it first.")
-    print("Run the configuration generator script before this one.")
-    exit(1)
-
-
-
-def process_configuration(config_idx, config):
-    """
-    Process a single configuration and save results
-    """
-    # Extraer parámetros de la configuración actual
-    wing_area = config[0]
-    aspect_ratio = config[1]
-    taper_ratio = config[2]
-    sweep_angle = config[3]
-    flight_speed = config[6]
-    air_density = config[7]
-    
-    print(f"\n{'='*50}")
-    print(f"Processing configuration #{config_idx}")
-    print(f"{'='*50}")
-    print(f"Wing Area: {wing_area:.2f} m² | AR: {aspect_ratio:.2f} | Taper: {taper_ratio:.2f}")
-    print(f"Sweep: {sweep_angle:.2f}° | Speed: {flight_speed:.2f} m/s | Density: {air_density:.3f} kg/m³")
-    
-    # ====== Derived Calculations ======
-    span = (aspect_ratio * wing_area)**0.5  # Wingspan [m]
-    tip_chord = 2 * wing_area / (span * (1 + taper_ratio))  # Root chord [m]
-    root_chord = tip_chord * taper_ratio    # Tip chord [m]
-    
-    # ====== Panel Resolution Control ======
-    chordwise_panels = 20   # Number of panels along chord (NSlices)
-    spanwise_panels = 15    # Number of panels along span (NCircSlices)
-
-    print("\n--> Generating Wing Geometry")
-    print(f"Span: {span:.2f} m | Root Chord: {root_chord:.2f} m | Tip Chord: {tip_chord:.2f} m")
-    print(f"Panel Resolution: {chordwise_panels} chordwise, {spanwise_panels} spanwise")
-
-    # ====== Create Geometry ======
-    vsp.ClearVSPModel()  # Ensure clean slate
-    wing_id = vsp.AddGeom("WING")
-
-    # FIRST Set fundamental parameters before updating
-    vsp.SetParmVal(wing_id, "XSec_Num", "XSec_1", 2)  # Only root and tip sections
-    vsp.SetParmVal(wing_id, "TotalArea", "WingGeom", float(wing_area))
-    vsp.SetParmVal(wing_id, "Aspect", "XSec_1", float(aspect_ratio/2))
-    vsp.SetParmVal(wing_id, "Taper", "XSec_1", float(taper_ratio)**-1)
-    vsp.SetParmVal(wing_id, "Sweep", "XSec_1", float(sweep_angle))
-    vsp.SetParmVal(wing_id, "Sweep_Location", "XSec_1", float(0))  # 0.0 = LE sweep
-    vsp.SetParmVal(wing_id, "X_Rel_Location", "XForm", 0.0)
-
-    # Explicitly set root and tip chords
-    vsp.SetParmVal(wing_id, "Root_Chord", "XSec_1", float(root_chord))
-    vsp.SetParmVal(wing_id, "Tip_Chord", "XSec_2", float(tip_chord))
-    vsp.SetParmVal(wing_id, "Span", "XSec_1", span/2)  # Half span for each side
-    
-    
-    vsp.SetParmVal(wing_id, "ThickChord", "XSecCurve_0", float(0.12))
-    vsp.SetParmVal(wing_id, "Camber", "XSecCurve_0", float(0.02))
-    vsp.SetParmVal(wing_id, "CamberLoc", "XSecCurve_0", float(0.4))
-    vsp.SetParmVal(wing_id, "ThickChord", "XSecCurve_1", float(0.12))
-    vsp.SetParmVal(wing_id, "Camber", "XSecCurve_1", float(0.02))
-    vsp.SetParmVal(wing_id, "CamberLoc", "XSecCurve_1", float(0.4))
-
-    # Set panel resolution
-    vsp.SetParmVal(wing_id, "SectTess_U", "XSec_1", spanwise_panels)
-    vsp.SetParmVal(wing_id, "InCluster", "XSec_1", float(0.9))
-    vsp.SetParmVal(wing_id, "OutCluster", "XSec_1", float(0.4))
-    
-    vsp.SetParmVal(wing_id, "NSlices", "XSec_1", chordwise_panels)
-    
-
-    vsp.Update()
-
-    # ====== Verification ======
-    actual_AR = vsp.GetParmVal(wing_id, "TotalAR", "WingGeom")
-    actual_taper = vsp.GetParmVal(wing_id, "Taper", "WingGeom")
-    actual_sweep = vsp.GetParmVal(wing_id, "Sweep", "WingGeom")
-
-    print("\n--> Verification")
-    print(f"Specified AR: {aspect_ratio:.2f} | Actual AR: {actual_AR:.2f}")
-    print(f"Specified Taper: {taper_ratio:.2f} | Actual Taper: {actual_taper:.2f}")
-    print(f"Specified Sweep: {sweep_angle:.2f} | Actual Sweep: {actual_sweep:.2f}")
-
-    # ====== Save Model ======
-    fname = f"drone_{config_idx}.vsp3"
-    print(f"\n--> Saving Vehicle File: {fname}")
-    vsp.WriteVSPFile(fname)
-    print("COMPLETE")
-
-    # ====== VSPAERO Analysis ======
-    print("\n--> Computing Geometry")
-    vsp.SetAnalysisInputDefaults("VSPAEROComputeGeometry")
-    vsp.SetIntAnalysisInput("VSPAEROComputeGeometry", "AnalysisMethod", [vsp.VORTEX_LATTICE])
-    vsp.ExecAnalysis("VSPAEROComputeGeometry")
-
-    print("\n--> Computing VSPAERO Sweep")
-    vsp.SetAnalysisInputDefaults("VSPAEROSweep")
-    vsp.SetIntAnalysisInput("VSPAEROSweep", "AnalysisMethod", [vsp.VORTEX_LATTICE])
-    vsp.SetDoubleAnalysisInput("VSPAEROSweep", "AlphaStart", [2.0], 0)
-    vsp.SetDoubleAnalysisInput("VSPAEROSweep", "AlphaEnd", [2.0], 0)
-    vsp.SetIntAnalysisInput("VSPAEROSweep", "AlphaNpts", [1])
-    
-    # Convert speed to Mach
-    speed_of_sound = 343.0  # m/s at sea level
-    mach_number = flight_speed / speed_of_sound
-    vsp.SetDoubleAnalysisInput("VSPAEROSweep", "MachStart", [mach_number], 0)
-    
-    rid = vsp.ExecAnalysis("VSPAEROSweep") #aqui se crea el drone_0_DegenGeom.slc
-    vsp.PrintResults(rid)
-
-    print("\n--> Generating Cp Slices")
-    vsp.SetAnalysisInputDefaults("CpSlicer")
-    first_cut = span * 0.0
-    last_cut = span * 0.5
-    number_cut = 20  # Número total de cortes deseado
-    
-    # Calculamos el paso correcto
-    step_cut = (last_cut - first_cut) / (number_cut - 1)
-    ycuts = [first_cut + i * step_cut for i in range(number_cut)]
-    
-    # Configuramos los parámetros
-    vsp.SetIntAnalysisInput("CpSlicer", "AnalysisMethod", [vsp.VORTEX_LATTICE])
-    vsp.SetDoubleAnalysisInput("CpSlicer", "YSlicePosVec", ycuts)
-    vsp.ExecAnalysis("CpSlicer") #aqui en el drone_0_DegenGeom.slc se aumentan todos los slices 
-    
-    # Renombrar el archivo .slc generado
-    output_slicefile = f"drone_{config_idx}_DegenGeom.slc"
-    if os.path.exists(output_slicefile):
-        new_filename = f"{config_idx}.slc"
-        os.rename(output_slicefile, new_filename)
-        print(f"\n✅ Saved Cp slice results as: {new_filename}")
-    else:
-        print(f"\n❌ Error: {output_slicefile} not generated for configuration {config_idx}")
-    
-    # Limpiar resultados intermedios
-    try:
-        os.remove("VSPAERO_run.ada")
-        os.remove("VSPAERO_run.fmt")
-        os.remove("VSPAERO_run.key")
-        os.remove("VSPAERO_run.res")
-        os.remove("VSPAERO_run.vspgeom")
-    except:
-        pass
-    
-    print(f"\n{'='*50}")
-    print(f"Configuration #{config_idx} completed successfully!")
-    print(f"Results saved as: {config_idx}.slc")
-    print(f"{'='*50}\n")
-    
-    # Pequeña pausa para evitar problemas de concurrencia
-    time.sleep(1)
-
-# Procesar todas las configuraciones
-for idx, config in enumerate(configurations): #analisis en openvsp
-    process_configuration(idx, config)
-
-print("\n" + "="*50)
-print(f"ALL {len(configurations)} CONFIGURATIONS PROCESSED SUCCESSFULLY!")
-print("="*50)
-print(f"Generated {len(configurations)} .slc files (0.slc to {len(configurations)-1}.slc)")
-print("Each file contains Cp slice data for the corresponding configuration")
-print("="*50)
-
-for idx, config in enumerate(configurations): #formato de .txt
-    input_filename = f"{idx}.slc"
-    output_pivot = "tabla_pivot.csv"
-    output_columns = f"{idx}.txt"
-    org.process_cp_data(input_filename, output_pivot, output_columns)
-print("\n" + "="*50)
-print(f"ALL {len(configurations)} CONFIGURATIONS PROCESSED SUCCESSFULLY!")
-print("="*50)
-print(f"Generated {len(configurations)} .txt files (0.txt to {len(configurations)-1}.txt)")
-print("Each file contains filtered Cp slice data for the corresponding configuration")
-print("="*50)
-
-configurations = np.load('wing_configurations.npy')
-
-all_min = float('inf')                              #encontrar el minimo total
-for idx, config in enumerate(configurations):
-    input_filename = f"{idx}.txt"
-    dcp_min = min.find_min_dcp(input_filename, all_min)
-    if dcp_min < all_min:
-        all_min=dcp_min
-        print(f" new minimum in {input_filename}")
-        
-all_max = float('-inf')                            #encontrar el minimo total
-for idx, config in enumerate(configurations):
-    input_filename = f"{idx}.txt"
-    dcp_max = min.find_max_dcp(input_filename, all_max)
-    if dcp_max > all_max:
-        all_max = dcp_max
-        print(f" new maximum in {input_filename}")
-    
-for idx, config in enumerate(configurations): #crear imagenes
-    input_filename = f"{idx}.txt"
-    output_pic = f"{idx}.png"
-    t1.normalizador(input_filename, output_pic, all_min, all_max)
-print("\n" + "="*50)
-print(f"ALL {len(configurations)} CONFIGURATIONS PROCESSED SUCCESSFULLY!")
-print("="*50)
-print(f"Generated {len(configurations)} .png files (0.txt to {len(configurations)-1}.png")
-print("Each file contains normalized Cp data for the corresponding configuration")
-print("="*50)
-
-fin = time.perf_counter()
-duracion = fin - inicio
-print("\n" + "="*50)
-print(f"Tiempo de ejecución: {duracion:.4f} segundos")
-print("\n" + "="*50)
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Apr 23 19:08:42 2025
+
+@author: Damian
+"""
+
+import numpy as np
+import os
+import time
+import functools
+import metricas as mt
+
+# OpenVSP solo hace falta con SOLVER = 'openvsp': se importa la primera vez
+# que se construye un ala (load_openvsp), no al importar este modulo
+vsp = None
+
+
+def load_openvsp():
+    """
+    Importa openvsp una vez por proceso y lo deja en el global vsp
+
+    Returns:
+        module: openvsp
+    """
+    global vsp
+    if vsp is None:
+        try:
+            import openvsp
+        except ImportError:
+            raise ImportError("openvsp is not installed; use backend='vlm'") from None
+        vsp = openvsp
+    return vsp
+
+
+# Solver: 'openvsp' (VSPAERO) o 'vlm' (vlm.py, red de torbellinos en NumPy,
+# en bloque y sin OpenVSP)
+SOLVER = 'openvsp'
+# Con la tabla de parametros.condition_table (varias condiciones de vuelo
+# por geometria), cada geometria se construye una sola vez y todas sus
+# condiciones se resuelven en un barrido VSPAERO
+SWEEP = False
+# Cada worker construye el ala una vez y en cada configuracion solo cambia
+# la planta (False = ClearVSPModel y ala nueva por configuracion)
+WARM_TEMPLATE = True
+# Guardar drone_{idx}.vsp3 de cada configuracion
+WRITE_VSP3 = True
+# Organizar, medir y remuestrear cada configuracion en cuanto se resuelve
+# (flujo.run_streaming) en vez de esperar a que termine cada etapa
+STREAM = False
+# Numero de procesos que resuelven configuraciones en paralelo
+N_WORKERS = os.cpu_count()
+# Manifiesto que permite reanudar una campaña interrumpida
+MANIFEST = 'campaign_manifest.jsonl'
+# Cache de resultados CpSlicer compartida entre campañas
+CACHE_DIR = 'vsp_cache'
+CACHE_MAX_BYTES = 2 * 1024**3
+# Almacen consolidado de la campaña (arrays .npy con memory-map)
+STORE_DIR = 'campaign_store'
+# Imagenes: 'matplotlib' (contourf original) o 'raster' (test1.render_raster)
+RENDERER = 'matplotlib'
+# Con un directorio, las imagenes se exportan a un unico array [N, H, W]
+# (exportador.TensorExport) en vez de PNG sueltos; EXPORT_DTYPE uint8 o float32
+EXPORT_DIR = None
+EXPORT_DTYPE = np.uint8
+# Con EXPORT_DIR, guardar el dCp de cada pixel (EXPORT_DTYPE float16 o
+# float32) en vez de la imagen normalizada: un rango global nuevo no obliga
+# a renderizar de nuevo, se re-cuantiza con exportador.py
+EXPORT_FIELD = False
+# Mensajes por configuracion en consola (False = solo etapas y errores)
+VERBOSE = True
+# Metricas por configuracion y etapa en JSON-lines (None = sin metricas);
+# resumen con metricas.py
+METRICS = 'campaign_metrics.jsonl'
+# Validacion de ida y vuelta imagen -> dCp al final de la campaña
+VALIDATE = True
+
+# ====== Fixed Solver Inputs ======
+ALPHA = 2.0                 # Angle of attack [deg]
+CHORDWISE_PANELS = 20       # Number of panels along chord (NSlices)
+SPANWISE_PANELS = 15        # Number of panels along span (NCircSlices)
+IN_CLUSTER = 0.9
+OUT_CLUSTER = 0.4
+NUMBER_CUT = 20             # Número total de cortes del CpSlicer
+SPEED_OF_SOUND = 343.0      # m/s at sea level
+AIRFOIL = {"ThickChord": 0.12, "Camber": 0.02, "CamberLoc": 0.4}
+
+
+def solver_inputs(config, backend='openvsp'):
+    """
+    Entradas efectivas del solver para una configuracion: todo lo que
+    cambia el .slc resultante. Es la clave de la cache de resultados
+    """
+    inputs = {
+        "wing_area": float(config[0]),
+        "aspect_ratio": float(config[1]),
+        "taper_ratio": float(config[2]),
+        "sweep_angle": float(config[3]),
+        "mach": float(config[6]) / SPEED_OF_SOUND,
+        "alpha": config_alpha(config),
+        "chordwise_panels": CHORDWISE_PANELS,
+        "spanwise_panels": SPANWISE_PANELS,
+        "in_cluster": IN_CLUSTER,
+        "out_cluster": OUT_CLUSTER,
+        "number_cut": NUMBER_CUT,
+        "airfoil": AIRFOIL,
+    }
+    # Las claves de VSPAERO no llevan backend para no invalidar las
+    # entradas ya cacheadas
+    if backend != 'openvsp':
+        inputs["backend"] = backend
+    return inputs
+
+
+def vlm_inputs():
+    """
+    Argumentos de vlm.solve_batch equivalentes a las entradas de VSPAERO
+    """
+    return {"alpha": ALPHA, "chordwise_panels": CHORDWISE_PANELS,
+            "spanwise_panels": SPANWISE_PANELS, "number_cut": NUMBER_CUT,
+            "airfoil": AIRFOIL, "speed_of_sound": SPEED_OF_SOUND}
+
+
+def build_wing():
+    """
+    Modelo nuevo con un ala de dos secciones y todo lo que no cambia entre
+    configuraciones: perfil, teselado y agrupacion de paneles
+
+    Returns:
+        str: id del ala
+    """
+    load_openvsp()
+    vsp.ClearVSPModel()  # Ensure clean slate
+    wing_id = vsp.AddGeom("WING")
+
+    # FIRST Set fundamental parameters before updating
+    vsp.SetParmVal(wing_id, "XSec_Num", "XSec_1", 2)  # Only root and tip sections
+    vsp.SetParmVal(wing_id, "Sweep_Location", "XSec_1", float(0))  # 0.0 = LE sweep
+    vsp.SetParmVal(wing_id, "X_Rel_Location", "XForm", 0.0)
+
+    for curve in ("XSecCurve_0", "XSecCurve_1"):
+        for parm, value in AIRFOIL.items():
+            vsp.SetParmVal(wing_id, parm, curve, float(value))
+
+    # Set panel resolution
+    vsp.SetParmVal(wing_id, "SectTess_U", "XSec_1", SPANWISE_PANELS)
+    vsp.SetParmVal(wing_id, "InCluster", "XSec_1", float(IN_CLUSTER))
+    vsp.SetParmVal(wing_id, "OutCluster", "XSec_1", float(OUT_CLUSTER))
+    
+    vsp.SetParmVal(wing_id, "NSlices", "XSec_1", CHORDWISE_PANELS)
+    return wing_id
+
+
+# Ala plantilla del proceso (WARM_TEMPLATE): cada worker tiene su propio
+# estado de OpenVSP, asi que se construye una vez por worker
+_template_wing_id = None
+
+
+def wing_template():
+    """
+    Ala plantilla del proceso; se reconstruye si el modelo ya no contiene
+    solo esa ala (por ejemplo tras un ClearVSPModel externo)
+
+    Returns:
+        str: id del ala
+    """
+    global _template_wing_id
+    load_openvsp()
+    if _template_wing_id is None or list(vsp.FindGeoms()) != [_template_wing_id]:
+        _template_wing_id = build_wing()
+    return _template_wing_id
+
+
+def set_planform(wing_id, wing_area, aspect_ratio, taper_ratio, sweep_angle,
+                 root_chord, tip_chord, span):
+    """
+    Parametros en planta de una configuracion y vsp.Update(). Se fijan
+    siempre todos y en el mismo orden: OpenVSP recalcula los demas
+    parametros de la seccion segun el ultimo fijado, asi que el resultado
+    no depende de la configuracion anterior de la plantilla
+    """
+    vsp.SetParmVal(wing_id, "TotalArea", "WingGeom", float(wing_area))
+    vsp.SetParmVal(wing_id, "Aspect", "XSec_1", float(aspect_ratio/2))
+    vsp.SetParmVal(wing_id, "Taper", "XSec_1", float(taper_ratio)**-1)
+    vsp.SetParmVal(wing_id, "Sweep", "XSec_1", float(sweep_angle))
+
+    # Explicitly set root and tip chords
+    vsp.SetParmVal(wing_id, "Root_Chord", "XSec_1", float(root_chord))
+    vsp.SetParmVal(wing_id, "Tip_Chord", "XSec_2", float(tip_chord))
+    vsp.SetParmVal(wing_id, "Span", "XSec_1", span/2)  # Half span for each side
+
+    vsp.Update()
+
+
+def config_alpha(config):
+    """
+    Angulo de ataque de una configuracion: su columna 8 si la tiene
+    (parametros.condition_table) y si no ALPHA
+    """
+    return float(config[8]) if len(config) > 8 else ALPHA
+
+
+def plan_sweeps(configs):
+    """
+    Agrupa las condiciones (alpha, Mach) de las filas de una geometria en
+    barridos VSPAERO. Un barrido recorre una rejilla equiespaciada con Mach
+    en el bucle exterior y alpha en el interior; si las filas forman esa
+    rejilla completa basta uno, si no se lanza un barrido por fila
+
+    Returns:
+        list: por barrido (alphas, machs, posiciones de las filas en el
+        orden de los casos)
+    """
+    alphas = np.array([config_alpha(config) for config in configs])
+    machs = np.array([float(config[6]) / SPEED_OF_SOUND for config in configs])
+    alpha_grid = np.unique(alphas)
+    mach_grid = np.unique(machs)
+
+    def uniform(values):
+        return len(values) < 3 or np.allclose(np.diff(values), values[1] - values[0])
+
+    case = (np.searchsorted(mach_grid, machs) * len(alpha_grid)
+            + np.searchsorted(alpha_grid, alphas))
+    if (len(configs) == len(alpha_grid) * len(mach_grid) and len(np.unique(case)) == len(case)
+            and uniform(alpha_grid) and uniform(mach_grid)):
+        return [(alpha_grid, mach_grid, np.argsort(case))]
+    return [(alphas[[i]], machs[[i]], np.array([i])) for i in range(len(configs))]
+
+
+def process_configuration(config_idx, config, cache=None, backend=None, **kwargs):
+    """
+    Process a single configuration and save results
+
+    If a SolverCache is given, a previous result for the same effective
+    inputs is copied to {config_idx}.slc and VSPAERO is not run.
+    backend selects the solver ('openvsp' or 'vlm'), SOLVER by default.
+    Other keyword arguments go to process_geometry
+    """
+    process_geometry([config_idx], np.asarray(config)[None, :], cache=cache, backend=backend,
+                     **kwargs)
+
+
+def process_geometry(config_indices, configs, cache=None, backend=None, warm_template=None,
+                     write_vsp3=None):
+    """
+    Resuelve varias configuraciones de una misma geometria (area, AR,
+    taper, flecha) que solo cambian la condicion de vuelo: el ala se
+    construye y VSPAEROComputeGeometry se ejecuta una vez, todas las
+    condiciones (alpha, Mach) se resuelven en barridos VSPAERO (plan_sweeps)
+    y el .slc del CpSlicer se reparte en un {idx}.slc por condicion
+
+    Parameters:
+    - config_indices: indices de las configuraciones
+    - configs: sus filas, con la misma geometria
+    - cache: SolverCache opcional; si todas las filas estan cacheadas no se
+      construye el ala
+    - backend: 'openvsp' o 'vlm' (SOLVER por defecto)
+    - warm_template: reutilizar el ala plantilla del proceso (WARM_TEMPLATE
+      por defecto)
+    - write_vsp3: guardar drone_{idx}.vsp3 (WRITE_VSP3 por defecto)
+    """
+    import Organizador as org
+
+    backend = backend or SOLVER
+    if backend not in ("openvsp", "vlm"):
+        raise ValueError(f"Unknown solver backend {backend!r}, use 'openvsp' or 'vlm'")
+    warm_template = WARM_TEMPLATE if warm_template is None else warm_template
+    write_vsp3 = WRITE_VSP3 if write_vsp3 is None else write_vsp3
+    configs = np.asarray(configs)
+    if not np.allclose(configs[:, :4], configs[0, :4]):
+        raise ValueError(f"Configurations {list(config_indices)} do not share a geometry")
+    config_idx = config_indices[0]
+    config = configs[0]
+
+    # Extraer parámetros de la configuración actual
+    wing_area = config[0]
+    aspect_ratio = config[1]
+    taper_ratio = config[2]
+    sweep_angle = config[3]
+    flight_speed = config[6]
+    air_density = config[7]
+    
+    mt.log(f"\n{'='*50}")
+    mt.log(f"Processing configuration #{', #'.join(str(i) for i in config_indices)}")
+    mt.log(f"{'='*50}")
+    mt.log(f"Wing Area: {wing_area:.2f} m² | AR: {aspect_ratio:.2f} | Taper: {taper_ratio:.2f}")
+    mt.log(f"Sweep: {sweep_angle:.2f}° | Speed: {flight_speed:.2f} m/s | Density: {air_density:.3f} kg/m³")
+    
+    # ====== Derived Calculations ======
+    span = (aspect_ratio * wing_area)**0.5  # Wingspan [m]
+    tip_chord = 2 * wing_area / (span * (1 + taper_ratio))  # Root chord [m]
+    root_chord = tip_chord * taper_ratio    # Tip chord [m]
+    
+    # ====== Panel Resolution Control ======
+    chordwise_panels = CHORDWISE_PANELS
+    spanwise_panels = SPANWISE_PANELS
+
+    # ====== Result Cache ======
+    cache_keys = [None] * len(configs)
+    if cache is not None:
+        with mt.timer("cache"):
+            cache_keys = [cache.key(solver_inputs(row, backend)) for row in configs]
+            hits = [cache.fetch(key, f"{idx}.slc")
+                    for idx, key in zip(config_indices, cache_keys)]
+        if all(hits):
+            mt.log(f"\n✅ Cache hit: {len(hits)} .slc restored without running VSPAERO")
+            return
+
+    if backend == "vlm":
+        import vlm
+        with mt.timer("vlm_solve"):
+            solved = vlm.solve_batch(configs, **vlm_inputs())
+        for idx, key, (ycuts, sections) in zip(config_indices, cache_keys, solved):
+            new_filename = vlm.write_slc(f"{idx}.slc", ycuts, sections)
+            mt.log(f"\n✅ Saved VLM Cp slice results as: {new_filename}")
+            if cache is not None:
+                cache.store(key, new_filename)
+        return
+    load_openvsp()
+
+    mt.log("\n--> Generating Wing Geometry")
+    mt.log(f"Span: {span:.2f} m | Root Chord: {root_chord:.2f} m | Tip Chord: {tip_chord:.2f} m")
+    mt.log(f"Panel Resolution: {chordwise_panels} chordwise, {spanwise_panels} spanwise")
+
+    # ====== Create Geometry ======
+    with mt.timer("build"):
+        if warm_template:
+            wing_id = wing_template()
+        else:
+            wing_id = build_wing()
+        set_planform(wing_id, wing_area, aspect_ratio, taper_ratio, sweep_angle,
+                     root_chord, tip_chord, span)
+
+    # ====== Verification ======
+    actual_AR = vsp.GetParmVal(wing_id, "TotalAR", "WingGeom")
+    actual_taper = vsp.GetParmVal(wing_id, "Taper", "WingGeom")
+    actual_sweep = vsp.GetParmVal(wing_id, "Sweep", "WingGeom")
+
+    mt.log("\n--> Verification")
+    mt.log(f"Specified AR: {aspect_ratio:.2f} | Actual AR: {actual_AR:.2f}")
+    mt.log(f"Specified Taper: {taper_ratio:.2f} | Actual Taper: {actual_taper:.2f}")
+    mt.log(f"Specified Sweep: {sweep_angle:.2f} | Actual Sweep: {actual_sweep:.2f}")
+
+    # ====== Save Model ======
+    fname = f"drone_{config_idx}.vsp3"
+    if write_vsp3:
+        mt.log(f"\n--> Saving Vehicle File: {fname}")
+        with mt.timer("write_vsp3"):
+            vsp.WriteVSPFile(fname)
+        mt.log("COMPLETE")
+    else:
+        # VSPAERO toma el nombre de sus archivos (drone_{idx}_DegenGeom.*)
+        # del nombre del modelo, aunque no se escriba
+        vsp.SetVSP3FileName(fname)
+
+    # ====== VSPAERO Analysis ======
+    mt.log("\n--> Computing Geometry")
+    with mt.timer("compute_geometry"):
+        vsp.SetAnalysisInputDefaults("VSPAEROComputeGeometry")
+        vsp.SetIntAnalysisInput("VSPAEROComputeGeometry", "AnalysisMethod", [vsp.VORTEX_LATTICE])
+        vsp.ExecAnalysis("VSPAEROComputeGeometry")
+
+    first_cut = span * 0.0
+    last_cut = span * 0.5
+    number_cut = NUMBER_CUT
+    
+    # Calculamos el paso correcto
+    step_cut = (last_cut - first_cut) / (number_cut - 1)
+    ycuts = [first_cut + i * step_cut for i in range(number_cut)]
+
+    # La geometria ya calculada sirve para todos los barridos
+    for alphas, machs, rows in plan_sweeps(configs):
+        mt.log(f"\n--> Computing VSPAERO Sweep: alpha {alphas[0]:.2f}-{alphas[-1]:.2f} "
+              f"({len(alphas)}) | Mach {machs[0]:.3f}-{machs[-1]:.3f} ({len(machs)})")
+        vsp.SetAnalysisInputDefaults("VSPAEROSweep")
+        vsp.SetIntAnalysisInput("VSPAEROSweep", "AnalysisMethod", [vsp.VORTEX_LATTICE])
+        vsp.SetDoubleAnalysisInput("VSPAEROSweep", "AlphaStart", [float(alphas[0])], 0)
+        vsp.SetDoubleAnalysisInput("VSPAEROSweep", "AlphaEnd", [float(alphas[-1])], 0)
+        vsp.SetIntAnalysisInput("VSPAEROSweep", "AlphaNpts", [len(alphas)])
+        vsp.SetDoubleAnalysisInput("VSPAEROSweep", "MachStart", [float(machs[0])], 0)
+        vsp.SetDoubleAnalysisInput("VSPAEROSweep", "MachEnd", [float(machs[-1])], 0)
+        vsp.SetIntAnalysisInput("VSPAEROSweep", "MachNpts", [len(machs)])
+        
+        with mt.timer("sweep_solve"):
+            rid = vsp.ExecAnalysis("VSPAEROSweep") #aqui se crea el drone_0_DegenGeom.slc
+        if mt.VERBOSE:
+            vsp.PrintResults(rid)
+
+        mt.log("\n--> Generating Cp Slices")
+        with mt.timer("cpslicer"):
+            vsp.SetAnalysisInputDefaults("CpSlicer")
+            # Configuramos los parámetros
+            vsp.SetIntAnalysisInput("CpSlicer", "AnalysisMethod", [vsp.VORTEX_LATTICE])
+            vsp.SetDoubleAnalysisInput("CpSlicer", "YSlicePosVec", ycuts)
+            vsp.ExecAnalysis("CpSlicer") #aqui en el drone_0_DegenGeom.slc se aumentan todos los slices 
+        
+        # Repartir el .slc generado: number_cut bloques por caso, en el orden
+        # de los casos del barrido
+        output_slicefile = f"drone_{config_idx}_DegenGeom.slc"
+        if os.path.exists(output_slicefile):
+            new_filenames = [f"{config_indices[i]}.slc" for i in rows]
+            with mt.timer("split"):
+                org.split_slc(output_slicefile, new_filenames, number_cut)
+                os.remove(output_slicefile)
+            mt.log(f"\n✅ Saved Cp slice results as: {', '.join(new_filenames)}")
+            if cache is not None:
+                for i, new_filename in zip(rows, new_filenames):
+                    cache.store(cache_keys[i], new_filename)
+        else:
+            print(f"\n❌ Error: {output_slicefile} not generated for configuration {config_idx}")
+    
+    # Limpiar resultados intermedios
+    try:
+        os.remove("VSPAERO_run.ada")
+        os.remove("VSPAERO_run.fmt")
+        os.remove("VSPAERO_run.key")
+        os.remove("VSPAERO_run.res")
+        os.remove("VSPAERO_run.vspgeom")
+    except:
+        pass
+    
+    mt.log(f"\n{'='*50}")
+    mt.log(f"Configuration #{', #'.join(str(i) for i in config_indices)} completed successfully!")
+    mt.log(f"Results saved as: {', '.join(f'{i}.slc' for i in config_indices)}")
+    mt.log(f"{'='*50}\n")
+
+
+if __name__ == "__main__":
+    import campana
+    import flujo
+    import paralelo as par
+    from cache_vsp import SolverCache
+
+    inicio = time.perf_counter()
+
+    print("Beginning CP analysis with parametric wing")
+
+    # Cargar las configuraciones desde el archivo .npy
+    try:
+        configurations = np.load('wing_configurations.npy')
+        print(f"✅ Loaded {len(configurations)} configurations from wing_configurations.npy")
+        print("Column order: [Wing Area, Aspect Ratio, Taper Ratio, Sweep Angle, Flight Speed, Air Density]"
+              + (" + [Alpha]" if configurations.shape[1] > 8 else ""))
+    except FileNotFoundError:
+        print("❌ Error: wing_configurations.npy not found. Please generate it first.")
+        print("Run the configuration generator script before this one.")
+        exit(1)
+
+    # Procesar todas las configuraciones. El manifiesto registra cada etapa
+    # terminada, asi que relanzar el script tras una caida solo repite lo
+    # que falta: analisis en openvsp, formato .txt, minimo/maximo global e
+    # imagenes normalizadas
+    mt.set_verbose(VERBOSE)
+    cache = SolverCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES)
+    # La VLM resuelve por bloques en este proceso (vlm.iter_campaign); no
+    # necesita pool ni cache
+    solver = ('vlm' if SOLVER == 'vlm' else
+              functools.partial(par.vsp_sweep_solver if SWEEP else par.vsp_solver, cache=cache,
+                                warm_template=WARM_TEMPLATE, write_vsp3=WRITE_VSP3))
+    run = flujo.run_streaming if STREAM else campana.run_stages
+    all_min, all_max = run(configurations, manifest_path=MANIFEST,
+                           n_workers=N_WORKERS, solver=solver, cache=cache,
+                           sweep=SWEEP,
+                           store_path=STORE_DIR, renderer=RENDERER,
+                           export_path=EXPORT_DIR, export_dtype=EXPORT_DTYPE,
+                           export_field=EXPORT_FIELD, metrics_path=METRICS,
+                           validate=VALIDATE)
+
+    stats = cache.stats()
+    print(f"Solver cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"this run ({stats['hit_rate']:.1%} hit rate; {stats['total_hits']} hits, "
+          f"{stats['total_misses']} misses in total), {stats['bytes']/1024**2:.1f} MB")
+
+    fin = time.perf_counter()
+    duracion = fin - inicio
+    print("\n" + "="*50)
+    print(f"Tiempo de ejecución: {duracion:.4f} segundos")
+    print("\n" + "="*50)
\ No newline at end of file
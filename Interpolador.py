@@ -1,49 +1,134 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Fri Apr 25 10:53:59 2025
-
-@author: Damian
-"""
-import pandas as pd
-import numpy as np
-from scipy.interpolate import griddata
-
-
-from matplotlib import cm
-from matplotlib.ticker import LinearLocator
-
-def leer_archivo(ruta):
-    """Lee archivos CSV con decimales usando coma y separador de columnas por tabulador"""
-    return pd.read_csv(ruta, sep='\t', decimal=',', header=0)
-
-# Cargar datos base
-base_df = leer_archivo('datos_base.txt')
-# Cargar coordenadas a interpolar
-target_df = leer_archivo('datos_target.txt')
-
-# Convertir a arrays numpy
-base_points = base_df[['X', 'Y']].to_numpy()
-base_values = base_df['dCp'].to_numpy()
-target_points = target_df[['X', 'Y']].to_numpy()
-
-# Realizar interpolación lineal 2D
-interpolated_dCp = griddata(
-    points=base_points,
-    values=base_values,
-    xi=target_points,
-    method='linear',  # Puedes cambiar a 'nearest' o 'cubic' según necesites
-    fill_value=np.nan  # Para puntos fuera del convex hull
-)
-
-# Crear DataFrame con resultados
-result_df = pd.DataFrame({
-    'X': target_df['X'],
-    'Y': target_df['Y'],
-    'dCp_interpolado': interpolated_dCp
-})
-
-# Guardar resultados
-result_df.to_csv('resultados_interpolacion.csv', index=False, sep='\t', decimal=',')
-
-print("Interpolación completada. Resultados guardados en resultados_interpolacion.csv")
-
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Apr 25 10:53:59 2025
+
+@author: Damian
+"""
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+# Triangulaciones ya construidas, por hash del conjunto de puntos (LRU)
+CACHE_SIZE = 64
+_triangulations = OrderedDict()
+
+def leer_archivo(ruta):
+    """Lee archivos CSV con decimales usando coma y separador de columnas por tabulador"""
+    import pandas as pd
+    return pd.read_csv(ruta, sep='\t', decimal=',', header=0)
+
+def triangulation(points):
+    """
+    Delaunay de un conjunto de puntos 2D, construida una sola vez: las
+    llamadas siguientes con los mismos puntos (mismo contenido, aunque sea
+    otro array) la reutilizan
+    """
+    from scipy.spatial import Delaunay
+
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    key = hashlib.sha1(points.tobytes() + str(points.shape).encode()).hexdigest()
+    tri = _triangulations.get(key)
+    if tri is None:
+        tri = Delaunay(points)
+        _triangulations[key] = tri
+        if len(_triangulations) > CACHE_SIZE:
+            _triangulations.popitem(last=False)
+    else:
+        _triangulations.move_to_end(key)
+    return tri
+
+def interpolation_weights(points, targets):
+    """
+    Vertices y pesos baricentricos de cada punto objetivo en la
+    triangulacion de 'points'; sirven para interpolar cualquier numero de
+    vectores de valores con apply_weights sin volver a localizar los puntos
+
+    Returns:
+        tuple: (vertices [M, 3], weights [M, 3], outside [M]) con outside
+        True para los puntos fuera de la envolvente convexa
+    """
+    tri = triangulation(points)
+    targets = np.asarray(targets, dtype=np.float64)
+    simplex = tri.find_simplex(targets)
+    outside = simplex < 0
+    simplex = np.where(outside, 0, simplex)
+
+    T = tri.transform[simplex]
+    b = np.einsum('mij,mj->mi', T[:, :2], targets - T[:, 2])
+    weights = np.column_stack((b, 1 - b.sum(axis=1)))
+    return tri.simplices[simplex], weights, outside
+
+def apply_weights(vertices, weights, outside, values, fill_value=np.nan):
+    """
+    Interpolacion lineal con pesos ya calculados
+
+    Parameters:
+    - values: valores en los puntos base, [P] o [P, K] para K campos a la vez
+
+    Returns:
+        np.ndarray: [M] o [M, K]
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.einsum('mv,mv...->m...', weights, values[vertices])
+    result[outside] = fill_value
+    return result
+
+def interpolate(points, values, targets, fill_value=np.nan):
+    """
+    Equivalente a griddata(points, values, targets, method='linear') pero
+    reutilizando la triangulacion de 'points' entre llamadas
+
+    Parameters:
+    - points: puntos base [P, 2]
+    - values: valores base [P] o [P, K] (K campos sobre los mismos puntos)
+    - targets: puntos a interpolar [M, 2]
+    """
+    vertices, weights, outside = interpolation_weights(points, targets)
+    return apply_weights(vertices, weights, outside, values, fill_value)
+
+def interpolate_many(points, values, target_sets, fill_value=np.nan):
+    """
+    Interpola los mismos valores base en varios conjuntos de puntos con una
+    sola triangulacion
+
+    Returns:
+        list: un array por conjunto de targets
+    """
+    sizes = [len(targets) for targets in target_sets]
+    stacked = interpolate(points, values, np.concatenate(target_sets), fill_value)
+    return np.split(stacked, np.cumsum(sizes)[:-1])
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    # Cargar datos base
+    base_df = leer_archivo('datos_base.txt')
+    # Cargar coordenadas a interpolar
+    target_df = leer_archivo('datos_target.txt')
+    
+    # Convertir a arrays numpy
+    base_points = base_df[['X', 'Y']].to_numpy()
+    base_values = base_df['dCp'].to_numpy()
+    target_points = target_df[['X', 'Y']].to_numpy()
+    
+    # Realizar interpolación lineal 2D (misma respuesta que griddata con
+    # method='linear'; para 'nearest' o 'cubic' usar scipy.interpolate.griddata)
+    interpolated_dCp = interpolate(
+        base_points,
+        base_values,
+        target_points,
+        fill_value=np.nan  # Para puntos fuera del convex hull
+    )
+    
+    # Crear DataFrame con resultados
+    result_df = pd.DataFrame({
+        'X': target_df['X'],
+        'Y': target_df['Y'],
+        'dCp_interpolado': interpolated_dCp
+    })
+    
+    # Guardar resultados
+    result_df.to_csv('resultados_interpolacion.csv', index=False, sep='\t', decimal=',')
+    
+    print("Interpolación completada. Resultados guardados en resultados_interpolacion.csv")
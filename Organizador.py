@@ -1,103 +1,175 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Thu Apr 24 00:09:48 2025
-
-@author: Damian
-"""
-
-import re
-import csv
-from collections import defaultdict
-
-def process_cp_data(input_file, output_pivot, output_columns):
-    # Diccionarios para almacenar los datos
-    data = defaultdict(dict)
-    all_data = []
-    y_values = set()
-    x_values = set()
-    current_y = None
-    
-    # Expresiones regulares para buscar los valores
-    y_pattern = re.compile(r'BLOCK Cut_\d+_at_Y:_([\d.]+)')
-    data_pattern = re.compile(r'\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)')
-
-    with open(input_file, 'r') as f:
-        for line in f:
-            # Buscar coordenada Y del bloque
-            y_match = y_pattern.match(line)
-            if y_match:
-                current_y = round(float(y_match.group(1)), 4)
-                y_values.add(current_y)
-                continue
-            
-            # Buscar líneas de datos
-            data_match = data_pattern.match(line)
-            if data_match and current_y is not None:
-                x = round(float(data_match.group(1)), 4)
-                y = round(float(data_match.group(2)), 4)
-                cp = float(data_match.group(4))
-                
-                # Almacenar para tabla pivot
-                x_values.add(x)
-                data[x][current_y] = cp
-                
-                # Almacenar para archivo de columnas
-                all_data.append((x, current_y, cp))
-
-    # Generar archivo pivot ********************************
-    sorted_y = sorted(y_values)
-    sorted_x = sorted(x_values, reverse=True)
-
-    # Crear la tabla pivot
-    pivot_table = []
-    header = ['X/Y'] + [f"{y:.4f}" for y in sorted_y]
-    pivot_table.append(header)
-    
-    for x in sorted_x:
-        row = [f"{x:.4f}"]
-        for y in sorted_y:
-            value = data[x].get(y, None)
-            row.append(f"{value:.4f}" if value is not None else '')
-        pivot_table.append(row)
-
-    # Escribir archivo pivot CSV
-    with open(output_pivot, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerows(pivot_table)
-    
-    # Generar archivo de columnas CORREGIDO **************************
-    # Crear un diccionario para almacenar puntos únicos por (X,Y)
-    unique_points = {}
-    
-    # Extraer puntos únicos del diccionario data
-    for x in x_values:
-        for y in y_values:
-            if y in data[x]:
-                # Usamos (x, y) como clave única
-                unique_points[(x, y)] = data[x][y]
-    
-    # Convertir a lista y ordenar por Y y luego por X (de mayor a menor)
-    sorted_unique_data = sorted(
-        [(x, y, cp) for (x, y), cp in unique_points.items()],
-        key=lambda d: (d[1], -d[0])
-    )
-    
-    # Escribir archivo de columnas TSV (usando tabulaciones)
-    with open(output_columns, 'w', newline='') as f:
-        writer = csv.writer(f, delimiter='\t')
-        
-        for x, y, cp in sorted_unique_data:
-            writer.writerow([f"{x:.4f}", f"{y:.4f}", f"{cp:.4f}"])
-
-    print(f"Archivos generados exitosamente:")
-    print(f"- Tabla pivot: {output_pivot}")
-    print(f"- Datos en columnas: {output_columns}")
-
-'''
-# Uso del script
-input_filename = "0.slc"
-output_pivot = "tabla_pivot.csv"
-output_columns = "datos_base.txt"
-
-process_cp_data(input_filename, output_pivot, output_columns)
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Apr 24 00:09:48 2025
+
+@author: Damian
+"""
+
+import re
+import csv
+import numpy as np
+from itertools import chain
+import metricas as mt
+
+# Cabecera de bloque del CpSlicer (consume la linea entera) y fila de datos
+# con cuatro columnas numericas x y z dCp. Ambas empiezan por el salto de
+# linea previo en vez de '^' para que re busque el literal en C; el espacio
+# entre columnas nunca cruza un salto de linea
+y_pattern = re.compile(r'\nBLOCK Cut_\d+_at_Y:_([\d.]+)[^\n]*')
+data_pattern = re.compile(r'\n[^\S\n]+([-\d.]+)[^\S\n]+[-\d.]+[^\S\n]+[-\d.]+[^\S\n]+([-\d.]+)')
+
+
+def round4(values):
+    """
+    Redondeo a 4 decimales identico a round(v, 4) de Python. np.round
+    escala por 1e4 y puede desempatar distinto en los casos limite, que se
+    resuelven uno a uno con round()
+    """
+    rounded = np.round(values, 4)
+    scaled = values * 1e4
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if np.any(ties):
+        rounded[ties] = [round(float(v), 4) for v in values[ties]]
+    return rounded
+
+
+def read_slc(input_file):
+    """
+    Lee un archivo .slc del CpSlicer y devuelve los puntos unicos ordenados
+    por Y y luego por X de mayor a menor, igual que el archivo de columnas
+
+    Los bloques 'BLOCK Cut_N_at_Y:' se separan de una vez y sus filas se
+    convierten a arrays en bloque en vez de linea a linea. Si un punto
+    (X, Y) se repite se conserva el ultimo.
+
+    Returns:
+        tuple: (x, y, dcp) arrays de NumPy
+    """
+    with open(input_file, 'r') as f:
+        text = '\n' + f.read()
+
+    # [texto previo, y_1, bloque_1, y_2, bloque_2, ...]; lo previo al primer
+    # bloque se descarta
+    parts = y_pattern.split(text)
+    block_y = parts[1::2]
+    rows = []
+    counts = []
+    for block in parts[2::2]:
+        # El bloque empieza en el salto de linea que cierra la cabecera
+        block_rows = data_pattern.findall(block)
+        rows.extend(block_rows)
+        counts.append(len(block_rows))
+
+    values = np.fromiter(map(float, chain.from_iterable(rows)), dtype=float,
+                         count=2 * len(rows)).reshape(-1, 2)
+    raw_x = round4(values[:, 0])
+    y = round4(np.repeat(np.array(block_y, dtype=float), counts))
+    cp = values[:, 1]
+
+    # Orden por Y, X descendente y, para puntos repetidos, el ultimo primero
+    order = np.lexsort((-np.arange(len(raw_x)), -raw_x, y))
+    x, y, cp = raw_x[order], y[order], cp[order]
+    keep = np.ones(len(x), dtype=bool)
+    keep[1:] = (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+    x, y, cp = x[keep], y[keep], cp[keep]
+
+    # Un X de 0 se escribe con el signo con el que aparecio por primera vez
+    zeros = raw_x == 0
+    if np.any(zeros):
+        x[x == 0] = raw_x[np.argmax(zeros)]
+
+    return x, y, cp
+
+
+def split_slc(input_file, output_files, number_cut):
+    """
+    Reparte un .slc con varios casos (un barrido VSPAERO) en un archivo por
+    caso: cada uno recibe el texto previo al primer bloque y sus number_cut
+    bloques 'BLOCK Cut_N_at_Y:' consecutivos, en el orden de output_files
+
+    Returns:
+        list: output_files
+    """
+    with open(input_file, 'r') as f:
+        text = f.read()
+
+    starts = [m.start() for m in re.finditer(r'^BLOCK ', text, flags=re.MULTILINE)]
+    if len(starts) != len(output_files) * number_cut:
+        raise ValueError(f"{input_file} has {len(starts)} blocks, expected "
+                         f"{len(output_files)} cases x {number_cut} cuts")
+
+    preamble = text[:starts[0]] if starts else text
+    bounds = starts + [len(text)]
+    for k, output_file in enumerate(output_files):
+        first, last = bounds[k * number_cut], bounds[(k + 1) * number_cut]
+        with open(output_file, 'w') as f:
+            f.write(preamble + text[first:last])
+    return output_files
+
+
+def write_columns(output_columns, x, y, cp):
+    """
+    Escribe el archivo de columnas TSV X Y dCp (4 decimales, fin de linea CRLF)
+    """
+    values = np.column_stack((x, y, cp)).ravel()
+    with open(output_columns, 'w', newline='') as f:
+        f.write(("%.4f\t%.4f\t%.4f\r\n" * len(x)) % tuple(values.tolist()))
+
+
+def write_pivot(output_pivot, x, y, cp):
+    """
+    Escribe la tabla pivot CSV: filas X (de mayor a menor), columnas Y
+    """
+    sorted_y = np.unique(y)
+    sorted_x = np.unique(x)[::-1]
+    table = np.full((len(sorted_x), len(sorted_y)), np.nan)
+    rows = len(sorted_x) - 1 - np.searchsorted(sorted_x[::-1], x)
+    cols = np.searchsorted(sorted_y, y)
+    table[rows, cols] = cp
+
+    pivot_table = [['X/Y'] + [f"{v:.4f}" for v in sorted_y]]
+    for x_val, values in zip(sorted_x, table):
+        pivot_table.append([f"{x_val:.4f}"] +
+                           [f"{v:.4f}" if not np.isnan(v) else '' for v in values])
+
+    with open(output_pivot, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(pivot_table)
+
+
+def process_cp_data(input_file, output_pivot=None, output_columns=None):
+    """
+    Convierte un .slc del CpSlicer a columnas X Y dCp
+
+    Parameters:
+    - input_file: archivo .slc
+    - output_pivot: tabla pivot CSV opcional (None para no escribirla)
+    - output_columns: archivo TSV de columnas opcional ({idx}.txt)
+
+    Returns:
+        tuple: (x, y, dcp) arrays en memoria
+    """
+    x, y, cp = read_slc(input_file)
+
+    if output_pivot is not None:
+        write_pivot(output_pivot, x, y, cp)
+    if output_columns is not None:
+        write_columns(output_columns, x, y, cp)
+
+    if output_pivot is not None or output_columns is not None:
+        mt.log(f"Archivos generados exitosamente:")
+        if output_pivot is not None:
+            mt.log(f"- Tabla pivot: {output_pivot}")
+        if output_columns is not None:
+            mt.log(f"- Datos en columnas: {output_columns}")
+
+    return x, y, cp
+
+'''
+# Uso del script
+input_filename = "0.slc"
+output_pivot = "tabla_pivot.csv"
+output_columns = "datos_base.txt"
+
+process_cp_data(input_filename, output_pivot, output_columns)
 '''
\ No newline at end of file
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import numpy as np
+
+
+class DatasetStore:
+    """
+    Almacen de una campaña completa en un directorio de arrays .npy que se
+    abren con memory-map, en vez de miles de {idx}.slc/.txt/.png sueltos.
+
+    Contenido:
+    - configurations.npy: tabla de configuraciones [N, C]
+    - x.npy: coordenada X de cada punto [N, S, P] (NaN donde no hay punto)
+    - dcp.npy: dCp de cada punto [N, S, P]
+    - y.npy: posicion Y de cada seccion [N, S]
+    - npoints.npy: puntos validos por seccion [N, S]
+    - filled.npy: configuraciones ya escritas [N]
+    - meta.json: dimensiones, estadisticas globales y contenido ('solver'
+      para los campos de la campaña, 'reconstructed' para los recuperados
+      de las imagenes con denormalizer.write_to_store)
+
+    Las secciones guardan los puntos en el mismo orden que {idx}.txt
+    (X de mayor a menor), asi que read(idx) reproduce el archivo de columnas.
+    Si una configuracion trae mas secciones o puntos de los previstos al
+    crearlo, write amplia los arrays (resize).
+    """
+
+    ARRAYS = ("configurations", "x", "dcp", "y", "npoints", "filled")
+
+    def __init__(self, path, mode='r'):
+        """
+        Abre un almacen existente. mode='r' solo lectura, 'r+' lectura/escritura
+        """
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, "meta.json"), 'r') as f:
+            self.meta = json.load(f)
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode))
+
+    @classmethod
+    def create(cls, path, configurations, n_sections=20, n_points=64, dtype=np.float64,
+               content='solver'):
+        """
+        Crea un almacen vacio con los arrays preasignados en disco
+
+        Parameters:
+        - path: directorio del almacen
+        - configurations: tabla de configuraciones de la campaña
+        - n_sections: numero de secciones (cortes) previsto por configuracion
+        - n_points: numero de puntos previsto por seccion; ambos crecen
+          si hace falta
+        - dtype: tipo de X, Y y dCp
+        - content: 'solver' o 'reconstructed'; un almacen no mezcla ambos
+        """
+        os.makedirs(path, exist_ok=True)
+        configurations = np.asarray(configurations)
+        n_configs = len(configurations)
+
+        np.save(os.path.join(path, "configurations.npy"), configurations)
+        shapes = {
+            "x": ((n_configs, n_sections, n_points), dtype, np.nan),
+            "dcp": ((n_configs, n_sections, n_points), dtype, np.nan),
+            "y": ((n_configs, n_sections), dtype, np.nan),
+            "npoints": ((n_configs, n_sections), np.int32, 0),
+            "filled": ((n_configs,), np.bool_, False),
+        }
+        for name, (shape, array_dtype, fill) in shapes.items():
+            array = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode='w+',
+                                              dtype=array_dtype, shape=shape)
+            array[...] = fill
+            array.flush()
+            del array
+
+        meta = {"n_configs": n_configs, "n_sections": n_sections,
+                "n_points": n_points, "content": content, "stats": {}}
+        with open(os.path.join(path, "meta.json"), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        return cls(path, mode='r+')
+
+    def __len__(self):
+        return self.meta["n_configs"]
+
+    def grow(self, configurations):
+        """
+        Amplia el almacen a una tabla de configuraciones mas larga cuyas
+        primeras filas son las ya guardadas (parametros.generate_configurations
+        con append=True); lo ya escrito conserva su indice
+        """
+        configurations = np.asarray(configurations)
+        n_old, n_new = len(self), len(configurations)
+        if n_new < n_old or not np.array_equal(configurations[:n_old], self.configurations):
+            raise ValueError(f"Configurations of {self.path} are not a prefix of the new table")
+
+        fills = {"x": np.nan, "dcp": np.nan, "y": np.nan, "npoints": 0, "filled": False}
+        grown = {name: _grow_array(os.path.join(self.path, f"{name}.npy"), getattr(self, name),
+                                   n_new, fill)
+                 for name, fill in fills.items()}
+        # Los memmap antiguos se sueltan antes de sustituir sus archivos
+        for name in self.ARRAYS:
+            setattr(self, name, None)
+        for name, tmp in grown.items():
+            os.replace(tmp, os.path.join(self.path, f"{name}.npy"))
+        np.save(os.path.join(self.path, "configurations.npy"), configurations)
+
+        self.meta["n_configs"] = n_new
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        self.__init__(self.path, mode=self.mode)
+
+    def resize(self, n_sections, n_points):
+        """
+        Amplia el numero de secciones por configuracion y de puntos por
+        seccion (nunca los reduce); lo ya escrito conserva su posicion
+        """
+        n_sections = max(int(n_sections), self.meta["n_sections"])
+        n_points = max(int(n_points), self.meta["n_points"])
+        if (n_sections, n_points) == (self.meta["n_sections"], self.meta["n_points"]):
+            return
+
+        fills = {"x": np.nan, "dcp": np.nan, "y": np.nan, "npoints": 0}
+        grown = {}
+        for name, fill in fills.items():
+            old = getattr(self, name)
+            shape = (len(old), n_sections, n_points)[:old.ndim]
+            grown[name] = _resize_array(os.path.join(self.path, f"{name}.npy"), old, shape,
+                                        fill)
+        for name in self.ARRAYS:
+            setattr(self, name, None)
+        for name, tmp in grown.items():
+            os.replace(tmp, os.path.join(self.path, f"{name}.npy"))
+
+        self.meta["n_sections"], self.meta["n_points"] = n_sections, n_points
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        self.__init__(self.path, mode=self.mode)
+
+    def write(self, idx, x, y, dcp):
+        """
+        Guarda los puntos de una configuracion (arrays de Organizador.read_slc,
+        ordenados por Y y luego por X de mayor a menor)
+        """
+        y_sections, starts, counts = np.unique(y, return_index=True, return_counts=True)
+        if len(counts):
+            self.resize(len(y_sections), counts.max())
+
+        # Posicion de cada punto dentro de su seccion
+        section = np.repeat(np.arange(len(y_sections)), counts)
+        point = np.arange(len(x)) - np.repeat(starts, counts)
+
+        self.x[idx] = np.nan
+        self.dcp[idx] = np.nan
+        self.y[idx] = np.nan
+        self.npoints[idx] = 0
+
+        self.x[idx, section, point] = x
+        self.dcp[idx, section, point] = dcp
+        self.y[idx, :len(y_sections)] = y_sections
+        self.npoints[idx, :len(y_sections)] = counts
+        self.filled[idx] = True
+
+    def read(self, idx):
+        """
+        Devuelve los puntos de una configuracion en el formato de {idx}.txt
+
+        Returns:
+            tuple: (x, y, dcp) arrays planos
+        """
+        counts = np.asarray(self.npoints[idx])
+        valid = np.arange(self.meta["n_points"]) < counts[:, None]
+        y = np.broadcast_to(np.asarray(self.y[idx])[:, None], valid.shape)
+        return np.asarray(self.x[idx])[valid], y[valid], np.asarray(self.dcp[idx])[valid]
+
+    def subset(self, indices):
+        """
+        Carga en memoria solo las configuraciones pedidas
+
+        Returns:
+            dict: arrays configurations, x, dcp, y, npoints para esos indices
+        """
+        indices = np.asarray(indices)
+        return {name: np.asarray(getattr(self, name)[indices])
+                for name in ("configurations", "x", "dcp", "y", "npoints")}
+
+    @property
+    def content(self):
+        # Los almacenes anteriores a esta clave son siempre de la campaña
+        return self.meta.get("content", "solver")
+
+    @property
+    def stats(self):
+        return self.meta["stats"]
+
+    def set_stats(self, **stats):
+        """
+        Actualiza las estadisticas globales guardadas en meta.json
+        """
+        self.meta["stats"].update(stats)
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+    def flush(self):
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def import_txt(self, idx, txt_file):
+        """
+        Copia al almacen un {idx}.txt ya existente
+        """
+        data = np.loadtxt(txt_file, ndmin=2)
+        self.write(idx, data[:, 0], data[:, 1], data[:, 2])
+
+
+def _grow_array(path, old, n_rows, fill):
+    """
+    Escribe junto a path un .npy temporal con n_rows filas: las primeras
+    copiadas de old y el resto con fill
+
+    Returns:
+        str: ruta del temporal, para sustituir path con os.replace
+    """
+    return _resize_array(path, old, (n_rows,) + old.shape[1:], fill)
+
+
+def _resize_array(path, old, shape, fill):
+    """
+    Como _grow_array pero ampliando cualquier eje: old queda en la esquina
+    inicial del nuevo array y el resto con fill
+    """
+    tmp = f"{path}.tmp.npy"
+    array = np.lib.format.open_memmap(tmp, mode='w+', dtype=old.dtype, shape=shape)
+    array[tuple(slice(0, n) for n in old.shape)] = old
+    # Cada zona nueva se rellena una sola vez: la que sobra en cada eje,
+    # dentro de lo ya copiado en los ejes anteriores
+    for axis, n in enumerate(old.shape):
+        array[tuple(slice(0, m) for m in old.shape[:axis]) + (slice(n, None),)] = fill
+    array.flush()
+    del array
+    return tmp
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Tiempo de arranque en frio de los subcomandos de dcp_predictor.py sobre una
+campaña VLM pequeña ya resuelta (cada medida es un proceso nuevo, el mejor
+de REPEAT), comparado con importar de golpe las librerias que antes cargaba
+'import CPWING'. Indica ademas que librerias pesadas llega a importar cada
+subcomando.
+
+Uso: python benchmarks/bench_arranque.py
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CLI = os.path.join(ROOT, 'dcp_predictor.py')
+
+N_CONFIGS = 8
+REPEAT = 5
+HEAVY = ("scipy", "matplotlib", "pandas", "cv2", "pyDOE2", "openvsp")
+
+# Lo que importaba CPWING al cargarse (test1 -> scipy, validacion ->
+# comparador -> matplotlib y pandas)
+EAGER = ("import numpy, scipy.interpolate, matplotlib.pyplot, pandas, "
+         "mpl_toolkits.mplot3d, campana, CPWING")
+
+COMMANDS = {
+    "--help": ["--help"],
+    "stats": ["stats", "--quiet"],
+    "organize": ["organize", "--quiet"],
+    "render": ["render", "--renderer", "raster", "--quiet"],
+    "solve (vlm)": ["solve", "--solver", "vlm", "--quiet"],
+    "validate": ["validate", "--quiet"],
+}
+
+# Ejecuta el CLI y escribe en stderr las librerias pesadas cargadas
+PROBE = """
+import sys, json, runpy
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass
+sys.stderr.write(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def cold(argv, cwd):
+    """
+    Mejor tiempo de REPEAT procesos nuevos [s]
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, DCP_VERBOSE="0")
+    best = float('inf')
+    for _ in range(REPEAT):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable] + argv, cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - inicio)
+    return best
+
+
+def heavy_modules(args, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT, DCP_VERBOSE="0")
+    probe = subprocess.run([sys.executable, "-c", PROBE.format(heavy=HEAVY), CLI] + args,
+                           cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE, text=True)
+    return json.loads(probe.stderr.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        # Campaña completa una vez: las medidas solo repiten el arranque y
+        # la comprobacion del manifiesto
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        for args in (["sample", "-n", str(N_CONFIGS), "--seed", "0"],
+                     ["run", "--solver", "vlm", "--renderer", "raster", "--quiet",
+                      "--validate", "--metrics", ""]):
+            subprocess.run([sys.executable, CLI] + args, cwd=tmp, env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+
+        python = cold(["-c", "pass"], tmp)
+        eager = cold(["-c", EAGER], tmp)
+        results = {name: (cold([CLI] + args, tmp), heavy_modules(args, tmp))
+                   for name, args in COMMANDS.items()}
+
+    print(f"\n{N_CONFIGS} configurations | best of {REPEAT} cold starts | "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'command':>28} {'time [s]':>9}  heavy modules")
+    print(f"{'python -c pass':>28} {python:9.3f}")
+    print(f"{'eager imports (old CPWING)':>28} {eager:9.3f}  matplotlib, pandas, scipy")
+    for name, (seconds, modules) in results.items():
+        print(f"{name:>28} {seconds:9.3f}  {', '.join(modules) or '-'}")
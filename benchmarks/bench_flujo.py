@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Compara la campaña por etapas (campana.run_stages) con la de flujo continuo
+(flujo.run_streaming) usando sintetico.stub_solver con una espera que imita
+la duracion de VSPAERO: tiempo total y tiempo entre el ultimo .slc y el
+final de la campaña. Comprueba ademas que las imagenes sean identicas.
+
+Uso: python benchmarks/bench_flujo.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import campana
+import flujo
+import parametros as pm
+import sintetico
+
+
+N_CONFIGS = 40
+N_WORKERS = 2
+SOLVE_TIME = 0.2    # segundos por configuracion
+RENDERER = 'raster'
+
+
+def slow_solver(config_idx, config):
+    time.sleep(SOLVE_TIME)
+    sintetico.stub_solver(config_idx, config)
+
+
+def timed_run(run, configurations, output_dir):
+    inicio = time.perf_counter()
+    run(configurations, manifest_path=os.path.join(output_dir, 'manifest.jsonl'),
+        output_dir=output_dir, n_workers=N_WORKERS, solver=slow_solver,
+        store_path=os.path.join(output_dir, 'store'), renderer=RENDERER)
+    total = time.perf_counter() - inicio
+    last_slc = max(os.path.getmtime(os.path.join(output_dir, f"{idx}.slc"))
+                   for idx in range(len(configurations)))
+    return total, time.time() - last_slc
+
+
+if __name__ == "__main__":
+    configurations = pm.scale_samples(np.random.default_rng(0).random((N_CONFIGS, 6)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, run in (("stages", campana.run_stages), ("streaming", flujo.run_streaming)):
+            output_dir = os.path.join(tmp, name)
+            os.makedirs(output_dir)
+            results[name] = timed_run(run, configurations, output_dir)
+
+        same = all(open(os.path.join(tmp, "stages", f"{idx}.png"), "rb").read()
+                   == open(os.path.join(tmp, "streaming", f"{idx}.png"), "rb").read()
+                   for idx in range(N_CONFIGS))
+
+    print(f"\n{N_CONFIGS} configurations | {N_WORKERS} workers | "
+          f"{SOLVE_TIME:.2f} s per solve | {os.cpu_count()} CPUs")
+    print(f"{'pipeline':>10} {'total [s]':>10} {'after last solve [s]':>21}")
+    for name, (total, tail) in results.items():
+        print(f"{name:>10} {total:10.2f} {tail:21.2f}")
+    print(f"Identical images: {same}")
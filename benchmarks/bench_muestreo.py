@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Compara muestreo_activo.active_sampling con LHS uniforme usando el campo
+analitico de sintetico como solver: error del surrogate sobre un conjunto
+de prueba frente al numero de llamadas al solver.
+
+Uso: python benchmarks/bench_muestreo.py
+"""
+
+import os
+import sys
+import numpy as np
+from pyDOE2 import lhs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import muestreo_activo as ma
+import parametros as pm
+import sintetico
+
+
+N_INITIAL = 20
+BATCH_SIZE = 10
+N_ROUNDS = 12
+N_TEST = 500
+SEEDS = (0, 1, 2)
+
+
+def relative_error(models, X_test, Y_test):
+    mean, spread = ma.predict_ensemble(models, X_test)
+    return np.sqrt(np.mean((mean - Y_test)**2)) / np.std(Y_test)
+
+
+if __name__ == "__main__":
+    n_variables = len(pm.parameter_space()[0])
+    X_test = lhs(n_variables, samples=N_TEST, random_state=123)
+    Y_test = sintetico.synthetic_field(pm.scale_samples(X_test))
+    budgets = [N_INITIAL + BATCH_SIZE * (r + 1) for r in range(N_ROUNDS)]
+
+    active = np.zeros((len(SEEDS), N_ROUNDS))
+    uniform = np.zeros((len(SEEDS), N_ROUNDS))
+    for s, seed in enumerate(SEEDS):
+        def record(round_idx, configurations, fields, models):
+            refit = ma.fit_ensemble(pm.unit_samples(configurations), fields, seed=seed)
+            active[s, round_idx] = relative_error(refit, X_test, Y_test)
+
+        ma.active_sampling(sintetico.synthetic_field, n_initial=N_INITIAL,
+                           batch_size=BATCH_SIZE, n_rounds=N_ROUNDS, seed=seed,
+                           callback=record)
+
+        for r, budget in enumerate(budgets):
+            X = lhs(n_variables, samples=budget, random_state=seed * 1000 + r)
+            models = ma.fit_ensemble(X, sintetico.synthetic_field(pm.scale_samples(X)), seed=seed)
+            uniform[s, r] = relative_error(models, X_test, Y_test)
+
+    print(f"\n{'solver calls':>12} {'active err':>11} {'LHS err':>9}")
+    for r, budget in enumerate(budgets):
+        print(f"{budget:12d} {active[:, r].mean():11.4f} {uniform[:, r].mean():9.4f}")
+
+    # Llamadas que necesita LHS para igualar el error final del muestreo activo
+    target = active[:, -1].mean()
+    reached = [b for b, e in zip(budgets, uniform.mean(axis=0)) if e <= target]
+    print(f"\nActive error after {budgets[-1]} calls: {target:.4f}; "
+          + (f"LHS reaches it after {reached[0]} calls" if reached
+             else f"LHS does not reach it within {budgets[-1]} calls"))
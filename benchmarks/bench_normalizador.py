@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Compara test1.resample_sections con el bucle original de normalizador
+(np.append, while/np.delete, row_stack y un spline por seccion) sobre
+campos sinteticos de distintos tamaños. La equivalencia se comprueba
+tambien en tests/test_normalizador.py.
+
+Uso: python benchmarks/bench_normalizador.py
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import test1 as t1
+import sintetico
+
+
+def legacy_resample(M, nx=20):
+    """
+    Agrupacion y remuestreo tal como estaban en test1.normalizador
+    """
+    py = np.array([])
+    for i in range(len(M)):
+        if i == 0:
+            py = np.append(py, M[i,1])
+        else:
+            if M[i,1] != py[-1]:
+                py = np.append(py, M[i,1])
+
+    px = []
+    pdcp = []
+    Mx = M.copy()
+    for j in range(len(py)):
+        i=0
+        pxy = np.array([])
+        ppy = np.array([])
+        while(1==1):
+            if i == 0:
+                pxy = np.append(pxy, Mx[i,0])
+                ppy = np.append(ppy, Mx[i,2])
+                i += 1
+            else:
+                if Mx[i,0] < pxy[-1]:
+                    pxy = np.append(pxy, Mx[i,0])
+                    ppy = np.append(ppy, Mx[i,2])
+                    i += 1
+                elif Mx[i,0] == pxy[-1]:
+                    i += 1
+                else:
+                    break
+            if i == len(Mx):
+                break
+        px.append(pxy)
+        pdcp.append(ppy)
+        Mx = np.delete(Mx, np.arange(i), axis=0)
+
+    XX = np.empty((0,nx))
+    PP = np.empty((0,nx))
+    for j in range(len(px)):
+        X, P = t1.interpol(px[j], pdcp[j], nx)
+        XX = np.vstack((XX, X))
+        PP = np.vstack((PP, P))
+
+    XN = np.empty((0, nx))
+    for j in range(len(px)):
+        XN = np.vstack((XN, (XX[j] - XX[j,-1]) / (XX[j,0] - XX[j,-1])))
+    YN = np.empty((len(py), 0))
+    for i in range(nx):
+        YN = np.column_stack((YN, (py - py[0]) / (py[-1] - py[0])))
+    return XN, YN, PP
+
+
+def synthetic_txt(number_cut, chordwise_panels):
+    """
+    Matriz X Y dCp con el orden de {idx}.txt (Y creciente, X decreciente)
+    """
+    config = np.array([10.0, 8.0, 2.0, 15.0, 2.0, 2.0, 50.0, 1.204])
+    ycuts, sections = sintetico.synthetic_sections(config, number_cut=number_cut,
+                                                   chordwise_panels=chordwise_panels)
+    rows = [np.column_stack((x[::-1], np.full(len(x), y), dcp[::-1]))
+            for y, (x, z, dcp) in zip(ycuts, sections)]
+    return np.round(np.vstack(rows), 4)
+
+
+def timeit(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - inicio)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'cuts x points':>14} {'legacy [ms]':>12} {'vector [ms]':>12} {'speedup':>8} {'max |dPP|':>10}")
+    for number_cut, chordwise_panels in [(20, 20), (20, 40), (50, 100), (100, 200)]:
+        M = synthetic_txt(number_cut, chordwise_panels)
+        XN0, YN0, PP0 = legacy_resample(M)
+        XN1, YN1, PP1, py = t1.resample_sections(M)
+        assert np.allclose(XN0, XN1) and np.allclose(YN0, YN1)
+        assert np.allclose(PP0, PP1, atol=1e-12), np.abs(PP0 - PP1).max()
+
+        legacy = timeit(legacy_resample, M)
+        vector = timeit(t1.resample_sections, M)
+        print(f"{number_cut:>6} x {chordwise_panels:<5} {legacy*1e3:12.2f} {vector*1e3:12.2f} "
+              f"{legacy/vector:8.1f} {np.abs(PP0 - PP1).max():10.2e}")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Compara el renderizador directo test1.render_raster con la figura contourf
+de matplotlib que usaba normalizador: tiempo por imagen y diferencia por
+pixel entre los dos PNG sobre campos sinteticos.
+
+Uso: python benchmarks/bench_render.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import test1 as t1
+import metricas as mt
+import sintetico
+
+
+CONFIGS = np.array([
+    [10.0, 8.0, 2.0, 15.0, 2.0, 2.0, 50.0, 1.204],
+    [14.0, 12.0, 1.5, 30.0, 0.0, 4.0, 80.0, 1.112],
+    [8.0, 5.0, 3.0, 5.0, -2.0, 1.0, 35.0, 1.225],
+    [12.0, 20.0, 1.2, 40.0, 3.0, 3.0, 120.0, 0.909],
+])
+
+
+def synthetic_txt(config, path):
+    """
+    Escribe un {idx}.txt sintetico (Y creciente, X decreciente)
+    """
+    ycuts, sections = sintetico.synthetic_sections(config)
+    rows = [np.column_stack((x[::-1], np.full(len(x), y), dcp[::-1]))
+            for y, (x, z, dcp) in zip(ycuts, sections)]
+    np.savetxt(path, np.round(np.vstack(rows), 4), fmt='%.4f', delimiter='\t')
+
+
+def timed(func, *args, repeat=5, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - inicio)
+    return best
+
+
+if __name__ == "__main__":
+    # Sin el mensaje de normalizador por imagen
+    mt.set_verbose(False)
+    workdir = tempfile.mkdtemp()
+    # Rango global comun a todas las imagenes, como en la campaña
+    fields = []
+    for idx, config in enumerate(CONFIGS):
+        txt = os.path.join(workdir, f"{idx}.txt")
+        synthetic_txt(config, txt)
+        fields.append(txt)
+    values = np.concatenate([np.loadtxt(txt)[:, 2] for txt in fields])
+    dcp_min, dcp_max = values.min(), values.max()
+
+    print(f"{'idx':>4} {'mpl [ms]':>9} {'raster [ms]':>11} {'speedup':>8} {'total x':>8} "
+          f"{'mean |d|':>9} {'max |d|':>8} {'equal %':>8}")
+    for idx, txt in enumerate(fields):
+        png_mpl = os.path.join(workdir, f"{idx}_mpl.png")
+        png_raster = os.path.join(workdir, f"{idx}_raster.png")
+        XN, YN, PP, py = t1.resample_sections(np.loadtxt(txt))
+
+        # Solo la imagen (rejilla ya remuestreada) y normalizador completo
+        mpl = timed(t1.save_contourf, png_mpl, XN, YN, PP, dcp_min, dcp_max)
+        raster = timed(lambda: t1.write_png(png_raster,
+                                            t1.render_raster(XN, YN, PP, dcp_min, dcp_max)))
+        total_mpl = timed(t1.normalizador, txt, png_mpl, dcp_min, dcp_max)
+        total_raster = timed(t1.normalizador, txt, png_raster, dcp_min, dcp_max,
+                             renderer='raster')
+
+        A = cv2.imread(png_mpl, cv2.IMREAD_GRAYSCALE).astype(int)
+        B = cv2.imread(png_raster, cv2.IMREAD_GRAYSCALE).astype(int)
+        assert A.shape == B.shape, (A.shape, B.shape)
+        d = np.abs(A - B)
+        print(f"{idx:>4} {mpl*1e3:9.1f} {raster*1e3:11.2f} {mpl/raster:8.1f} "
+              f"{total_mpl/total_raster:8.1f} {d.mean():9.3f} {d.max():8d} "
+              f"{100*(d == 0).mean():8.1f}")
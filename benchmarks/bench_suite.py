@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Banco de pruebas del post-proceso sin OpenVSP: genera campañas sinteticas
+({idx}.slc con bloques 'BLOCK Cut_N_at_Y:', {idx}.txt en columnas y PNG
+normalizados) de varios tamaños y mide cada modulo sobre ellas. Los
+resultados (segundos por archivo, el mejor de REPEAT pasadas) se guardan
+como referencia y se pueden comparar con una ejecucion posterior.
+
+Uso:
+    python benchmarks/bench_suite.py                  # medir e imprimir
+    python benchmarks/bench_suite.py --save-baseline  # guardar referencia
+    python benchmarks/bench_suite.py --compare        # marcar regresiones
+    python benchmarks/bench_suite.py --sizes small --cases normalizador_raster
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Organizador as org
+import minimo as mn
+import test1 as t1
+import img_to_txt as it
+import denormalizer as dn
+import comparador as cmp
+import metricas as mt
+import parametros as pm
+import sintetico
+
+
+# Campañas sinteticas: configuraciones, cortes, puntos por corte y lado
+# de las imagenes PNG
+SIZES = {
+    "small": {"n_configs": 10, "number_cut": 20, "chordwise_panels": 20, "image_size": 128},
+    "medium": {"n_configs": 40, "number_cut": 40, "chordwise_panels": 40, "image_size": 256},
+    "large": {"n_configs": 100, "number_cut": 80, "chordwise_panels": 80, "image_size": 256},
+}
+REPEAT = 3
+# Una etapa es regresion si tarda mas de THRESHOLD veces la referencia
+THRESHOLD = 1.25
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def generate_slc(path, config, number_cut=20, chordwise_panels=20):
+    """
+    {idx}.slc sintetico con el formato de bloques del CpSlicer
+    """
+    ycuts, sections = sintetico.synthetic_sections(config, number_cut=number_cut,
+                                                   chordwise_panels=chordwise_panels)
+    return sintetico.write_slc(path, ycuts, sections)
+
+
+def generate_txt(path, config, number_cut=20, chordwise_panels=20):
+    """
+    {idx}.txt sintetico en columnas X Y dCp (Y creciente, X decreciente,
+    como Organizador.write_columns)
+    """
+    ycuts, sections = sintetico.synthetic_sections(config, number_cut=number_cut,
+                                                   chordwise_panels=chordwise_panels)
+    M = np.vstack([np.column_stack((x[::-1], np.full(len(x), y), dcp[::-1]))
+                   for y, (x, z, dcp) in zip(ycuts, sections)])
+    org.write_columns(path, org.round4(M[:, 0]), org.round4(M[:, 1]), org.round4(M[:, 2]))
+    return path
+
+
+def generate_png(path, txt_path, dcp_min, dcp_max, image_size=256):
+    """
+    Imagen normalizada de un {idx}.txt (test1.render_raster)
+    """
+    XN, YN, PP, py = t1.resample_sections(np.loadtxt(txt_path))
+    t1.write_png(path, t1.render_raster(XN, YN, PP, dcp_min, dcp_max, size=image_size))
+    return path
+
+
+def generate_dataset(workdir, n_configs=10, number_cut=20, chordwise_panels=20,
+                     image_size=256, seed=0):
+    """
+    Campaña sintetica completa en workdir: wing_configurations.npy,
+    {idx}.slc, {idx}.txt, {idx}.png y {idx}_img.txt (img_to_txt del PNG,
+    tambien ya leido en memoria)
+
+    Returns:
+        dict: configuraciones, rango dCp global y rutas de cada tipo de archivo
+    """
+    os.makedirs(workdir, exist_ok=True)
+    configurations = pm.scale_samples(np.random.default_rng(seed).random((n_configs, 6)))
+    np.save(os.path.join(workdir, 'wing_configurations.npy'), configurations)
+
+    path = lambda idx, suffix: os.path.join(workdir, f"{idx}{suffix}")
+    indices = range(n_configs)
+    for idx in indices:
+        generate_slc(path(idx, ".slc"), configurations[idx], number_cut, chordwise_panels)
+        generate_txt(path(idx, ".txt"), configurations[idx], number_cut, chordwise_panels)
+
+    values = np.concatenate([np.loadtxt(path(idx, ".txt"))[:, 2] for idx in indices])
+    dcp_min, dcp_max = float(values.min()), float(values.max())
+    for idx in indices:
+        generate_png(path(idx, ".png"), path(idx, ".txt"), dcp_min, dcp_max, image_size)
+        it.image_to_txt(path(idx, ".png"), path(idx, "_img.txt"), dcp_min, dcp_max,
+                        verbose=False)
+
+    return {"configurations": configurations, "dcp_min": dcp_min, "dcp_max": dcp_max,
+            "workdir": workdir,
+            "slc": [path(idx, ".slc") for idx in indices],
+            "txt": [path(idx, ".txt") for idx in indices],
+            "png": [path(idx, ".png") for idx in indices],
+            "img_txt": [path(idx, "_img.txt") for idx in indices],
+            "img_fields": [np.loadtxt(path(idx, "_img.txt")) for idx in indices]}
+
+
+def _out(data, name):
+    return os.path.join(data["workdir"], "out", name)
+
+
+def case_process_cp_data(data):
+    for idx, slc in enumerate(data["slc"]):
+        org.process_cp_data(slc, output_columns=_out(data, f"{idx}.txt"))
+
+
+def case_min_max(data):
+    all_min, all_max = float('inf'), float('-inf')
+    for txt in data["txt"]:
+        all_min = mn.find_min_dcp(txt, all_min)
+        all_max = mn.find_max_dcp(txt, all_max)
+
+
+def case_normalizador_matplotlib(data):
+    for idx, txt in enumerate(data["txt"]):
+        t1.normalizador(txt, _out(data, f"{idx}.png"), data["dcp_min"], data["dcp_max"])
+
+
+def case_normalizador_raster(data):
+    for idx, txt in enumerate(data["txt"]):
+        t1.normalizador(txt, _out(data, f"{idx}.png"), data["dcp_min"], data["dcp_max"],
+                        renderer='raster')
+
+
+def case_image_to_txt(data):
+    for idx, png in enumerate(data["png"]):
+        it.image_to_txt(png, _out(data, f"{idx}_img.txt"), data["dcp_min"], data["dcp_max"],
+                        verbose=False)
+
+
+def case_denormalize_coordinates(data):
+    for idx, img_txt in enumerate(data["img_txt"]):
+        dn.denormalize_coordinates(img_txt, idx, data["configurations"],
+                                   _out(data, f"{idx}_denormalized.txt"), verbose=False)
+
+
+def case_grid_surface(data):
+    # Solo el mallado: los campos se leen al generar la campaña
+    for field in data["img_fields"]:
+        cmp.grid_surface(field[:, 0], field[:, 1], field[:, 2])
+
+
+CASES = {
+    "process_cp_data": case_process_cp_data,
+    "find_min_max_dcp": case_min_max,
+    "normalizador_matplotlib": case_normalizador_matplotlib,
+    "normalizador_raster": case_normalizador_raster,
+    "image_to_txt": case_image_to_txt,
+    "denormalize_coordinates": case_denormalize_coordinates,
+    "grid_surface": case_grid_surface,
+}
+
+
+def run_suite(sizes=None, cases=None, repeat=REPEAT, seed=0):
+    """
+    Genera cada campaña y mide cada caso
+
+    Returns:
+        dict: {tamaño: {caso: segundos por archivo}}
+    """
+    sizes = sizes or list(SIZES)
+    cases = cases or list(CASES)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            data = generate_dataset(os.path.join(tmp, size), seed=seed, **SIZES[size])
+            os.makedirs(os.path.join(data["workdir"], "out"), exist_ok=True)
+            n_files = SIZES[size]["n_configs"]
+            results[size] = {}
+            for case in cases:
+                best = float('inf')
+                for _ in range(repeat):
+                    inicio = time.perf_counter()
+                    CASES[case](data)
+                    best = min(best, time.perf_counter() - inicio)
+                results[size][case] = best / n_files
+                print(f"{size:>8} {case:>24} {1e3 * results[size][case]:10.3f} ms/file")
+    return results
+
+
+def calibrate(repeat=5):
+    """
+    Tiempo de una carga fija (NumPy, texto y bucle Python) que no depende
+    del codigo del repositorio: compare divide por la razon de calibracion
+    para que una maquina mas lenta o cargada no parezca una regresion
+    """
+    rng = np.random.default_rng(0)
+    A = rng.random((200, 200))
+    best = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        np.linalg.solve(A + 200 * np.eye(200), A)
+        " ".join(f"{v:.4f}" for v in A.ravel()[:20000].tolist())
+        sum(i * i for i in range(100000))
+        best = min(best, time.perf_counter() - inicio)
+    return best
+
+
+def environment():
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"), "calibration": calibrate()}
+
+
+def save_baseline(results, path=BASELINE):
+    with open(path, 'w') as f:
+        json.dump({"environment": environment(), "sizes": SIZES, "results": results},
+                  f, indent=2)
+    print(f"Baseline saved to: {path}")
+
+
+def compare(results, path=BASELINE, threshold=THRESHOLD):
+    """
+    Compara con la referencia guardada e imprime la razon de tiempos de
+    cada caso (corregida con calibrate); marca SLOWER los que superan
+    threshold
+
+    Returns:
+        list: (tamaño, caso, razon) de las regresiones
+    """
+    with open(path, 'r') as f:
+        baseline = json.load(f)
+    speed = calibrate() / baseline["environment"]["calibration"]
+    print(f"\nBaseline {path} ({baseline['environment']['date']}, "
+          f"{baseline['environment']['platform']})")
+    print(f"Calibration: this machine runs the reference load at {speed:.2f}x the "
+          f"baseline time; ratios are corrected by it")
+    print(f"{'size':>8} {'case':>24} {'base [ms]':>10} {'now [ms]':>10} {'ratio':>7}")
+
+    slower = []
+    for size, cases in results.items():
+        for case, now in cases.items():
+            base = baseline["results"].get(size, {}).get(case)
+            if base is None:
+                print(f"{size:>8} {case:>24} {'-':>10} {1e3 * now:10.3f} {'new':>7}")
+                continue
+            ratio = now / base / speed
+            flag = ""
+            if ratio > threshold:
+                flag = "  SLOWER"
+                slower.append((size, case, ratio))
+            elif ratio < 1 / threshold:
+                flag = "  faster"
+            print(f"{size:>8} {case:>24} {1e3 * base:10.3f} {1e3 * now:10.3f} "
+                  f"{ratio:7.2f}{flag}")
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Post-processing benchmark suite")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    mt.set_verbose(False)
+    results = run_suite(args.sizes, args.cases, repeat=args.repeat)
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+    if args.compare:
+        slower = compare(results, args.baseline, threshold=args.threshold)
+        if slower:
+            print(f"\n{len(slower)} regression(s) above {args.threshold:.2f}x")
+            sys.exit(1)
+        print("\nNo regressions")
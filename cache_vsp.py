@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import contextlib
+
+
+# Bytes ocupados por cada cache segun este proceso {directorio: bytes}; los
+# workers del pool reciben una copia nueva de SolverCache en cada tarea,
+# asi que el total se guarda a nivel de modulo y dura lo que el worker
+_running_bytes = {}
+
+# Segundos de espera por stats.lock antes de darlo por abandonado (un
+# worker que murio con el bloqueo tomado)
+LOCK_TIMEOUT = 5.0
+
+
+class SolverCache:
+    """
+    Cache en disco de resultados CpSlicer (.slc) indexada por el hash de las
+    entradas efectivas del solver (geometria, condiciones de vuelo y
+    resolucion de paneles).
+
+    La expulsion es LRU por bytes: cada acierto actualiza la fecha de
+    modificacion de la entrada y, al superar max_bytes, se borran primero
+    las entradas usadas hace mas tiempo. El directorio solo se recorre
+    cuando el total acumulado por el proceso supera max_bytes; como cada
+    worker suma solo lo que el escribe, el limite puede excederse en lo que
+    escriban los demas entre dos recorridos. Solo usa operaciones atomicas
+    del sistema de archivos, asi que varios workers pueden compartirla.
+
+    Los aciertos y fallos de todas las campañas se acumulan en stats.json
+    (dos enteros); stats() da ademas los de la campaña actual, la
+    diferencia desde que se creo la instancia, contando los de los workers.
+    """
+
+    def __init__(self, directory, max_bytes=2 * 1024**3):
+        # Ruta absoluta: los workers de paralelo trabajan cada uno en su
+        # directorio scratch, que ademas se vacia tras cada configuracion
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        # Totales al empezar: stats() cuenta solo lo posterior
+        self._start = self._totals()
+
+    @staticmethod
+    def key(inputs):
+        """
+        Hash SHA-256 de un diccionario de entradas. Los floats se redondean a
+        12 cifras significativas para que el ruido de la ultima cifra no
+        genere claves distintas
+        """
+        def canonical(value):
+            if isinstance(value, dict):
+                return {k: canonical(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [canonical(v) for v in value]
+            if isinstance(value, float):
+                return float(f"{value:.12g}")
+            return value
+
+        text = json.dumps(canonical(inputs), sort_keys=True)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.slc")
+
+    def _stats_path(self):
+        return os.path.join(self.directory, "stats.json")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """
+        Bloqueo de stats.json entre procesos: stats.lock se crea en modo
+        exclusivo y se borra al salir
+        """
+        lock = os.path.join(self.directory, "stats.lock")
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(lock)
+                    deadline = time.monotonic() + LOCK_TIMEOUT
+                time.sleep(0.001)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(lock)
+
+    def _read_totals(self):
+        try:
+            with open(self._stats_path(), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def _totals(self):
+        with self._locked():
+            return self._read_totals()
+
+    def _count(self, event):
+        # Lectura y escritura bajo el bloqueo para no perder eventos de otros
+        # workers; os.replace nunca deja un stats.json a medias
+        with self._locked():
+            totals = self._read_totals()
+            totals[event] += 1
+            tmp = f"{self._stats_path()}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(totals, f)
+            os.replace(tmp, self._stats_path())
+
+    def fetch(self, key, dest):
+        """
+        Copia el resultado cacheado a dest
+
+        Returns:
+            bool: True si habia entrada para la clave
+        """
+        entry = self._entry(key)
+        try:
+            shutil.copyfile(entry, dest)
+        except FileNotFoundError:
+            self._count("misses")
+            return False
+
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            pass
+        self._count("hits")
+        return True
+
+    def store(self, key, src):
+        """
+        Guarda una copia de src bajo la clave y aplica la politica de expulsion
+        """
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        shutil.copyfile(src, tmp)
+        try:
+            replaced = os.path.getsize(entry)
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, entry)
+
+        if self.directory not in _running_bytes:
+            # Primer store del proceso: el recorrido ya incluye la entrada
+            self.evict()
+            return
+        _running_bytes[self.directory] += os.path.getsize(entry) - replaced
+        if _running_bytes[self.directory] > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        for root, dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".slc"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        Borra las entradas menos usadas hasta quedar por debajo de max_bytes
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        _running_bytes[self.directory] = total
+        return total
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses y hit_rate de esta campaña, total_hits y
+            total_misses acumulados, entries y bytes ocupados
+        """
+        totals = self._totals()
+        hits = totals["hits"] - self._start["hits"]
+        misses = totals["misses"] - self._start["misses"]
+        entries = self._entries()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "total_hits": totals["hits"],
+            "total_misses": totals["misses"],
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import functools
+import itertools
+import numpy as np
+import Organizador as org
+import test1 as t1
+import minimo as mn
+import paralelo as par
+import metricas as mt
+from manifiesto import RunManifest
+from almacen import DatasetStore
+from exportador import TensorExport
+
+STAGES = ("solve", "organize", "stats", "render", "validate")
+
+
+def _banner(n_done, n_total, stage):
+    print("\n" + "="*50)
+    print(f"Stage '{stage}': {n_done} of {n_total} configurations ready")
+    print("="*50)
+
+
+def iter_solve(configurations, indices, output_dir='.', n_workers=None, solver=None,
+               sweep=False):
+    """
+    Resultados del solver para los indices dados a medida que terminan
+    (vlm.iter_campaign con solver='vlm', si no paralelo.iter_campaign)
+    """
+    if isinstance(solver, str) and solver == "vlm":
+        import vlm
+        from CPWING import vlm_inputs
+        return vlm.iter_campaign(configurations, output_dir=output_dir, indices=indices,
+                                 **vlm_inputs())
+    return par.iter_campaign(configurations, output_dir=output_dir, n_workers=n_workers,
+                             solver=solver, indices=indices, sweep=sweep)
+
+
+def record_solve(manifest, result, metrics_log=None):
+    """
+    Registra en el manifiesto (y en metrics_log, un metricas.MetricsLog) un
+    resultado del solver
+
+    Returns:
+        bool: True si la configuracion quedo resuelta
+    """
+    if metrics_log is not None:
+        metrics_log.write_solve(result)
+    if result["error"] is None:
+        manifest.record(result["idx"], "solve", "ok", outputs=[result["path"]],
+                        duration=result["duration"])
+        return True
+    print(f"❌ Error in configuration {result['idx']}: {result['error']}")
+    manifest.record(result["idx"], "solve", "failed", duration=result["duration"],
+                    error=result["error"])
+    return False
+
+
+def stage_solve(configurations, manifest, output_dir='.', n_workers=None, solver=None,
+                sweep=False, metrics_log=None):
+    """
+    Resuelve en paralelo las configuraciones sin un .slc valido. Con
+    solver='vlm' se resuelven por bloques en este proceso (vlm.iter_campaign,
+    que ya comparte la matriz de cada geometria y Mach); con sweep=True cada
+    worker resuelve todas las condiciones pendientes de una geometria
+    (paralelo.iter_campaign)
+    """
+    indices = range(len(configurations))
+    pending = manifest.pending(indices, "solve")
+
+    for result in iter_solve(configurations, pending, output_dir=output_dir,
+                             n_workers=n_workers, solver=solver, sweep=sweep):
+        record_solve(manifest, result, metrics_log=metrics_log)
+
+    _banner(len(indices) - len(manifest.pending(indices, "solve")), len(indices), "solve")
+
+
+def organize_one(idx, manifest, output_dir='.', store=None, metrics_log=None):
+    """
+    Convierte {idx}.slc a {idx}.txt (y al almacen) y lo registra
+
+    Returns:
+        tuple: (x, y, dcp) tal como quedan en {idx}.txt, o None si falla
+    """
+    input_filename = os.path.join(output_dir, f"{idx}.slc")
+    output_columns = os.path.join(output_dir, f"{idx}.txt")
+    inicio = time.perf_counter()
+    try:
+        x, y, dcp = org.process_cp_data(input_filename, output_columns=output_columns)
+        # El .txt y el almacen guardan el dCp a 4 decimales
+        dcp = org.round4(dcp)
+        if store is not None:
+            store.write(idx, x, y, dcp)
+    except Exception as exc:
+        manifest.record(idx, "organize", "failed", duration=time.perf_counter() - inicio,
+                        error=f"{type(exc).__name__}: {exc}")
+        return None
+    duration = time.perf_counter() - inicio
+    manifest.record(idx, "organize", "ok", outputs=[output_columns], duration=duration)
+    if metrics_log is not None:
+        metrics_log.write(idx, "parse", duration, bytes=mt.file_bytes(output_columns))
+    return x, y, dcp
+
+
+def record_stats(idx, manifest, stats):
+    """
+    Registra las estadisticas dCp de una configuracion (minimo.array_stats
+    o minimo.file_stats)
+    """
+    if stats["count"] == 0:
+        manifest.record(idx, "stats", "failed")
+        return
+    manifest.record(idx, "stats", "ok", dcp_min=stats["min"], dcp_max=stats["max"],
+                    count=stats["count"], mean=stats["mean"], m2=stats["m2"])
+
+
+def stage_organize(configurations, manifest, output_dir='.', store=None, metrics_log=None):
+    """
+    Convierte cada {idx}.slc resuelto a {idx}.txt en columnas X Y dCp y, si
+    se da un DatasetStore, guarda tambien sus arrays en el almacen
+    """
+    indices = [idx for idx in range(len(configurations)) if manifest.is_done(idx, "solve")]
+
+    for idx in manifest.pending(indices, "organize", after="solve"):
+        organize_one(idx, manifest, output_dir=output_dir, store=store,
+                     metrics_log=metrics_log)
+
+    if store is not None:
+        store.flush()
+    _banner(len(indices) - len(manifest.pending(indices, "organize", after="solve")),
+            len(configurations), "organize")
+
+
+def stage_stats(configurations, manifest, output_dir='.', store=None, n_workers=None,
+                metrics_log=None):
+    """
+    Guarda en el manifiesto las estadisticas dCp de cada {idx}.txt (una sola
+    lectura por archivo, en paralelo) y las combina en el rango global; los
+    indices ya medidos no se vuelven a leer. Con un DatasetStore se leen del
+    almacen las configuraciones que ya tiene, en vez de sus .txt
+
+    Returns:
+        tuple: (all_min, all_max)
+    """
+    indices = [idx for idx in range(len(configurations)) if manifest.is_done(idx, "organize")]
+    pending = manifest.pending(indices, "stats", after="organize")
+    in_store = ([idx for idx in pending if store.filled[idx]] if store is not None else [])
+    from_files = sorted(set(pending) - set(in_store))
+    files = [os.path.join(output_dir, f"{idx}.txt") for idx in from_files]
+    measured = itertools.chain(zip(in_store, mn.iter_store_stats(store, in_store)),
+                               zip(from_files, mn.iter_file_stats(files, n_workers=n_workers)))
+
+    inicio = time.perf_counter()
+    for idx, stats in measured:
+        record_stats(idx, manifest, stats)
+        if metrics_log is not None:
+            # Los archivos se leen en paralelo: cada uno cuenta el tiempo
+            # desde el anterior
+            metrics_log.write(idx, "stats", time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+
+    total = {"count": 0, "mean": 0.0, "m2": 0.0, "min": float('inf'), "max": float('-inf')}
+    for idx in indices:
+        if manifest.is_done(idx, "stats", after="organize"):
+            record = manifest.get(idx, "stats")
+            total = mn.merge_stats(total, {"count": record["count"], "mean": record["mean"],
+                                           "m2": record["m2"], "min": record["dcp_min"],
+                                           "max": record["dcp_max"]})
+    total = mn.finalize_stats(total)
+    all_min, all_max = total["min"], total["max"]
+
+    if store is not None:
+        store.set_stats(dcp_min=all_min, dcp_max=all_max, count=total["count"],
+                        mean=total["mean"], std=total["std"])
+    print(f"Global dCp range: [{all_min}, {all_max}] | mean {total['mean']:.4f} "
+          f"| std {total['std']:.4f} | {total['count']} points")
+    return all_min, all_max
+
+
+def stage_render(configurations, manifest, all_min, all_max, output_dir='.',
+                 renderer='matplotlib', export=None, grids=None, store=None, metrics_log=None):
+    """
+    Genera {idx}.png para los indices sin imagen o renderizados con otro
+    rango global u otro renderer ('matplotlib' o 'raster')
+
+    Con una TensorExport no se escriben PNG: cada imagen va directamente a
+    su fila del array [N, H, W] de la exportacion; si es de campo
+    (export.field) se guarda el dCp de cada pixel, que no depende del rango
+    global, asi que un extremo nuevo no obliga a renderizar de nuevo. grids ({idx: (XN, YN, PP)},
+    ver flujo.py) evita releer y remuestrear los {idx}.txt que ya estan en
+    memoria, y con un DatasetStore los puntos se leen del almacen
+    """
+    grids = {} if grids is None else grids
+    if export is not None:
+        renderer = f"export-{'field-' if export.field else ''}{export.meta['dtype']}"
+        output_images = os.path.join(export.path, "images.npy")
+    current_range = ({} if export is not None and export.field
+                     else {"dcp_min": all_min, "dcp_max": all_max})
+
+    def pending_render(indices):
+        pending = manifest.pending(indices, "render", after="stats", renderer=renderer,
+                                   **current_range)
+        if export is not None:
+            # Una exportacion recreada tiene filas vacias aunque el
+            # manifiesto las de por hechas
+            done = set(indices) - set(pending)
+            pending += [idx for idx in sorted(done) if not export.filled[idx]]
+        return pending
+
+    indices = [idx for idx in range(len(configurations)) if manifest.is_done(idx, "stats")]
+
+    for idx in pending_render(indices):
+        input_filename = os.path.join(output_dir, f"{idx}.txt")
+        inicio = time.perf_counter()
+        try:
+            if idx not in grids and store is not None and store.filled[idx]:
+                grids[idx] = t1.resample_sections(np.column_stack(store.read(idx)))[:3]
+            if export is None:
+                output_pic = os.path.join(output_dir, f"{idx}.png")
+                if idx in grids:
+                    t1.render_grid(output_pic, *grids[idx], all_min, all_max,
+                                   renderer=renderer)
+                else:
+                    t1.normalizador(input_filename, output_pic, all_min, all_max,
+                                    renderer=renderer)
+            else:
+                output_pic = output_images
+                if idx in grids:
+                    XN, YN, PP = grids[idx]
+                else:
+                    XN, YN, PP, py = t1.resample_sections(np.loadtxt(input_filename))
+                if export.field:
+                    export.write(idx, t1.render_dcp(XN, YN, PP, size=export.size,
+                                                    dtype=export.images.dtype))
+                else:
+                    export.write(idx, t1.render_raster(XN, YN, PP, all_min, all_max,
+                                                       size=export.size,
+                                                       normalized=export.normalized))
+        except Exception as exc:
+            manifest.record(idx, "render", "failed", duration=time.perf_counter() - inicio,
+                            error=f"{type(exc).__name__}: {exc}")
+            continue
+        duration = time.perf_counter() - inicio
+        manifest.record(idx, "render", "ok", outputs=[output_pic], duration=duration,
+                        dcp_min=all_min, dcp_max=all_max, renderer=renderer)
+        if metrics_log is not None:
+            metrics_log.write(idx, "render", duration,
+                              bytes=(mt.file_bytes(output_pic) if export is None
+                                     else export.images[idx].nbytes))
+
+    if export is not None:
+        export.flush()
+        export.set_range(all_min, all_max)
+    _banner(len(indices) - len(pending_render(indices)), len(configurations), "render")
+
+
+def stage_validate(configurations, manifest, output_dir='.', n_workers=None,
+                   report_path='validation_report.csv', top=10, metrics_log=None):
+    """
+    Reconstruye cada {idx}.png a dCp con el rango global con el que se
+    renderizo, lo denormaliza y lo compara con su {idx}.txt (validacion.py).
+    Las metricas quedan en el manifiesto, asi que solo se validan las
+    imagenes nuevas o re-renderizadas, y el informe ordena de peor a mejor
+    todas las configuraciones validadas
+
+    Returns:
+        pd.DataFrame: informe ordenado por RMSE (None si no hay imagenes)
+    """
+    # validacion trae pandas y matplotlib: solo se importa si se valida
+    import validacion as val
+
+    # Solo las imagenes PNG; la exportacion a tensor no deja archivos por idx
+    indices = [idx for idx in range(len(configurations))
+               if manifest.is_done(idx, "render")
+               and manifest.get(idx, "render")["outputs"][0].endswith(".png")]
+    pending = manifest.pending(indices, "validate", after="render")
+
+    tasks = []
+    for idx in pending:
+        render = manifest.get(idx, "render")
+        tasks.append((idx, render["outputs"][0], os.path.join(output_dir, f"{idx}.txt"),
+                      configurations[idx], render["dcp_min"], render["dcp_max"]))
+
+    for idx, metrics, error, duration in val.iter_validation(tasks, n_workers=n_workers):
+        if metrics_log is not None:
+            metrics_log.write(idx, "validate", duration,
+                              status="ok" if metrics is not None else "failed")
+        if metrics is None:
+            manifest.record(idx, "validate", "failed", duration=duration, error=error)
+            continue
+        manifest.record(idx, "validate", "ok", duration=duration, **val.summary_row(metrics))
+
+    _banner(len(indices) - len(manifest.pending(indices, "validate", after="render")),
+            len(configurations), "validate")
+
+    rows = [manifest.get(idx, "validate") for idx in indices
+            if manifest.is_done(idx, "validate", after="render")]
+    if not rows:
+        return None
+    return val.write_report(rows, os.path.join(output_dir, report_path), top=top)
+
+
+def open_store(store_path, configurations):
+    """
+    Abre el almacen de la campaña o lo crea si aun no existe, con una
+    seccion por corte del CpSlicer (CPWING.NUMBER_CUT); si una configuracion
+    trae mas secciones o puntos, DatasetStore.write lo amplia
+    """
+    if not os.path.exists(os.path.join(store_path, "meta.json")):
+        from CPWING import NUMBER_CUT
+        return DatasetStore.create(store_path, configurations, n_sections=NUMBER_CUT)
+
+    store = DatasetStore(store_path, mode='r+')
+    if store.content != "solver":
+        raise ValueError(f"Store {store_path} holds {store.content} fields, not the "
+                         f"campaign's solver fields")
+    if len(store) < len(configurations):
+        # Poblacion ampliada con parametros.generate_configurations(append=True)
+        store.grow(configurations)
+    elif len(store) != len(configurations):
+        raise ValueError(f"Store {store_path} holds {len(store)} configurations, "
+                         f"campaign has {len(configurations)}")
+    return store
+
+
+def open_export(export_path, configurations, dtype=np.uint8, field=False):
+    """
+    Abre la exportacion de tensores de la campaña o la crea si aun no existe
+    """
+    if not os.path.exists(os.path.join(export_path, "meta.json")):
+        return TensorExport.create(export_path, configurations, dtype=dtype, field=field)
+
+    export = TensorExport(export_path, mode='r+')
+    if len(export) < len(configurations):
+        export.grow(configurations)
+    elif len(export) != len(configurations):
+        raise ValueError(f"Export {export_path} holds {len(export)} configurations, "
+                         f"campaign has {len(configurations)}")
+    if export.meta["dtype"] != np.dtype(dtype).name:
+        raise ValueError(f"Export {export_path} is {export.meta['dtype']}, "
+                         f"requested {np.dtype(dtype).name}")
+    if export.field != field:
+        raise ValueError(f"Export {export_path} has field={export.field}, requested {field}")
+    return export
+
+
+def run_stages(configurations, manifest_path='campaign_manifest.jsonl', output_dir='.',
+               n_workers=None, solver=None, cache=None, store_path=None,
+               renderer='matplotlib', export_path=None, export_dtype=np.uint8,
+               validate=False, sweep=False, export_field=False, metrics_path=None):
+    """
+    Ejecuta las cuatro etapas de la campaña. Al relanzarse con el mismo
+    manifiesto solo repite lo que falta, fallo o quedo obsoleto
+
+    Si se da una SolverCache (y el solver por defecto), cada worker la
+    consulta antes de lanzar VSPAERO; solver='vlm' resuelve con vlm.py.
+    Con store_path los campos dCp y el rango global se guardan ademas en un
+    DatasetStore. renderer elige como
+    se generan las imagenes (ver test1.normalizador); con export_path se
+    escriben en un unico array [N, H, W] (TensorExport) en vez de PNG, y
+    con export_field=True ese array guarda el dCp de cada pixel (float16 o
+    float32) y se normaliza al leerlo (TensorExport.read/requantize).
+    Con validate=True se añade la validacion de ida y vuelta de las imagenes.
+    Con sweep=True cada geometria se construye una vez para todas sus
+    condiciones de vuelo (parametros.condition_table). Con metrics_path se
+    escriben las metricas por configuracion y etapa (metricas.MetricsLog) y
+    al final se imprime su resumen
+
+    Returns:
+        tuple: (all_min, all_max) rango dCp global de la campaña
+    """
+    manifest = RunManifest(manifest_path)
+    metrics_log = mt.MetricsLog(metrics_path) if metrics_path is not None else None
+    store = open_store(store_path, configurations) if store_path is not None else None
+    export = (open_export(export_path, configurations, dtype=export_dtype, field=export_field)
+              if export_path is not None else None)
+    if solver is None and cache is not None:
+        solver = functools.partial(par.vsp_sweep_solver if sweep else par.vsp_solver,
+                                   cache=cache)
+
+    stage_solve(configurations, manifest, output_dir=output_dir,
+                n_workers=n_workers, solver=solver, sweep=sweep, metrics_log=metrics_log)
+    stage_organize(configurations, manifest, output_dir=output_dir, store=store,
+                   metrics_log=metrics_log)
+    all_min, all_max = stage_stats(configurations, manifest, output_dir=output_dir,
+                                   store=store, n_workers=n_workers, metrics_log=metrics_log)
+    stage_render(configurations, manifest, all_min, all_max, output_dir=output_dir,
+                 renderer=renderer, export=export, store=store, metrics_log=metrics_log)
+    if validate:
+        stage_validate(configurations, manifest, output_dir=output_dir, n_workers=n_workers,
+                       metrics_log=metrics_log)
+
+    if metrics_log is not None and os.path.exists(metrics_path):
+        mt.summary(metrics_path)
+    return all_min, all_max
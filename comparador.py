@@ -1,244 +1,390 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Thu Oct  2 11:23:27 2025
-
-@author: Aspirant2
-"""
-
-import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-
-def plot_two_surfaces_3d_formatted(file1_path, file2_path, title="Comparación 3D", 
-                                  label1="Superficie 1", label2="Superficie 2",
-                                  cmap1='viridis', cmap2='plasma'):
-    """
-    Dibuja dos superficies 3D a partir de archivos .txt con formato:
-    X Y Cp (cada fila representa un punto en la superficie del ala)
-    
-    Parameters:
-    - file1_path, file2_path: rutas de los archivos .txt
-    - title: título del gráfico
-    - label1, label2: etiquetas para las superficies
-    - cmap1, cmap2: mapas de color para cada superficie
-    """
-    
-    # Cargar datos
-    data1 = np.loadtxt(file1_path)
-    data2 = np.loadtxt(file2_path)
-    
-    # Extraer coordenadas
-    x1, y1, z1 = data1[:, 0], data1[:, 1], data1[:, 2]  # X Y Cp
-    x2, y2, z2 = data2[:, 0], data2[:, 1], data2[:, 2]  # X Y Cp
-    
-    # Crear mallas regulares para superficies
-    # Obtener valores únicos de X e Y
-    x1_unique = np.unique(x1)
-    y1_unique = np.unique(y1)
-    x2_unique = np.unique(x2)
-    y2_unique = np.unique(y2)
-    
-    # Crear matrices de malla
-    X1_mesh, Y1_mesh = np.meshgrid(x1_unique, y1_unique)
-    X2_mesh, Y2_mesh = np.meshgrid(x2_unique, y2_unique)
-    
-    # Crear matrices Z interpoladas
-    Z1 = np.full_like(X1_mesh, np.nan)
-    Z2 = np.full_like(X2_mesh, np.nan)
-    
-    # Mapear valores Z a las matrices de malla
-    for i, y_val in enumerate(y1_unique):
-        for j, x_val in enumerate(x1_unique):
-            mask = (x1 == x_val) & (y1 == y_val)
-            if np.any(mask):
-                Z1[i, j] = z1[mask][0]  # Tomar primer valor encontrado
-    
-    for i, y_val in enumerate(y2_unique):
-        for j, x_val in enumerate(x2_unique):
-            mask = (x2 == x_val) & (y2 == y_val)
-            if np.any(mask):
-                Z2[i, j] = z2[mask][0]  # Tomar primer valor encontrado
-    
-    # Crear figura 3D
-    fig = plt.figure(figsize=(15, 5))
-    
-    # Subplot 1: Ambas superficies en el mismo gráfico
-    ax1 = fig.add_subplot(131, projection='3d')
-    surf1 = ax1.plot_surface(X1_mesh, Y1_mesh, Z1, alpha=0.6, cmap=cmap1, label=label1)
-    surf2 = ax1.plot_surface(X2_mesh, Y2_mesh, Z2, alpha=0.6, cmap=cmap2, label=label2)
-    ax1.set_xlabel('X (m)')
-    ax1.set_ylabel('Y (m)')
-    ax1.set_zlabel('Cp')
-    ax1.set_title(f'{title} - Superposición')
-    
-    # Subplot 2: Superficie 1 sola
-    ax2 = fig.add_subplot(132, projection='3d')
-    surf1_only = ax2.plot_surface(X1_mesh, Y1_mesh, Z1, alpha=0.8, cmap=cmap1)
-    ax2.set_xlabel('X (m)')
-    ax2.set_ylabel('Y (m)')
-    ax2.set_zlabel('Cp')
-    ax2.set_title(f'{label1}')
-    
-    # Subplot 3: Superficie 2 sola
-    ax3 = fig.add_subplot(133, projection='3d')
-    surf2_only = ax3.plot_surface(X2_mesh, Y2_mesh, Z2, alpha=0.8, cmap=cmap2)
-    ax3.set_xlabel('X (m)')
-    ax3.set_ylabel('Y (m)')
-    ax3.set_zlabel('Cp')
-    ax3.set_title(f'{label2}')
-    
-    plt.tight_layout()
-    plt.show()
-    
-    return fig
-
-
-def plot_two_surfaces_scatter(file1_path, file2_path, title="Comparación 3D", 
-                             label1="Superficie 1", label2="Superficie 2"):
-    """
-    Versión con scatter plots para datos dispersos
-    """
-    
-    # Cargar datos
-    data1 = np.loadtxt(file1_path)
-    data2 = np.loadtxt(file2_path)
-    
-    # Extraer coordenadas
-    x1, y1, z1 = data1[:, 0], data1[:, 1], data1[:, 2]
-    x2, y2, z2 = data2[:, 0], data2[:, 1], data2[:, 2]
-    
-    # Crear figura
-    fig = plt.figure(figsize=(12, 4))
-    
-    # Subplot 1: Ambas superficies como scatter
-    ax1 = fig.add_subplot(131, projection='3d')
-    scatter1 = ax1.scatter(x1, y1, z1, c=z1, cmap='viridis', alpha=0.6, label=label1)
-    scatter2 = ax1.scatter(x2, y2, z2, c=z2, cmap='plasma', alpha=0.6, label=label2)
-    ax1.set_xlabel('X (m)')
-    ax1.set_ylabel('Y (m)')
-    ax1.set_zlabel('Cp')
-    ax1.set_title(f'{title} - Scatter')
-    plt.colorbar(scatter1, ax=ax1, shrink=0.5, aspect=10)
-    
-    # Subplot 2: Superficie 1
-    ax2 = fig.add_subplot(132, projection='3d')
-    scatter1_only = ax2.scatter(x1, y1, z1, c=z1, cmap='viridis', alpha=0.8)
-    ax2.set_xlabel('X (m)')
-    ax2.set_ylabel('Y (m)')
-    ax2.set_zlabel('Cp')
-    ax2.set_title(f'{label1}')
-    plt.colorbar(scatter1_only, ax=ax2, shrink=0.5, aspect=10)
-    
-    # Subplot 3: Superficie 2
-    ax3 = fig.add_subplot(133, projection='3d')
-    scatter2_only = ax3.scatter(x2, y2, z2, c=z2, cmap='plasma', alpha=0.8)
-    ax3.set_xlabel('X (m)')
-    ax3.set_ylabel('Y (m)')
-    ax3.set_zlabel('Cp')
-    ax3.set_title(f'{label2}')
-    plt.colorbar(scatter2_only, ax=ax3, shrink=0.5, aspect=10)
-    
-    plt.tight_layout()
-    plt.show()
-    
-    return fig
-
-
-def compare_cp_distributions(file1_path, file2_path, title="Comparación Cp"):
-    """
-    Comparación adicional de distribuciones Cp
-    """
-    
-    data1 = np.loadtxt(file1_path)
-    data2 = np.loadtxt(file2_path)
-    
-    z1 = data1[:, 2]  # Cp valores
-    z2 = data2[:, 2]  # Cp valores
-    
-    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
-    
-    # Histogramas
-    axes[0,0].hist(z1, bins=50, alpha=0.7, label='Superficie 1', density=True)
-    axes[0,0].hist(z2, bins=50, alpha=0.7, label='Superficie 2', density=True)
-    axes[0,0].set_title('Distribución Cp')
-    axes[0,0].legend()
-    axes[0,0].set_xlabel('Cp')
-    axes[0,0].set_ylabel('Densidad')
-    
-    # Comparación de valores
-    axes[0,1].scatter(range(len(z1)), z1, alpha=0.6, label='Superficie 1', s=1)
-    axes[0,1].scatter(range(len(z2)), z2, alpha=0.6, label='Superficie 2', s=1)
-    axes[0,1].set_title('Serie temporal Cp')
-    axes[0,1].legend()
-    axes[0,1].set_xlabel('Índice')
-    axes[0,1].set_ylabel('Cp')
-    
-    # Estadísticas
-    stats_data = [
-        [np.min(z1), np.max(z1), np.mean(z1), np.std(z1)],
-        [np.min(z2), np.max(z2), np.mean(z2), np.std(z2)]
-    ]
-    
-    import pandas as pd
-    stats_df = pd.DataFrame(stats_data, 
-                           columns=['Mínimo', 'Máximo', 'Media', 'Std'], 
-                           index=['Superficie 1', 'Superficie 2'])
-    
-    # Mostrar tabla de estadísticas
-    axes[1,0].axis('tight')
-    axes[1,0].axis('off')
-    table = axes[1,0].table(cellText=stats_df.values,
-                           colLabels=stats_df.columns,
-                           rowLabels=stats_df.index,
-                           cellLoc='center',
-                           loc='center')
-    table.auto_set_font_size(False)
-    table.set_fontsize(10)
-    axes[1,0].set_title('Estadísticas Cp')
-    
-    # Diferencia absoluta
-    min_len = min(len(z1), len(z2))
-    z1_trimmed = z1[:min_len]
-    z2_trimmed = z2[:min_len]
-    diff = np.abs(z1_trimmed - z2_trimmed)
-    
-    axes[1,1].plot(diff, alpha=0.7)
-    axes[1,1].set_title('Diferencia absoluta Cp')
-    axes[1,1].set_xlabel('Índice')
-    axes[1,1].set_ylabel('|Cp1 - Cp2|')
-    
-    plt.tight_layout()
-    plt.show()
-    
-    return fig, stats_df
-
-
-# Ejemplo de uso:
-if __name__ == "__main__":
-    # Dibujar superficies
-    fig1 = plot_two_surfaces_3d_formatted(
-        '0.txt',      # archivo de ejemplo 1
-        '0_denormalized.txt',      # archivo de ejemplo 2
-        title="Comparación Distribución Cp",
-        label1="Ala A",
-        label2="Ala B"
-    )
-    
-    # Alternativamente, usar scatter para datos dispersos
-    fig2 = plot_two_surfaces_scatter(
-        '0.txt',
-        '0_denormalized.txt',
-        title="Comparación Cp 3D",
-        label1="Ala A", 
-        label2="Ala B"
-    )
-    
-    # Comparación estadística
-    fig3, stats = compare_cp_distributions(
-        '0.txt',
-        '0_denormalized.txt',
-        title="Comparación Estadística Cp"
-    )
-    
-    print("Estadísticas de Cp:")
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct  2 11:23:27 2025
+
+@author: Aspirant2
+"""
+
+import os
+import re
+import functools
+import numpy as np
+
+def grid_surface(x, y, z):
+    """
+    Coloca los puntos X Y Cp en una malla (valores unicos de Y, de X);
+    los nodos sin punto quedan en NaN y, si un nodo se repite, cuenta el
+    primer valor encontrado
+
+    Returns:
+        tuple: (X_mesh, Y_mesh, Z) de forma [len(y_unique), len(x_unique)]
+    """
+    x_unique, ix = np.unique(x, return_inverse=True)
+    y_unique, iy = np.unique(y, return_inverse=True)
+    X_mesh, Y_mesh = np.meshgrid(x_unique, y_unique)
+    
+    Z = np.full(X_mesh.shape, np.nan)
+    flat, first = np.unique(iy * len(x_unique) + ix, return_index=True)
+    Z.flat[flat] = z[first]
+    return X_mesh, Y_mesh, Z
+
+
+def _finish(fig, show, save_path):
+    """
+    Muestra y/o guarda la figura; sin mostrarla se cierra tras guardar
+    """
+    import matplotlib.pyplot as plt
+    if save_path is not None:
+        fig.savefig(save_path)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+
+def plot_two_surfaces_3d_formatted(file1_path, file2_path, title="Comparación 3D", 
+                                  label1="Superficie 1", label2="Superficie 2",
+                                  cmap1='viridis', cmap2='plasma', show=True, save_path=None):
+    """
+    Dibuja dos superficies 3D a partir de archivos .txt con formato:
+    X Y Cp (cada fila representa un punto en la superficie del ala)
+    
+    Parameters:
+    - file1_path, file2_path: rutas de los archivos .txt
+    - title: título del gráfico
+    - label1, label2: etiquetas para las superficies
+    - cmap1, cmap2: mapas de color para cada superficie
+    - show: mostrar la figura (False para ejecutar sin pantalla)
+    - save_path: ruta donde guardar la figura, opcional
+    """
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+    
+    # Cargar datos
+    data1 = np.loadtxt(file1_path)
+    data2 = np.loadtxt(file2_path)
+    
+    # Extraer coordenadas
+    x1, y1, z1 = data1[:, 0], data1[:, 1], data1[:, 2]  # X Y Cp
+    x2, y2, z2 = data2[:, 0], data2[:, 1], data2[:, 2]  # X Y Cp
+    
+    # Crear mallas regulares para superficies (valores únicos de X e Y)
+    X1_mesh, Y1_mesh, Z1 = grid_surface(x1, y1, z1)
+    X2_mesh, Y2_mesh, Z2 = grid_surface(x2, y2, z2)
+    
+    # Crear figura 3D
+    fig = plt.figure(figsize=(15, 5))
+    
+    # Subplot 1: Ambas superficies en el mismo gráfico
+    ax1 = fig.add_subplot(131, projection='3d')
+    surf1 = ax1.plot_surface(X1_mesh, Y1_mesh, Z1, alpha=0.6, cmap=cmap1, label=label1)
+    surf2 = ax1.plot_surface(X2_mesh, Y2_mesh, Z2, alpha=0.6, cmap=cmap2, label=label2)
+    ax1.set_xlabel('X (m)')
+    ax1.set_ylabel('Y (m)')
+    ax1.set_zlabel('Cp')
+    ax1.set_title(f'{title} - Superposición')
+    
+    # Subplot 2: Superficie 1 sola
+    ax2 = fig.add_subplot(132, projection='3d')
+    surf1_only = ax2.plot_surface(X1_mesh, Y1_mesh, Z1, alpha=0.8, cmap=cmap1)
+    ax2.set_xlabel('X (m)')
+    ax2.set_ylabel('Y (m)')
+    ax2.set_zlabel('Cp')
+    ax2.set_title(f'{label1}')
+    
+    # Subplot 3: Superficie 2 sola
+    ax3 = fig.add_subplot(133, projection='3d')
+    surf2_only = ax3.plot_surface(X2_mesh, Y2_mesh, Z2, alpha=0.8, cmap=cmap2)
+    ax3.set_xlabel('X (m)')
+    ax3.set_ylabel('Y (m)')
+    ax3.set_zlabel('Cp')
+    ax3.set_title(f'{label2}')
+    
+    plt.tight_layout()
+    _finish(fig, show, save_path)
+    
+    return fig
+
+
+def plot_two_surfaces_scatter(file1_path, file2_path, title="Comparación 3D", 
+                             label1="Superficie 1", label2="Superficie 2",
+                             show=True, save_path=None):
+    """
+    Versión con scatter plots para datos dispersos
+    """
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+    
+    # Cargar datos
+    data1 = np.loadtxt(file1_path)
+    data2 = np.loadtxt(file2_path)
+    
+    # Extraer coordenadas
+    x1, y1, z1 = data1[:, 0], data1[:, 1], data1[:, 2]
+    x2, y2, z2 = data2[:, 0], data2[:, 1], data2[:, 2]
+    
+    # Crear figura
+    fig = plt.figure(figsize=(12, 4))
+    
+    # Subplot 1: Ambas superficies como scatter
+    ax1 = fig.add_subplot(131, projection='3d')
+    scatter1 = ax1.scatter(x1, y1, z1, c=z1, cmap='viridis', alpha=0.6, label=label1)
+    scatter2 = ax1.scatter(x2, y2, z2, c=z2, cmap='plasma', alpha=0.6, label=label2)
+    ax1.set_xlabel('X (m)')
+    ax1.set_ylabel('Y (m)')
+    ax1.set_zlabel('Cp')
+    ax1.set_title(f'{title} - Scatter')
+    plt.colorbar(scatter1, ax=ax1, shrink=0.5, aspect=10)
+    
+    # Subplot 2: Superficie 1
+    ax2 = fig.add_subplot(132, projection='3d')
+    scatter1_only = ax2.scatter(x1, y1, z1, c=z1, cmap='viridis', alpha=0.8)
+    ax2.set_xlabel('X (m)')
+    ax2.set_ylabel('Y (m)')
+    ax2.set_zlabel('Cp')
+    ax2.set_title(f'{label1}')
+    plt.colorbar(scatter1_only, ax=ax2, shrink=0.5, aspect=10)
+    
+    # Subplot 3: Superficie 2
+    ax3 = fig.add_subplot(133, projection='3d')
+    scatter2_only = ax3.scatter(x2, y2, z2, c=z2, cmap='plasma', alpha=0.8)
+    ax3.set_xlabel('X (m)')
+    ax3.set_ylabel('Y (m)')
+    ax3.set_zlabel('Cp')
+    ax3.set_title(f'{label2}')
+    plt.colorbar(scatter2_only, ax=ax3, shrink=0.5, aspect=10)
+    
+    plt.tight_layout()
+    _finish(fig, show, save_path)
+    
+    return fig
+
+
+def compare_cp_distributions(file1_path, file2_path, title="Comparación Cp",
+                             show=True, save_path=None):
+    """
+    Comparación adicional de distribuciones Cp
+    """
+    import matplotlib.pyplot as plt
+    
+    data1 = np.loadtxt(file1_path)
+    data2 = np.loadtxt(file2_path)
+    
+    z1 = data1[:, 2]  # Cp valores
+    z2 = data2[:, 2]  # Cp valores
+    
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    
+    # Histogramas
+    axes[0,0].hist(z1, bins=50, alpha=0.7, label='Superficie 1', density=True)
+    axes[0,0].hist(z2, bins=50, alpha=0.7, label='Superficie 2', density=True)
+    axes[0,0].set_title('Distribución Cp')
+    axes[0,0].legend()
+    axes[0,0].set_xlabel('Cp')
+    axes[0,0].set_ylabel('Densidad')
+    
+    # Comparación de valores
+    axes[0,1].scatter(range(len(z1)), z1, alpha=0.6, label='Superficie 1', s=1)
+    axes[0,1].scatter(range(len(z2)), z2, alpha=0.6, label='Superficie 2', s=1)
+    axes[0,1].set_title('Serie temporal Cp')
+    axes[0,1].legend()
+    axes[0,1].set_xlabel('Índice')
+    axes[0,1].set_ylabel('Cp')
+    
+    # Estadísticas
+    stats_data = [
+        [np.min(z1), np.max(z1), np.mean(z1), np.std(z1)],
+        [np.min(z2), np.max(z2), np.mean(z2), np.std(z2)]
+    ]
+    
+    import pandas as pd
+    stats_df = pd.DataFrame(stats_data, 
+                           columns=['Mínimo', 'Máximo', 'Media', 'Std'], 
+                           index=['Superficie 1', 'Superficie 2'])
+    
+    # Mostrar tabla de estadísticas
+    axes[1,0].axis('tight')
+    axes[1,0].axis('off')
+    table = axes[1,0].table(cellText=stats_df.values,
+                           colLabels=stats_df.columns,
+                           rowLabels=stats_df.index,
+                           cellLoc='center',
+                           loc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    axes[1,0].set_title('Estadísticas Cp')
+    
+    # Diferencia absoluta
+    min_len = min(len(z1), len(z2))
+    z1_trimmed = z1[:min_len]
+    z2_trimmed = z2[:min_len]
+    diff = np.abs(z1_trimmed - z2_trimmed)
+    
+    axes[1,1].plot(diff, alpha=0.7)
+    axes[1,1].set_title('Diferencia absoluta Cp')
+    axes[1,1].set_xlabel('Índice')
+    axes[1,1].set_ylabel('|Cp1 - Cp2|')
+    
+    plt.tight_layout()
+    _finish(fig, show, save_path)
+    
+    return fig, stats_df
+
+
+def error_metrics(original_path, reconstructed_path):
+    """
+    Error del campo reconstruido respecto al original (ver field_errors)
+    """
+    return field_errors(np.loadtxt(original_path, ndmin=2),
+                        np.loadtxt(reconstructed_path, ndmin=2))
+
+
+def field_errors(original, reconstructed):
+    """
+    Error de un campo X Y Cp reconstruido respecto al original
+
+    El campo reconstruido se interpola linealmente en los puntos del
+    original (los puntos fuera de su envolvente no cuentan); el error por
+    seccion agrupa los puntos del original por su Y
+
+    Returns:
+        dict: rmse, max_abs, mean_abs, n_points, n_compared y, por seccion,
+        section_y, section_rmse y section_max
+    """
+    from scipy.interpolate import griddata
+
+    estimate = griddata(reconstructed[:, :2], reconstructed[:, 2], original[:, :2],
+                        method='linear')
+    error = estimate - original[:, 2]
+    valid = ~np.isnan(error)
+    error = error[valid]
+    
+    section_y, section = np.unique(original[valid, 1], return_inverse=True)
+    counts = np.bincount(section, minlength=len(section_y))
+    with np.errstate(invalid='ignore'):
+        section_rmse = np.sqrt(np.bincount(section, error**2, len(section_y)) / counts)
+    section_max = np.zeros(len(section_y))
+    np.maximum.at(section_max, section, np.abs(error))
+    
+    return {
+        "rmse": float(np.sqrt(np.mean(error**2))) if len(error) else np.nan,
+        "max_abs": float(np.max(np.abs(error))) if len(error) else np.nan,
+        "mean_abs": float(np.mean(np.abs(error))) if len(error) else np.nan,
+        "n_points": len(original),
+        "n_compared": int(valid.sum()),
+        "section_y": section_y,
+        "section_rmse": section_rmse,
+        "section_max": section_max,
+    }
+
+
+def _compare_pair(pair, figures_dir):
+    idx, original_path, reconstructed_path = pair
+    try:
+        metrics = error_metrics(original_path, reconstructed_path)
+    except Exception as exc:
+        return idx, None, f"{type(exc).__name__}: {exc}"
+    if figures_dir is not None:
+        # Una figura que falla no invalida las metricas ni el resto del lote
+        try:
+            plot_two_surfaces_3d_formatted(original_path, reconstructed_path,
+                                           title=f"Configuración {idx}",
+                                           label1="Original", label2="Reconstruido",
+                                           show=False,
+                                           save_path=os.path.join(figures_dir,
+                                                                  f"{idx}_compare.png"))
+        except Exception as exc:
+            import matplotlib.pyplot as plt
+            plt.close('all')
+            return idx, metrics, f"figure: {type(exc).__name__}: {exc}"
+    return idx, metrics, None
+
+
+def batch_compare(original_dir, reconstructed_dir, output_table="comparison.csv",
+                  reconstructed_suffix="_denormalized.txt", n_workers=None, figures_dir=None):
+    """
+    Compara sin pantalla todos los pares {idx}.txt / {idx}{suffix} de dos
+    directorios, en paralelo
+
+    Parameters:
+    - original_dir: directorio con los {idx}.txt originales
+    - reconstructed_dir: directorio con los campos reconstruidos
+    - output_table: CSV con una fila de metricas por configuracion (rmse,
+      max_abs, mean_abs, puntos comparados y rmse_s{k} / max_s{k} por
+      seccion)
+    - reconstructed_suffix: sufijo del archivo reconstruido de cada idx
+    - n_workers: procesos en paralelo (1 para comparar en serie)
+    - figures_dir: si se da, guarda ahi la figura 3D de cada par
+
+    Returns:
+        pd.DataFrame: la tabla escrita, indexada por idx
+    """
+    import pandas as pd
+    
+    pairs = []
+    for name in os.listdir(original_dir):
+        match = re.fullmatch(r"(\d+)\.txt", name)
+        if match is None:
+            continue
+        reconstructed_path = os.path.join(reconstructed_dir, f"{match.group(1)}{reconstructed_suffix}")
+        if os.path.exists(reconstructed_path):
+            pairs.append((int(match.group(1)), os.path.join(original_dir, name), reconstructed_path))
+    pairs.sort()
+    
+    if figures_dir is not None:
+        os.makedirs(figures_dir, exist_ok=True)
+    compare = functools.partial(_compare_pair, figures_dir=figures_dir)
+    if n_workers == 1 or len(pairs) < 2:
+        results = [compare(pair) for pair in pairs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(pairs) // (4 * (n_workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(compare, pairs, chunksize=chunksize))
+    
+    rows = []
+    for idx, metrics, error in results:
+        row = {"idx": idx, "error": error}
+        if metrics is not None:
+            row.update({key: metrics[key] for key in
+                        ("rmse", "max_abs", "mean_abs", "n_points", "n_compared")})
+            for k, (rmse, worst) in enumerate(zip(metrics["section_rmse"], metrics["section_max"])):
+                row[f"rmse_s{k}"] = rmse
+                row[f"max_s{k}"] = worst
+        rows.append(row)
+    
+    table = pd.DataFrame(rows).set_index("idx") if rows else pd.DataFrame()
+    table.to_csv(output_table)
+    print(f"{len(rows)} pares comparados, tabla guardada en: {output_table}")
+    return table
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Dibujar superficies
+    fig1 = plot_two_surfaces_3d_formatted(
+        '0.txt',      # archivo de ejemplo 1
+        '0_denormalized.txt',      # archivo de ejemplo 2
+        title="Comparación Distribución Cp",
+        label1="Ala A",
+        label2="Ala B"
+    )
+    
+    # Alternativamente, usar scatter para datos dispersos
+    fig2 = plot_two_surfaces_scatter(
+        '0.txt',
+        '0_denormalized.txt',
+        title="Comparación Cp 3D",
+        label1="Ala A", 
+        label2="Ala B"
+    )
+    
+    # Comparación estadística
+    fig3, stats = compare_cp_distributions(
+        '0.txt',
+        '0_denormalized.txt',
+        title="Comparación Estadística Cp"
+    )
+    
+    print("Estadísticas de Cp:")
     print(stats)
\ No newline at end of file
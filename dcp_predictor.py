@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada de la campaña por etapas. Cada subcomando importa solo lo
+que necesita (OpenVSP, scipy, matplotlib, pandas o pyDOE2 se cargan dentro
+de la etapa que los usa), asi que 'stats' o 'render' arrancan en una
+fraccion del tiempo de CPWING.py. Las opciones que no se dan toman el valor
+de las constantes de CPWING.py
+
+Uso:
+    python dcp_predictor.py sample -n 20 --alphas 0 2 4 --machs 0.1 0.2
+    python dcp_predictor.py solve --solver vlm
+    python dcp_predictor.py organize
+    python dcp_predictor.py stats
+    python dcp_predictor.py render --renderer raster
+    python dcp_predictor.py validate
+    python dcp_predictor.py run --stream     # todas las etapas, como CPWING.py
+"""
+
+import sys
+import time
+import argparse
+
+
+CONFIGURATIONS = 'wing_configurations.npy'
+
+# Opcion del subcomando -> constante de CPWING que la da por defecto
+DEFAULTS = {
+    "manifest": "MANIFEST",
+    "workers": "N_WORKERS",
+    "solver": "SOLVER",
+    "store": "STORE_DIR",
+    "renderer": "RENDERER",
+    "export": "EXPORT_DIR",
+    "metrics": "METRICS",
+}
+
+
+def _setup(args):
+    """
+    Completa las opciones no dadas con las constantes de CPWING, ajusta los
+    mensajes y carga las configuraciones
+
+    Returns:
+        np.ndarray: configuraciones de la campaña
+    """
+    import numpy as np
+    import CPWING
+    import metricas as mt
+
+    for name, constant in DEFAULTS.items():
+        if getattr(args, name, False) is None:
+            setattr(args, name, getattr(CPWING, constant))
+    mt.set_verbose(CPWING.VERBOSE and not args.quiet)
+
+    try:
+        configurations = np.load(args.configurations)
+    except FileNotFoundError:
+        print(f"❌ Error: {args.configurations} not found. Run 'sample' first.")
+        sys.exit(1)
+    return configurations
+
+
+def _manifest(args):
+    from manifiesto import RunManifest
+    return RunManifest(args.manifest)
+
+
+def _metrics_log(args):
+    import metricas as mt
+    return mt.MetricsLog(args.metrics) if args.metrics else None
+
+
+def _store(args, configurations):
+    import campana
+    return campana.open_store(args.store, configurations) if args.store else None
+
+
+def _solver(args):
+    """
+    Solver para campana.iter_solve y la cache que consulta (None con 'vlm'
+    o --no-cache), como en CPWING.py
+    """
+    import functools
+    import CPWING
+    import paralelo as par
+    from cache_vsp import SolverCache
+
+    # La VLM resuelve por bloques en este proceso (vlm.iter_campaign)
+    if args.solver == 'vlm':
+        return 'vlm', None
+    cache = (None if args.no_cache else
+             SolverCache(CPWING.CACHE_DIR, max_bytes=CPWING.CACHE_MAX_BYTES))
+    solver = functools.partial(par.vsp_sweep_solver if args.sweep else par.vsp_solver,
+                               cache=cache, backend='openvsp',
+                               warm_template=CPWING.WARM_TEMPLATE,
+                               write_vsp3=CPWING.WRITE_VSP3)
+    return solver, cache
+
+
+def _export(args, configurations):
+    import numpy as np
+    import CPWING
+    import campana
+
+    if not args.export:
+        return None
+    dtype = np.dtype(args.dtype) if args.dtype else CPWING.EXPORT_DTYPE
+    field = CPWING.EXPORT_FIELD if args.field is None else args.field
+    return campana.open_export(args.export, configurations, dtype=dtype, field=field)
+
+
+def _cache_stats(cache):
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Solver cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"this run ({stats['hit_rate']:.1%} hit rate; {stats['total_hits']} hits, "
+              f"{stats['total_misses']} misses in total), {stats['bytes']/1024**2:.1f} MB")
+
+
+def cmd_sample(args):
+    """
+    Genera (o amplia con --append) wing_configurations.npy por LHS; con
+    --alphas y --machs cada geometria nueva se repite para esas condiciones
+    """
+    import parametros as pm
+
+    pm.generate_configurations(n_samples=args.n_samples, output_file=args.configurations,
+                               append=args.append, seed=args.seed, alphas=args.alphas,
+                               machs=args.machs)
+
+
+def cmd_solve(args):
+    """
+    Resuelve las configuraciones sin un .slc valido
+    """
+    import campana
+
+    configurations = _setup(args)
+    solver, cache = _solver(args)
+    campana.stage_solve(configurations, _manifest(args), output_dir=args.output_dir,
+                        n_workers=args.workers, solver=solver, sweep=args.sweep,
+                        metrics_log=_metrics_log(args))
+    _cache_stats(cache)
+
+
+def cmd_organize(args):
+    """
+    Convierte los .slc resueltos a .txt (y al almacen)
+    """
+    import campana
+
+    configurations = _setup(args)
+    campana.stage_organize(configurations, _manifest(args), output_dir=args.output_dir,
+                           store=_store(args, configurations),
+                           metrics_log=_metrics_log(args))
+
+
+def cmd_stats(args):
+    """
+    Estadisticas dCp de cada .txt y rango global
+    """
+    import campana
+
+    configurations = _setup(args)
+    return campana.stage_stats(configurations, _manifest(args), output_dir=args.output_dir,
+                               store=_store(args, configurations), n_workers=args.workers,
+                               metrics_log=_metrics_log(args))
+
+
+def cmd_render(args):
+    """
+    Imagenes normalizadas (o exportacion a tensor) con el rango global; las
+    estadisticas que falten se miden antes
+    """
+    import campana
+
+    configurations = _setup(args)
+    manifest = _manifest(args)
+    metrics_log = _metrics_log(args)
+    store = _store(args, configurations)
+    all_min, all_max = campana.stage_stats(configurations, manifest,
+                                           output_dir=args.output_dir, store=store,
+                                           n_workers=args.workers, metrics_log=metrics_log)
+    campana.stage_render(configurations, manifest, all_min, all_max,
+                         output_dir=args.output_dir, renderer=args.renderer,
+                         export=_export(args, configurations), store=store,
+                         metrics_log=metrics_log)
+
+
+def cmd_validate(args):
+    """
+    Validacion de ida y vuelta imagen -> dCp de las imagenes renderizadas
+    """
+    import campana
+
+    configurations = _setup(args)
+    campana.stage_validate(configurations, _manifest(args), output_dir=args.output_dir,
+                           n_workers=args.workers, report_path=args.report, top=args.top,
+                           metrics_log=_metrics_log(args))
+
+
+def cmd_run(args):
+    """
+    Campaña completa (campana.run_stages o, con --stream, flujo.run_streaming)
+    """
+    import numpy as np
+    import CPWING
+
+    configurations = _setup(args)
+    solver, cache = _solver(args)
+    if args.stream:
+        import flujo
+        run = flujo.run_streaming
+    else:
+        import campana
+        run = campana.run_stages
+    run(configurations, manifest_path=args.manifest, output_dir=args.output_dir,
+        n_workers=args.workers, solver=solver, cache=cache, sweep=args.sweep,
+        store_path=args.store or None, renderer=args.renderer,
+        export_path=args.export or None,
+        export_dtype=np.dtype(args.dtype) if args.dtype else CPWING.EXPORT_DTYPE,
+        export_field=CPWING.EXPORT_FIELD if args.field is None else args.field,
+        metrics_path=args.metrics or None,
+        validate=CPWING.VALIDATE if args.validate is None else args.validate)
+    _cache_stats(cache)
+
+
+def build_parser():
+    """
+    Parser de la linea de comandos; no importa ningun modulo de la campaña
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--configurations", default=CONFIGURATIONS,
+                        help=f"configuration table (default {CONFIGURATIONS})")
+    common.add_argument("--manifest", help="run manifest (default CPWING.MANIFEST)")
+    common.add_argument("--output-dir", default=".", help="directory of the {idx} files")
+    common.add_argument("--workers", type=int, help="processes (default CPWING.N_WORKERS)")
+    common.add_argument("--metrics",
+                        help="metrics JSON-lines file, '' to disable (default CPWING.METRICS)")
+    common.add_argument("--quiet", action="store_true", help="no per-configuration messages")
+
+    solve = argparse.ArgumentParser(add_help=False)
+    solve.add_argument("--solver", choices=("openvsp", "vlm"),
+                       help="solver backend (default CPWING.SOLVER)")
+    solve.add_argument("--sweep", action="store_true",
+                       help="one model and VSPAERO sweep per geometry")
+    solve.add_argument("--no-cache", action="store_true", help="do not use the solver cache")
+
+    store = argparse.ArgumentParser(add_help=False)
+    store.add_argument("--store", help="dataset store, '' to disable (default CPWING.STORE_DIR)")
+
+    render = argparse.ArgumentParser(add_help=False)
+    render.add_argument("--renderer", choices=("matplotlib", "raster"),
+                        help="image renderer (default CPWING.RENDERER)")
+    render.add_argument("--export", help="tensor export directory instead of PNG "
+                                         "(default CPWING.EXPORT_DIR)")
+    render.add_argument("--dtype", choices=("uint8", "float16", "float32"),
+                        help="export dtype (default CPWING.EXPORT_DTYPE)")
+    render.add_argument("--field", action="store_true", default=None,
+                        help="export the dCp of each pixel (default CPWING.EXPORT_FIELD)")
+
+    parser = argparse.ArgumentParser(prog="dcp-predictor",
+                                     description="Wing dCp image campaign, stage by stage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sample = commands.add_parser("sample", help="generate configurations (parametros.py)")
+    sample.add_argument("--configurations", default=CONFIGURATIONS)
+    sample.add_argument("-n", "--n-samples", type=int, default=10)
+    sample.add_argument("--append", action="store_true",
+                        help="add maximin samples to the existing table")
+    sample.add_argument("--seed", type=int)
+    sample.add_argument("--alphas", type=float, nargs="+",
+                        help="flight conditions per geometry (with --machs)")
+    sample.add_argument("--machs", type=float, nargs="+")
+    sample.set_defaults(func=cmd_sample)
+
+    commands.add_parser("solve", parents=[common, solve],
+                        help="solve pending configurations").set_defaults(func=cmd_solve)
+    commands.add_parser("organize", parents=[common, store],
+                        help=".slc -> .txt columns").set_defaults(func=cmd_organize)
+    commands.add_parser("stats", parents=[common, store],
+                        help="dCp statistics and global range").set_defaults(func=cmd_stats)
+    commands.add_parser("render", parents=[common, store, render],
+                        help="normalized images").set_defaults(func=cmd_render)
+
+    validate = commands.add_parser("validate", parents=[common],
+                                   help="image -> dCp round-trip validation")
+    validate.add_argument("--report", default="validation_report.csv")
+    validate.add_argument("--top", type=int, default=10)
+    validate.set_defaults(func=cmd_validate)
+
+    run = commands.add_parser("run", parents=[common, solve, store, render],
+                              help="all stages, like CPWING.py")
+    run.add_argument("--stream", action="store_true",
+                     help="organize each configuration as soon as it is solved")
+    run.add_argument("--validate", action=argparse.BooleanOptionalAction,
+                     help="round-trip validation at the end (default CPWING.VALIDATE)")
+    run.set_defaults(func=cmd_run)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    inicio = time.perf_counter()
+    args.func(args)
+    if args.command != "sample":
+        print(f"\n'{args.command}' finished in {time.perf_counter() - inicio:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
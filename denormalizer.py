@@ -1,108 +1,202 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Thu Oct  2 11:18:15 2025
-
-@author: Aspirant2
-"""
-
-import numpy as np
-
-def denormalize_coordinates(image_txt_file, wing_config_idx, wing_configurations, output_file):
-    """
-    Denormaliza coordenadas de un archivo .txt generado desde imagen
-    a coordenadas reales en metros basadas en la configuración original del ala
-    
-    Parameters:
-    - image_txt_file: archivo .txt generado desde imagen (contiene X_norm, Y_norm, Cp)
-    - wing_config_idx: índice de la configuración original (0, 1, 2, etc.)
-    - wing_configurations: array con las configuraciones originales
-    - output_file: nombre del archivo de salida con coordenadas reales
-    """
-    
-    # Cargar configuración original
-    config = wing_configurations[wing_config_idx]
-    
-    # Extraer parámetros (ajusta índices según tu formato real)
-    wing_area = config[0]  # Área del ala
-    aspect_ratio = config[1]  # Relación de aspecto
-    taper_ratio = config[2]  # Razón de afilamiento (root_chord / tip_chord)
-    sweep_angle = config[3]  # Ángulo de flecha
-    # Ajusta según tu formato real
-    
-    # Calcular dimensiones reales
-    span = (aspect_ratio * wing_area)**0.5  # Envergadura total
-    semi_span = span / 2  # Semi-envergadura
-    
-    # Cuerdas (usando tus ecuaciones correctas)
-    tip_chord = 2 * wing_area / (span * (1 + taper_ratio))  # Cuerda punta [m]
-    root_chord = tip_chord * taper_ratio    # Cuerda raíz [m]
-    
-    # Cargar datos normalizados
-    data = np.loadtxt(image_txt_file)
-    x_norm = data[:, 0]  # Coordenadas X normalizadas (0-1)
-    y_norm = data[:, 1]  # Coordenadas Y normalizadas (0-1) 
-    cp_values = data[:, 2]  # Valores Cp
-    
-    # Convertir Y_normalizada a posición real en envergadura
-    y_real = y_norm * semi_span  # Y va de 0 a semi_span
-    
-    # Calcular cuerda local en cada posición Y (lineal entre raíz y punta)
-    local_chord = root_chord + (tip_chord - root_chord) * (y_real / semi_span)
-    
-    # Denormalizar coordenadas X usando la cuerda local
-    x_real = x_norm * local_chord  # Ahora X varía según la cuerda local
-    
-    # Aplicar corrección por flecha si es necesario
-    sweep_rad = np.radians(sweep_angle)
-    x_real_corrected = x_real + (y_real * np.tan(sweep_rad))  # Compensar flecha
-    
-    # Crear archivo de salida con coordenadas reales
-    denormalized_data = np.column_stack((x_real_corrected, y_real, cp_values))
-    np.savetxt(output_file, denormalized_data, fmt='%.6f', delimiter=' ')
-    
-    print(f"Coordenadas denormalizadas guardadas en: {output_file}")
-    print(f"Dimensiones del ala original:")
-    print(f"  - Envergadura: {span:.3f} m")
-    print(f"  - Semi-envergadura: {semi_span:.3f} m") 
-    print(f"  - Cuerda raíz: {root_chord:.3f} m")
-    print(f"  - Cuerda punta: {tip_chord:.3f} m")
-    print(f"  - Ángulo de flecha: {sweep_angle:.2f}°")
-    
-    return output_file
-
-
-def load_and_process_all_configurations(wing_configs_path, base_image_txt, output_dir):
-    """
-    Procesa todas las configuraciones para denormalizar todas las imágenes
-    """
-    # Cargar configuraciones
-    wing_configurations = np.load(wing_configs_path)
-    
-    for i in range(len(wing_configurations)):
-        image_txt = f"{i}.txt"  # Archivo generado desde imagen
-        output_file = f"{output_dir}/{i}_denormalized.txt"
-        
-        try:
-            denormalize_coordinates(
-                image_txt, 
-                i, 
-                wing_configurations, 
-                output_file
-            )
-        except FileNotFoundError:
-            print(f"Archivo no encontrado: {image_txt}")
-            continue
-
-
-# Ejemplo de uso:
-if __name__ == "__main__":
-    # Cargar el array de configuraciones
-    wing_configs = np.load('wing_configurations.npy')
-    
-    # Denormalizar una configuración específica
-    denormalize_coordinates(
-        'structured_0.txt',  # archivo generado desde imagen
-        0,        # índice de configuración
-        wing_configs,
-        '0_denormalized.txt'  # salida con coordenadas reales
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct  2 11:18:15 2025
+
+@author: Aspirant2
+"""
+
+import os
+import numpy as np
+
+def wing_geometry(wing_configurations):
+    """
+    Dimensiones reales de una o varias configuraciones a la vez
+
+    Returns:
+        dict: span, semi_span, root_chord, tip_chord y sweep_angle [deg],
+        un valor por configuracion
+    """
+    configs = np.atleast_2d(np.asarray(wing_configurations, dtype=float))
+    
+    # Extraer parámetros (ajusta índices según tu formato real)
+    wing_area = configs[:, 0]  # Área del ala
+    aspect_ratio = configs[:, 1]  # Relación de aspecto
+    taper_ratio = configs[:, 2]  # Razón de afilamiento (root_chord / tip_chord)
+    sweep_angle = configs[:, 3]  # Ángulo de flecha
+    
+    # Calcular dimensiones reales
+    span = (aspect_ratio * wing_area)**0.5  # Envergadura total
+    
+    # Cuerdas (usando tus ecuaciones correctas)
+    tip_chord = 2 * wing_area / (span * (1 + taper_ratio))  # Cuerda punta [m]
+    root_chord = tip_chord * taper_ratio    # Cuerda raíz [m]
+    
+    return {"span": span, "semi_span": span / 2, "root_chord": root_chord,
+            "tip_chord": tip_chord, "sweep_angle": sweep_angle}
+
+
+def denormalize_arrays(fields, wing_configurations):
+    """
+    Denormaliza de una vez los campos de todas las configuraciones
+
+    Parameters:
+    - fields: campos normalizados [N, P, 3] (X_norm, Y_norm, Cp) o [P, 3]
+      para una sola configuracion; los NaN de relleno se conservan
+    - wing_configurations: configuraciones de cada campo [N, C] (o [C])
+
+    Returns:
+        np.ndarray: campos con X e Y en metros, misma forma que fields
+    """
+    fields = np.asarray(fields, dtype=float)
+    single = fields.ndim == 2
+    fields = fields[None] if single else fields
+    geometry = {name: value[:, None] for name, value in wing_geometry(wing_configurations).items()}
+    
+    x_norm = fields[:, :, 0]  # Coordenadas X normalizadas (0-1)
+    y_norm = fields[:, :, 1]  # Coordenadas Y normalizadas (0-1)
+    
+    # Convertir Y_normalizada a posición real en envergadura
+    y_real = y_norm * geometry["semi_span"]
+    
+    # Cuerda local lineal entre raíz y punta
+    local_chord = (geometry["root_chord"]
+                   + (geometry["tip_chord"] - geometry["root_chord"]) * (y_real / geometry["semi_span"]))
+    
+    # X según la cuerda local más el desplazamiento por flecha
+    x_real = x_norm * local_chord + y_real * np.tan(np.radians(geometry["sweep_angle"]))
+    
+    denormalized = np.stack((x_real, y_real, fields[:, :, 2]), axis=2)
+    return denormalized[0] if single else denormalized
+
+
+def denormalize_coordinates(image_txt_file, wing_config_idx, wing_configurations, output_file,
+                            verbose=True):
+    """
+    Denormaliza coordenadas de un archivo .txt generado desde imagen
+    a coordenadas reales en metros basadas en la configuración original del ala
+    
+    Parameters:
+    - image_txt_file: archivo .txt generado desde imagen (contiene X_norm, Y_norm, Cp)
+    - wing_config_idx: índice de la configuración original (0, 1, 2, etc.)
+    - wing_configurations: array con las configuraciones originales
+    - output_file: nombre del archivo de salida con coordenadas reales
+    - verbose: imprimir las dimensiones del ala
+    """
+    
+    # Cargar configuración original
+    config = wing_configurations[wing_config_idx]
+    
+    # Cargar datos normalizados y denormalizar
+    data = load_field(image_txt_file)
+    denormalized_data = denormalize_arrays(data, config)
+    
+    # Crear archivo de salida con coordenadas reales
+    np.savetxt(output_file, denormalized_data, fmt='%.6f', delimiter=' ')
+    
+    if verbose:
+        geometry = {name: value[0] for name, value in wing_geometry(config).items()}
+        print(f"Coordenadas denormalizadas guardadas en: {output_file}")
+        print(f"Dimensiones del ala original:")
+        print(f"  - Envergadura: {geometry['span']:.3f} m")
+        print(f"  - Semi-envergadura: {geometry['semi_span']:.3f} m") 
+        print(f"  - Cuerda raíz: {geometry['root_chord']:.3f} m")
+        print(f"  - Cuerda punta: {geometry['tip_chord']:.3f} m")
+        print(f"  - Ángulo de flecha: {geometry['sweep_angle']:.2f}°")
+    
+    return output_file
+
+
+def load_field(path):
+    """
+    Campo X Y Cp de un .txt o de un .npy (img_to_txt con binary=True)
+    """
+    if path.endswith(".npy"):
+        return np.load(path)
+    return np.loadtxt(path, ndmin=2)
+
+
+def write_to_store(store, indices, denormalized):
+    """
+    Guarda campos ya denormalizados en un DatasetStore (almacen.py),
+    reordenados por Y creciente y X decreciente como espera store.write.
+    El almacen debe ser uno propio de reconstrucciones
+    (DatasetStore.create(..., content='reconstructed')), nunca el de la
+    campaña, cuyos campos del solver quedarian sustituidos
+    """
+    if store.content != "reconstructed":
+        raise ValueError(f"Store {store.path} holds {store.content} fields; write "
+                         f"reconstructions to a separate store created with "
+                         f"content='reconstructed'")
+    for idx, field in zip(indices, denormalized):
+        field = field[~np.isnan(field).any(axis=1)]
+        order = np.lexsort((-field[:, 0], field[:, 1]))
+        store.write(idx, field[order, 0], field[order, 1], field[order, 2])
+    store.flush()
+
+
+def load_and_process_all_configurations(wing_configs_path, base_image_txt, output_dir,
+                                        binary=False, store=None, verbose=False):
+    """
+    Procesa todas las configuraciones para denormalizar todas las imágenes
+
+    Lee los {i}.txt (o {i}.npy) del directorio de trabajo, los denormaliza
+    todos en una sola operacion y guarda el resultado:
+    - por defecto un {i}_denormalized.txt por configuracion
+    - con binary=True un unico denormalized.npy [N, P, 3] y sus indices
+      en denormalized_indices.npy
+    - con store (DatasetStore de reconstrucciones, ver write_to_store) en
+      ese almacen
+
+    Returns:
+        tuple: (indices, campos denormalizados [N, P, 3])
+    """
+    # Cargar configuraciones
+    wing_configurations = np.load(wing_configs_path)
+    
+    indices = []
+    fields = []
+    for i in range(len(wing_configurations)):
+        image_txt = f"{i}.npy" if binary and os.path.exists(f"{i}.npy") else f"{i}.txt"
+        try:
+            fields.append(load_field(image_txt))
+        except FileNotFoundError:
+            print(f"Archivo no encontrado: {image_txt}")
+            continue
+        indices.append(i)
+    
+    # Todas las imagenes reconstruidas con la misma resolucion: un solo
+    # array [N, P, 3]; si no, se rellena con NaN hasta la mas larga
+    n_points = max((len(field) for field in fields), default=0)
+    stacked = np.full((len(fields), n_points, 3), np.nan)
+    for k, field in enumerate(fields):
+        stacked[k, :len(field)] = field
+    denormalized = denormalize_arrays(stacked, wing_configurations[indices])
+    
+    if store is not None:
+        write_to_store(store, indices, denormalized)
+    elif binary:
+        os.makedirs(output_dir, exist_ok=True)
+        np.save(os.path.join(output_dir, "denormalized.npy"), denormalized)
+        np.save(os.path.join(output_dir, "denormalized_indices.npy"), np.array(indices))
+    else:
+        for i, field in zip(indices, denormalized):
+            field = field[~np.isnan(field).any(axis=1)]
+            np.savetxt(f"{output_dir}/{i}_denormalized.txt", field, fmt='%.6f', delimiter=' ')
+    
+    if verbose:
+        print(f"{len(indices)} configuraciones denormalizadas")
+    return indices, denormalized
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Cargar el array de configuraciones
+    wing_configs = np.load('wing_configurations.npy')
+    
+    # Denormalizar una configuración específica
+    denormalize_coordinates(
+        'structured_0.txt',  # archivo generado desde imagen
+        0,        # índice de configuración
+        wing_configs,
+        '0_denormalized.txt'  # salida con coordenadas reales
     )
\ No newline at end of file
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import functools
+import numpy as np
+from almacen import _grow_array
+
+
+class TensorExport:
+    """
+    Imagenes dCp normalizadas de una campaña en un unico array [N, H, W]
+    con memory-map, listo para entrenar sin decodificar miles de PNG.
+
+    Contenido:
+    - images.npy: una imagen por configuracion [N, H, W], uint8 (grises
+      como los PNG) o float32 ((dCp - dcp_min) / (dcp_max - dcp_min)); en
+      una exportacion de campo (field=True) float16 o float32 con el dCp de
+      cada pixel (test1.render_dcp), que no depende del rango global
+    - configurations.npy: tabla de configuraciones [N, C], misma fila que
+      la imagen
+    - filled.npy: imagenes ya escritas [N]
+    - meta.json: dimensiones, dtype y rango dCp global usado al normalizar
+
+    Para volver a dCp: uint8 -> dcp_min + (g + 0.5) / 256 * (dcp_max - dcp_min),
+    float32 -> dcp_min + v * (dcp_max - dcp_min).
+
+    Una exportacion de campo se normaliza al leerla (read) con el rango
+    vigente, asi que un extremo nuevo no obliga a renderizar de nuevo:
+    basta con set_range, y requantize/write_pngs generan en bloque las
+    imagenes uint8/float32 o los PNG sin volver a los .slc/.txt.
+    """
+
+    ARRAYS = ("images", "configurations", "filled")
+
+    def __init__(self, path, mode='r'):
+        """
+        Abre una exportacion existente. mode='r' solo lectura, 'r+' lectura/escritura
+        """
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, "meta.json"), 'r') as f:
+            self.meta = json.load(f)
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode))
+
+    @classmethod
+    def create(cls, path, configurations, size=256, dtype=np.uint8, field=False):
+        """
+        Crea una exportacion vacia con el array de imagenes preasignado en disco
+
+        Parameters:
+        - path: directorio de la exportacion
+        - configurations: tabla de configuraciones de la campaña
+        - size: lado de las imagenes (H = W)
+        - dtype: np.uint8 o np.float32 (np.float16 o np.float32 con field=True)
+        - field: guardar el dCp de cada pixel en vez de la imagen normalizada
+        """
+        dtype = np.dtype(dtype)
+        if field and dtype not in (np.float16, np.float32):
+            raise ValueError(f"Unsupported field dtype {dtype}, use float16 or float32")
+        if not field and dtype not in (np.uint8, np.float32):
+            raise ValueError(f"Unsupported export dtype {dtype}, use uint8 or float32")
+
+        os.makedirs(path, exist_ok=True)
+        configurations = np.asarray(configurations)
+        n_configs = len(configurations)
+
+        np.save(os.path.join(path, "configurations.npy"), configurations)
+        images = np.lib.format.open_memmap(os.path.join(path, "images.npy"), mode='w+',
+                                           dtype=dtype, shape=(n_configs, size, size))
+        images.flush()
+        del images
+        filled = np.lib.format.open_memmap(os.path.join(path, "filled.npy"), mode='w+',
+                                           dtype=np.bool_, shape=(n_configs,))
+        filled[:] = False
+        filled.flush()
+        del filled
+
+        meta = {"n_configs": n_configs, "height": size, "width": size,
+                "dtype": dtype.name, "field": bool(field), "dcp_min": None, "dcp_max": None}
+        with open(os.path.join(path, "meta.json"), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        return cls(path, mode='r+')
+
+    def __len__(self):
+        return self.meta["n_configs"]
+
+    def grow(self, configurations):
+        """
+        Amplia la exportacion a una tabla de configuraciones mas larga cuyas
+        primeras filas son las ya exportadas; lo ya escrito conserva su indice
+        """
+        configurations = np.asarray(configurations)
+        n_old, n_new = len(self), len(configurations)
+        if n_new < n_old or not np.array_equal(configurations[:n_old], self.configurations):
+            raise ValueError(f"Configurations of {self.path} are not a prefix of the new table")
+
+        grown = {"images": _grow_array(os.path.join(self.path, "images.npy"), self.images,
+                                       n_new, 0),
+                 "filled": _grow_array(os.path.join(self.path, "filled.npy"), self.filled,
+                                       n_new, False)}
+        # Los memmap antiguos se sueltan antes de sustituir sus archivos
+        for name in self.ARRAYS:
+            setattr(self, name, None)
+        for name, tmp in grown.items():
+            os.replace(tmp, os.path.join(self.path, f"{name}.npy"))
+        np.save(os.path.join(self.path, "configurations.npy"), configurations)
+
+        self.meta["n_configs"] = n_new
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+        self.__init__(self.path, mode=self.mode)
+
+    @property
+    def field(self):
+        # Las exportaciones anteriores no llevan la clave
+        return self.meta.get("field", False)
+
+    @property
+    def normalized(self):
+        return self.meta["dtype"] == "float32" and not self.field
+
+    @property
+    def size(self):
+        return self.meta["height"]
+
+    def write(self, idx, image):
+        """
+        Guarda la imagen de una configuracion
+        """
+        self.images[idx] = image
+        self.filled[idx] = True
+
+    def set_range(self, dcp_min, dcp_max):
+        """
+        Guarda en meta.json el rango dCp global con el que se normalizo
+        """
+        self.meta["dcp_min"] = float(dcp_min)
+        self.meta["dcp_max"] = float(dcp_max)
+        with open(os.path.join(self.path, "meta.json"), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+    def flush(self):
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def read(self, indices, dcp_min=None, dcp_max=None, normalized=False):
+        """
+        Imagenes de las filas pedidas. En una exportacion de campo se
+        normalizan aqui con el rango dado o, por defecto, con el guardado
+        (set_range): uint8 como los PNG o, con normalized=True, float32 en
+        [0, 1]. Las demas ya llevan su rango y se devuelven tal cual
+
+        Returns:
+            np.ndarray: imagenes [k, H, W] (o [H, W] con un indice entero)
+        """
+        images = np.asarray(self.images[indices])
+        if not self.field:
+            return images
+
+        import test1 as t1
+        dcp_min = self.meta["dcp_min"] if dcp_min is None else dcp_min
+        dcp_max = self.meta["dcp_max"] if dcp_max is None else dcp_max
+        if dcp_min is None or dcp_max is None:
+            raise ValueError(f"Export {self.path} has no dCp range, call set_range first")
+        if images.dtype == np.float16:
+            # float16 solo tiene 65536 valores: se cuantizan todos una vez
+            # y cada pixel es una consulta a la tabla
+            return _float16_table(dcp_min, dcp_max, normalized)[images.view(np.uint16)]
+        return t1.quantize(images, dcp_min, dcp_max, normalized=normalized)
+
+    def requantize(self, path, dtype=np.uint8, dcp_min=None, dcp_max=None, chunk=64):
+        """
+        Crea en path una exportacion uint8 o float32 normalizada con el rango
+        dado (por defecto el guardado) a partir de esta exportacion de campo,
+        por bloques de 'chunk' imagenes
+
+        Returns:
+            TensorExport: la exportacion nueva
+        """
+        if not self.field:
+            raise ValueError(f"Export {self.path} is not a dCp field export")
+        dcp_min = self.meta["dcp_min"] if dcp_min is None else dcp_min
+        dcp_max = self.meta["dcp_max"] if dcp_max is None else dcp_max
+        if dcp_min is None or dcp_max is None:
+            raise ValueError(f"Export {self.path} has no dCp range, call set_range first")
+
+        target = TensorExport.create(path, self.configurations, size=self.size, dtype=dtype)
+        for start in range(0, len(self), chunk):
+            rows = slice(start, start + chunk)
+            target.images[rows] = self.read(rows, dcp_min, dcp_max,
+                                            normalized=target.normalized)
+            target.filled[rows] = self.filled[rows]
+        target.flush()
+        target.set_range(dcp_min, dcp_max)
+        return target
+
+    def write_pngs(self, output_dir, indices=None, dcp_min=None, dcp_max=None):
+        """
+        Escribe {idx}.png para las configuraciones exportadas (por defecto
+        todas) con el rango dado o el guardado, sin releer los {idx}.txt
+        """
+        import test1 as t1
+        if indices is None:
+            indices = np.flatnonzero(self.filled)
+        os.makedirs(output_dir, exist_ok=True)
+        for idx in indices:
+            t1.write_png(os.path.join(output_dir, f"{idx}.png"),
+                         self.read(int(idx), dcp_min, dcp_max))
+
+
+@functools.lru_cache(maxsize=4)
+def _float16_table(dcp_min, dcp_max, normalized):
+    """
+    test1.quantize de cada uno de los 65536 valores float16, indexada por
+    sus bits
+    """
+    import test1 as t1
+    values = np.arange(2**16, dtype=np.uint16).view(np.float16)
+    with np.errstate(invalid='ignore'):
+        return t1.quantize(values, dcp_min, dcp_max, normalized=normalized)
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import time
+    from almacen import DatasetStore
+
+    # Re-cuantiza en bloque la exportacion de campo (CPWING.EXPORT_FIELD)
+    # con el rango dCp global actual del almacen de la campaña
+    FIELD_DIR = 'campaign_export'
+    OUTPUT_DIR = 'campaign_images'
+
+    inicio = time.perf_counter()
+    stats = DatasetStore('campaign_store').stats
+    field = TensorExport(FIELD_DIR, mode='r+')
+    field.set_range(stats["dcp_min"], stats["dcp_max"])
+    images = field.requantize(OUTPUT_DIR, dtype=np.uint8)
+    print(f"{int(images.filled.sum())} images requantized to [{stats['dcp_min']}, "
+          f"{stats['dcp_max']}] in {time.perf_counter() - inicio:.2f} s: {OUTPUT_DIR}")
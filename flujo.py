@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import functools
+import numpy as np
+import test1 as t1
+import minimo as mn
+import paralelo as par
+import metricas as mt
+import campana
+from manifiesto import RunManifest
+
+
+def run_streaming(configurations, manifest_path='campaign_manifest.jsonl', output_dir='.',
+                  n_workers=None, solver=None, cache=None, store_path=None,
+                  renderer='matplotlib', export_path=None, export_dtype=np.uint8,
+                  validate=False, sweep=False, export_field=False, metrics_path=None, nx=20):
+    """
+    Igual que campana.run_stages pero sin esperar a que termine cada etapa:
+    en cuanto el solver entrega una configuracion se organiza (.txt y
+    almacen), se miden sus estadisticas y se remuestrea su rejilla, mientras
+    los workers siguen resolviendo las demas. Solo el render, que necesita
+    el rango global, espera al final, y se hace desde las rejillas en
+    memoria sin releer los .txt
+
+    El manifiesto es el mismo que el de run_stages: las etapas se registran
+    por configuracion, asi que una campaña interrumpida se reanuda con
+    cualquiera de los dos
+
+    Parameters:
+    - nx: puntos por seccion de las rejillas (los de test1.normalizador)
+    - resto: como campana.run_stages
+
+    Returns:
+        tuple: (all_min, all_max) rango dCp global de la campaña
+    """
+    manifest = RunManifest(manifest_path)
+    metrics_log = mt.MetricsLog(metrics_path) if metrics_path is not None else None
+    store = (campana.open_store(store_path, configurations)
+             if store_path is not None else None)
+    export = (campana.open_export(export_path, configurations, dtype=export_dtype,
+                                  field=export_field)
+              if export_path is not None else None)
+    if solver is None and cache is not None:
+        solver = functools.partial(par.vsp_sweep_solver if sweep else par.vsp_solver,
+                                   cache=cache)
+
+    indices = range(len(configurations))
+    pending = manifest.pending(indices, "solve")
+    grids = {}
+    inicio = time.perf_counter()
+
+    for n, result in enumerate(campana.iter_solve(configurations, pending,
+                                                  output_dir=output_dir,
+                                                  n_workers=n_workers, solver=solver,
+                                                  sweep=sweep), start=1):
+        if not campana.record_solve(manifest, result, metrics_log=metrics_log):
+            continue
+        idx = result["idx"]
+        columns = campana.organize_one(idx, manifest, output_dir=output_dir, store=store,
+                                       metrics_log=metrics_log)
+        if columns is None:
+            continue
+
+        start = time.perf_counter()
+        campana.record_stats(idx, manifest, mn.array_stats(columns[2]))
+        if metrics_log is not None:
+            metrics_log.write(idx, "stats", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            grids[idx] = t1.resample_sections(np.column_stack(columns), nx)[:3]
+        except (ValueError, IndexError):
+            # stage_render lo intentara desde el .txt y registrara el fallo
+            pass
+        if metrics_log is not None:
+            metrics_log.write(idx, "resample", time.perf_counter() - start)
+        mt.log(f"[{n}/{len(pending)}] configuration {idx} ready "
+               f"({time.perf_counter() - inicio:.1f} s)")
+
+    # Las etapas por lotes solo repiten lo que falta (p. ej. .slc resueltos
+    # en una ejecucion anterior) y combinan el rango global
+    campana._banner(len(indices) - len(manifest.pending(indices, "solve")),
+                    len(indices), "solve")
+    campana.stage_organize(configurations, manifest, output_dir=output_dir, store=store,
+                           metrics_log=metrics_log)
+    all_min, all_max = campana.stage_stats(configurations, manifest, output_dir=output_dir,
+                                           store=store, n_workers=n_workers,
+                                           metrics_log=metrics_log)
+    campana.stage_render(configurations, manifest, all_min, all_max, output_dir=output_dir,
+                         renderer=renderer, export=export, grids=grids, store=store,
+                         metrics_log=metrics_log)
+    if validate:
+        campana.stage_validate(configurations, manifest, output_dir=output_dir,
+                               n_workers=n_workers, metrics_log=metrics_log)
+
+    if metrics_log is not None and os.path.exists(metrics_path):
+        mt.summary(metrics_path)
+    return all_min, all_max
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Campaña VLM del directorio actual en modo streaming
+    configurations = np.load('wing_configurations.npy')
+    all_min, all_max = run_streaming(configurations, solver='vlm', renderer='raster')
+    print(f"Global dCp range: [{all_min}, {all_max}]")
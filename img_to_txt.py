@@ -1,161 +1,257 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Wed Oct  1 17:31:42 2025
-
-@author: Aspirant2
-"""
-
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import Normalize
-from scipy.ndimage import map_coordinates
-import cv2
-
-def image_to_txt(image_path, output_txt_path, original_range_min, original_range_max):
-    """
-    Convierte una imagen de distribución Cp normalizada de vuelta a formato .txt
-    
-    Parameters:
-    - image_path: ruta de la imagen .png normalizada
-    - output_txt_path: ruta donde guardar el archivo .txt
-    - original_range_min: valor mínimo original de Cp (dcp_min global)
-    - original_range_max: valor máximo original de Cp (dcp_max global)
-    """
-    
-    # 1. Cargar la imagen
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if img is None:
-        raise ValueError(f"No se pudo cargar la imagen: {image_path}")
-    
-    # 2. Obtener dimensiones
-    height, width = img.shape
-    
-    # 3. Crear matrices de coordenadas normalizadas (0 a 1)
-    x_norm = np.linspace(0, 1, width)
-    y_norm = np.linspace(0, 1, height)
-    
-    # 4. Crear malla de coordenadas
-    X_norm, Y_norm = np.meshgrid(x_norm, y_norm)
-    
-    # 5. Convertir valores de imagen (0-255) a escala de grises normalizada (0-1)
-    gray_normalized = img / 255.0  # 0=blanco, 1=Negro
-    
-    # 6. Invertir la escala porque en la imagen:
-    #    - Blanco (255) = Cp máximo (original_range_max)
-    #    - Negro (0) = Cp mínimo (original_range_min)
-    cp_normalized = 1.0 - gray_normalized  # Ahora 0=Negro, 1=blanco
-    
-    # 7. Mapear de nuevo al rango original de Cp
-    cp_values = cp_normalized * (original_range_max - original_range_min) + original_range_min
-    
-    # 8. Convertir a formato .txt compatible con el original
-    #    Formato: X Y Cp (cada fila representa un punto)
-    with open(output_txt_path, 'w') as f:
-        for i in range(height):
-            for j in range(width):
-                x_pos = X_norm[i, j]  # Coordenada X normalizada (0-1)
-                y_pos = Y_norm[i, j]  # Coordenada Y normalizada (0-1)
-                cp_val = cp_values[i, j]  # Valor Cp desnormalizado
-                f.write(f"{x_pos:.6f} {y_pos:.6f} {cp_val:.6f}\n")
-    
-    print(f"Archivo .txt generado: {output_txt_path}")
-    return output_txt_path
-
-
-def reconstruct_original_format_corrected(image_path, output_txt_path, 
-                                        original_range_min, original_range_max, 
-                                        num_sections=20, points_per_section=20):
-    """
-    Versión corregida: Negro = Cp mínimo, Blanco = Cp máximo
-    Y invertido para coincidir con el sistema de coordenadas del ala
-    """
-    
-    # 1. Cargar la imagen
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if img is None:
-        raise ValueError(f"No se pudo cargar la imagen: {image_path}")
-    
-    # 2. Convertir imagen a valores Cp (CORRECTO)
-    gray_normalized = img / 255.0  # 0=blanco, 1=negro
-    cp_values = gray_normalized * (original_range_max - original_range_min) + original_range_min
-    
-    height, width = img.shape
-    
-    # 3. Crear datos en el formato original (X, Y, Cp)
-    reconstructed_data = []
-    
-    # Dividir en secciones Y
-    y_sections = np.linspace(0, height-1, num_sections).astype(int)
-    
-    for y_idx in y_sections:
-        if y_idx >= height:
-            y_idx = height - 1
-            
-        # Extraer la fila correspondiente de Cp
-        cp_row = cp_values[y_idx, :]
-        
-        # Tomar puntos a lo largo de X
-        x_points = np.linspace(0, width-1, points_per_section).astype(int)
-        
-        for x_idx in x_points:
-            if x_idx >= width:
-                x_idx = width - 1
-                
-            # Convertir coordenadas normalizadas a valores (0-1)
-            x_norm = x_idx / (width - 1)  # Coordenada X normalizada (0=borde ataque, 1=borde salida)
-            y_norm = 1.0 - (y_idx / (height - 1))  # Coordenada Y normalizada (0=raíz, 1=punta)
-            cp_val = cp_row[x_idx]  # Valor Cp en ese punto
-            
-            reconstructed_data.append([x_norm, y_norm, cp_val])
-    
-    # 4. Guardar en archivo .txt
-    np.savetxt(output_txt_path, reconstructed_data, fmt='%.6f', delimiter=' ')
-    print(f"Archivo .txt reconstruido correctamente: {output_txt_path}")
-    return output_txt_path
-
-
-def validate_conversion(original_image, reconstructed_image, original_range_min, original_range_max):
-    """
-    Función auxiliar para validar la conversión (opcional)
-    """
-    # Convertir ambas imágenes a formato comparable
-    img1 = cv2.imread(original_image, cv2.IMREAD_GRAYSCALE)
-    img2 = cv2.imread(reconstructed_image, cv2.IMREAD_GRAYSCALE)
-    
-    if img1.shape != img2.shape:
-        print("Advertencia: Dimensiones diferentes")
-        return False
-    
-    # Calcular diferencia
-    diff = np.abs(img1.astype(float) - img2.astype(float))
-    max_diff = np.max(diff)
-    mean_diff = np.mean(diff)
-    
-    print(f"Diferencia máxima: {max_diff}")
-    print(f"Diferencia media: {mean_diff}")
-    
-    return mean_diff < 50  # Umbral arbitrario
-
-
-# Ejemplo de uso:
-if __name__ == "__main__":
-    # Parámetros globales (debes proporcionar los valores reales)
-    dcp_min_global = -2.0885  # Ejemplo
-    dcp_max_global = -0.0185  # Ejemplo
-    
-    # Procesar una imagen
-    image_file = "0.png"  # Imagen de entrada
-    output_file = "reconstructed_0.txt"  # Archivo de salida
-    
-    # Método 1: Simple conversión
-    image_to_txt(image_file, output_file, dcp_min_global, dcp_max_global)
-    
-    # Método 2: Conversión más estructurada
-    reconstruct_original_format_corrected(
-        image_file, 
-        "structured_0.txt", 
-        dcp_min_global, 
-        dcp_max_global,
-        num_sections=20, 
-        points_per_section=20
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct  1 17:31:42 2025
+
+@author: Aspirant2
+"""
+
+import os
+import glob
+import functools
+import numpy as np
+import cv2
+
+def _load_gray(image_path):
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError(f"No se pudo cargar la imagen: {image_path}")
+    return img
+
+def _save_binary(output_path, data):
+    """
+    Guarda la matriz X Y Cp como .npy (np.save añade la extension si falta)
+    """
+    if not output_path.endswith(".npy"):
+        output_path += ".npy"
+    np.save(output_path, data)
+    return output_path
+
+def _text_table(strings):
+    """
+    Textos ASCII como tabla de bytes rellenada con ceros a la derecha
+
+    Returns:
+        np.ndarray: uint8 [n, ancho maximo]
+    """
+    data = [text.encode('ascii') for text in strings]
+    lengths = np.array([len(text) for text in data])
+    table = np.zeros((len(data), lengths.max()), dtype=np.uint8)
+    table[np.arange(table.shape[1]) < lengths[:, None]] = np.frombuffer(b"".join(data),
+                                                                        dtype=np.uint8)
+    return table
+
+def pixel_arrays(img, original_range_min, original_range_max):
+    """
+    Coordenadas normalizadas y Cp de cada pixel, fila a fila
+
+    Returns:
+        np.ndarray: matriz [H*W, 3] con columnas X Y Cp
+    """
+    height, width = img.shape
+    X_norm, Y_norm = np.meshgrid(np.linspace(0, 1, width), np.linspace(0, 1, height))
+    cp_values = (1.0 - img / 255.0) * (original_range_max - original_range_min) + original_range_min
+    return np.column_stack((X_norm.ravel(), Y_norm.ravel(), cp_values.ravel()))
+
+def image_to_txt(image_path, output_txt_path, original_range_min, original_range_max,
+                 binary=False, verbose=True):
+    """
+    Convierte una imagen de distribución Cp normalizada de vuelta a formato .txt
+    
+    Parameters:
+    - image_path: ruta de la imagen .png normalizada
+    - output_txt_path: ruta donde guardar el archivo .txt
+    - original_range_min: valor mínimo original de Cp (dcp_min global)
+    - original_range_max: valor máximo original de Cp (dcp_max global)
+    - binary: guardar la matriz X Y Cp en .npy en vez de texto
+    - verbose: imprimir la ruta generada
+    """
+    
+    # 1. Cargar la imagen
+    img = _load_gray(image_path)
+    
+    if binary:
+        output_txt_path = _save_binary(output_txt_path, pixel_arrays(img, original_range_min,
+                                                                     original_range_max))
+    else:
+        # 2. Texto de cada columna (X), cada fila (Y) y cada nivel de gris
+        #    (Cp): una imagen uint8 solo tiene 256 valores de Cp posibles,
+        #    asi que no hace falta formatear los 65k pixeles uno a uno
+        height, width = img.shape
+        x_text = _text_table(f"{x_pos:.6f} " for x_pos in np.linspace(0, 1, width).tolist())
+        y_text = _text_table(f"{y_pos:.6f} " for y_pos in np.linspace(0, 1, height).tolist())
+        
+        # 3. Blanco (255) = Cp mínimo, Negro (0) = Cp máximo
+        levels = (1.0 - np.arange(256) / 255.0) * (original_range_max - original_range_min) + original_range_min
+        cp_text = _text_table(f"{cp_val:.6f}\n" for cp_val in levels.tolist())
+        
+        # 4. Formato: X Y Cp (cada fila representa un punto). Cada linea se
+        #    arma con los bytes de las tres tablas, sin bucle por pixel, y se
+        #    quita el relleno (el texto nunca tiene bytes nulos). Se escribe
+        #    en modo texto, con el fin de linea de la plataforma como antes
+        nx, ny = x_text.shape[1], y_text.shape[1]
+        lines = np.empty((height, width, nx + ny + cp_text.shape[1]), dtype=np.uint8)
+        lines[:, :, :nx] = x_text
+        lines[:, :, nx:nx + ny] = y_text[:, None]
+        lines[:, :, nx + ny:] = cp_text[img]
+        with open(output_txt_path, 'w') as f:
+            f.write(lines.tobytes().replace(b"\0", b"").decode('ascii'))
+    
+    if verbose:
+        print(f"Archivo .txt generado: {output_txt_path}")
+    return output_txt_path
+
+
+def normalized_gray(img):
+    """
+    Imagen uint8 a valores normalizados 0-1 con el centro de cada nivel de
+    gris: test1.quantize asigna el gris g a [g/256, (g+1)/256), asi que
+    g/255 sesgaria cada valor hasta medio nivel
+    """
+    return (img + 0.5) / 256.0
+
+
+def section_arrays(gray_normalized, original_range_min, original_range_max,
+                   num_sections=20, points_per_section=20):
+    """
+    Muestrea una imagen normalizada (0-1, fila 0 = punta) en num_sections
+    secciones Y de points_per_section puntos: Negro = Cp mínimo, Blanco =
+    Cp máximo
+
+    Returns:
+        np.ndarray: matriz [num_sections*points_per_section, 3] X Y Cp
+    """
+    cp_values = gray_normalized * (original_range_max - original_range_min) + original_range_min
+    
+    height, width = gray_normalized.shape
+    
+    # Secciones Y y puntos a lo largo de X
+    y_sections = np.minimum(np.linspace(0, height-1, num_sections).astype(int), height - 1)
+    x_points = np.minimum(np.linspace(0, width-1, points_per_section).astype(int), width - 1)
+    
+    # X normalizada (0=borde ataque, 1=borde salida), Y normalizada (0=raíz, 1=punta)
+    x_norm = x_points / (width - 1)
+    y_norm = 1.0 - (y_sections / (height - 1))
+    return np.column_stack((np.tile(x_norm, len(y_sections)),
+                            np.repeat(y_norm, len(x_points)),
+                            cp_values[np.ix_(y_sections, x_points)].ravel()))
+
+
+def reconstruct_original_format_corrected(image_path, output_txt_path, 
+                                        original_range_min, original_range_max, 
+                                        num_sections=20, points_per_section=20,
+                                        binary=False, verbose=True):
+    """
+    Versión corregida: Negro = Cp mínimo, Blanco = Cp máximo
+    Y invertido para coincidir con el sistema de coordenadas del ala
+    """
+    
+    # 1. Cargar la imagen
+    img = _load_gray(image_path)
+    
+    # 2. Muestrear la imagen normalizada (0-1) en secciones Y
+    reconstructed_data = section_arrays(normalized_gray(img), original_range_min, original_range_max,
+                                        num_sections, points_per_section)
+    
+    # 3. Guardar en archivo .txt
+    if binary:
+        output_txt_path = _save_binary(output_txt_path, reconstructed_data)
+    else:
+        np.savetxt(output_txt_path, reconstructed_data, fmt='%.6f', delimiter=' ')
+    if verbose:
+        print(f"Archivo .txt reconstruido correctamente: {output_txt_path}")
+    return output_txt_path
+
+
+def _convert_one(image_path, output_dir, original_range_min, original_range_max,
+                 method, binary, kwargs):
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    output_path = os.path.join(output_dir, f"{name}.npy" if binary else f"{name}.txt")
+    convert = image_to_txt if method == "pixels" else reconstruct_original_format_corrected
+    return convert(image_path, output_path, original_range_min, original_range_max,
+                   binary=binary, verbose=False, **kwargs)
+
+
+def convert_directory(input_dir, output_dir, original_range_min, original_range_max,
+                      method="pixels", binary=False, n_workers=None, pattern="*.png", **kwargs):
+    """
+    Convierte todas las imagenes de un directorio en paralelo
+
+    Parameters:
+    - input_dir: directorio con las imagenes {idx}.png
+    - output_dir: directorio de salida ({idx}.txt, o {idx}.npy con binary)
+    - original_range_min, original_range_max: rango dCp global
+    - method: "pixels" (image_to_txt) o "sections"
+      (reconstruct_original_format_corrected, admite num_sections y
+      points_per_section en kwargs)
+    - n_workers: procesos en paralelo (1 para convertir en serie)
+    - pattern: patron de las imagenes dentro de input_dir
+
+    Returns:
+        list: rutas generadas, en el orden de las imagenes
+    """
+    if method not in ("pixels", "sections"):
+        raise ValueError(f"Unknown method {method!r}, use 'pixels' or 'sections'")
+    os.makedirs(output_dir, exist_ok=True)
+    images = sorted(glob.glob(os.path.join(input_dir, pattern)))
+    convert = functools.partial(_convert_one, output_dir=output_dir,
+                                original_range_min=original_range_min,
+                                original_range_max=original_range_max,
+                                method=method, binary=binary, kwargs=kwargs)
+
+    if n_workers == 1 or len(images) < 2:
+        outputs = [convert(image) for image in images]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(images) // (4 * (n_workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            outputs = list(pool.map(convert, images, chunksize=chunksize))
+
+    print(f"{len(outputs)} imagenes convertidas en {output_dir}")
+    return outputs
+
+
+def validate_conversion(original_image, reconstructed_image, original_range_min, original_range_max):
+    """
+    Función auxiliar para validar la conversión (opcional)
+    """
+    # Convertir ambas imágenes a formato comparable
+    img1 = cv2.imread(original_image, cv2.IMREAD_GRAYSCALE)
+    img2 = cv2.imread(reconstructed_image, cv2.IMREAD_GRAYSCALE)
+    
+    if img1.shape != img2.shape:
+        print("Advertencia: Dimensiones diferentes")
+        return False
+    
+    # Calcular diferencia
+    diff = np.abs(img1.astype(float) - img2.astype(float))
+    max_diff = np.max(diff)
+    mean_diff = np.mean(diff)
+    
+    print(f"Diferencia máxima: {max_diff}")
+    print(f"Diferencia media: {mean_diff}")
+    
+    return mean_diff < 50  # Umbral arbitrario
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Parámetros globales (debes proporcionar los valores reales)
+    dcp_min_global = -2.0885  # Ejemplo
+    dcp_max_global = -0.0185  # Ejemplo
+    
+    # Procesar una imagen
+    image_file = "0.png"  # Imagen de entrada
+    output_file = "reconstructed_0.txt"  # Archivo de salida
+    
+    # Método 1: Simple conversión
+    image_to_txt(image_file, output_file, dcp_min_global, dcp_max_global)
+    
+    # Método 2: Conversión más estructurada
+    reconstruct_original_format_corrected(
+        image_file, 
+        "structured_0.txt", 
+        dcp_min_global, 
+        dcp_max_global,
+        num_sections=20, 
+        points_per_section=20
     )
\ No newline at end of file
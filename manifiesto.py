@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+
+
+class RunManifest:
+    """
+    Manifiesto persistente de una campaña en formato JSON-lines.
+
+    Cada linea registra el resultado de una etapa para un indice de
+    configuracion: {"seq", "idx", "stage", "status", "outputs", "duration",
+    "time", ...extras}. El archivo solo crece; el ultimo registro de cada
+    (idx, stage) es el que cuenta, asi que una caida a mitad de campaña
+    nunca corrompe lo ya terminado.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self._seq = 0
+        # Una caida puede dejar la ultima linea sin '\n': el primer registro
+        # nuevo empieza en una linea propia para no quedar pegado a ella
+        self._terminate = False
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    self._terminate = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Ultima linea truncada por una caida: se ignora
+                        continue
+                    self.records[(record["idx"], record["stage"])] = record
+                    self._seq = max(self._seq, record["seq"])
+
+    def record(self, idx, stage, status, outputs=(), duration=0.0, **extra):
+        """
+        Añade un registro al manifiesto y lo escribe inmediatamente a disco
+        """
+        self._seq += 1
+        record = {
+            "seq": self._seq,
+            "idx": int(idx),
+            "stage": stage,
+            "status": status,
+            "outputs": list(outputs),
+            "duration": round(float(duration), 6),
+            "time": time.time(),
+        }
+        record.update(extra)
+
+        with open(self.path, 'a') as f:
+            f.write(("\n" if self._terminate else "") + json.dumps(record) + "\n")
+        self._terminate = False
+        self.records[(record["idx"], stage)] = record
+        return record
+
+    def get(self, idx, stage):
+        return self.records.get((int(idx), stage))
+
+    def is_done(self, idx, stage, after=None, **match):
+        """
+        True si la etapa termino bien, sus salidas siguen en disco, es
+        posterior a la etapa 'after' del mismo indice y sus extras coinciden
+        con 'match' (por ejemplo el rango dCp usado al renderizar)
+        """
+        record = self.get(idx, stage)
+        if record is None or record["status"] != "ok":
+            return False
+        if not all(os.path.exists(path) for path in record["outputs"]):
+            return False
+        if after is not None:
+            upstream = self.get(idx, after)
+            if upstream is None or upstream["seq"] > record["seq"]:
+                return False
+        return all(record.get(key) == value for key, value in match.items())
+
+    def pending(self, indices, stage, after=None, **match):
+        """
+        Indices cuya etapa falta, fallo o quedo obsoleta
+        """
+        return [idx for idx in indices if not self.is_done(idx, stage, after=after, **match)]
+
+    def summary(self, stage):
+        """
+        Cuenta de registros por estado para una etapa
+        """
+        counts = {}
+        for (idx, name), record in self.records.items():
+            if name == stage:
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return counts
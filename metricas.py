@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import uuid
+import contextlib
+
+try:
+    import resource
+except ImportError:
+    # Windows: el pico de memoria sale de psutil si esta instalado
+    resource = None
+
+
+# Mensajes por configuracion en consola (CPWING, Organizador, test1). Se
+# guarda en el entorno para que los workers 'spawn' lo hereden
+VERBOSE = os.environ.get("DCP_VERBOSE", "1") != "0"
+
+# Sub-etapas medidas en este proceso desde el ultimo collect()
+_timings = {}
+
+
+def set_verbose(verbose):
+    """
+    Activa o silencia los mensajes por configuracion, en este proceso y en
+    los workers que se lancen despues
+    """
+    global VERBOSE
+    VERBOSE = bool(verbose)
+    os.environ["DCP_VERBOSE"] = "1" if VERBOSE else "0"
+
+
+def log(*args, **kwargs):
+    """
+    print que respeta VERBOSE
+    """
+    if VERBOSE:
+        print(*args, **kwargs)
+
+
+@contextlib.contextmanager
+def timer(name):
+    """
+    Mide un bloque (p. ej. ComputeGeometry dentro del worker) y lo acumula
+    como sub-etapa 'name' hasta el siguiente collect()
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings[name] = _timings.get(name, 0.0) + time.perf_counter() - inicio
+
+
+def collect():
+    """
+    Sub-etapas medidas desde la ultima llamada, y las olvida
+
+    Returns:
+        dict: {nombre: segundos}
+    """
+    timings = dict(_timings)
+    _timings.clear()
+    return timings
+
+
+def peak_rss():
+    """
+    Pico de memoria residente de este proceso [bytes] (None si no se puede
+    medir)
+    """
+    if resource is not None:
+        # ru_maxrss esta en KB en Linux y en bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    memory = psutil.Process().memory_info()
+    return int(getattr(memory, "peak_wset", memory.rss))
+
+
+def file_bytes(*paths):
+    """
+    Tamaño total de los archivos que existen
+    """
+    return sum(os.path.getsize(path) for path in paths if path and os.path.exists(path))
+
+
+class MetricsLog:
+    """
+    Metricas por configuracion y etapa en JSON-lines, una linea por medida:
+    {"idx", "stage", "duration", "bytes", "rss_peak", "time", "run"}. Las
+    etapas son las de campana (solve, parse, stats, render, validate) y las
+    sub-etapas del solver (build, compute_geometry, sweep_solve, cpslicer,
+    split). Cada instancia es una ejecucion ("run") distinta, para que
+    summary no mezcle una campaña reanudada con la anterior
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.run = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        # Como en RunManifest: tras una caida la ultima linea puede no
+        # terminar en '\n' y la siguiente medida quedaria pegada a ella
+        self._terminate = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                self._terminate = f.read(1) != b"\n"
+
+    def write(self, idx, stage, duration, bytes=None, rss_peak=None, **extra):
+        """
+        Añade una medida; rss_peak por defecto es el del proceso actual
+        """
+        record = {
+            "idx": int(idx),
+            "stage": stage,
+            "duration": round(float(duration), 6),
+            "bytes": bytes,
+            "rss_peak": peak_rss() if rss_peak is None else rss_peak,
+            "time": time.time(),
+            "run": self.run,
+        }
+        record.update(extra)
+        with open(self.path, 'a') as f:
+            f.write(("\n" if self._terminate else "") + json.dumps(record) + "\n")
+        self._terminate = False
+        return record
+
+    def write_solve(self, result):
+        """
+        Medidas de un resultado de paralelo.iter_campaign / vlm.iter_campaign:
+        la etapa solve y las sub-etapas que el worker midio con timer()
+        """
+        status = "ok" if result["error"] is None else "failed"
+        self.write(result["idx"], "solve", result["duration"],
+                   bytes=file_bytes(result["path"]), rss_peak=result.get("rss_peak"),
+                   status=status)
+        for stage, duration in result.get("timings", {}).items():
+            self.write(result["idx"], stage, duration, rss_peak=result.get("rss_peak"),
+                       status=status)
+
+
+def read_metrics(path):
+    """
+    Registros de un archivo de metricas (una ultima linea truncada se ignora)
+    """
+    records = []
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def summary(path='campaign_metrics.jsonl', report_path=None, run='last'):
+    """
+    Resumen por etapa: numero de medidas, p50/p95/media/total de la
+    duracion, configuraciones por hora de un proceso (3600 / media), bytes
+    escritos y pico de memoria. Imprime ademas el ritmo real de la campaña
+    (configuraciones resueltas por hora de reloj)
+
+    Parameters:
+    - run: ejecucion resumida (MetricsLog.run); 'last' la ultima del
+      archivo, None todas. Con varias, el tiempo de reloj incluiria las
+      pausas entre ejecuciones
+
+    Returns:
+        pd.DataFrame: una fila por etapa (se guarda en report_path si se da)
+    """
+    import pandas as pd
+
+    records = pd.DataFrame(read_metrics(path))
+    if run is not None and not records.empty:
+        # Registros sin "run": archivos anteriores, una sola ejecucion
+        runs = records["run"] if "run" in records else pd.Series(None, index=records.index)
+        if run == 'last':
+            run = runs.iloc[-1]
+        records = records[runs.isna() if pd.isna(run) else runs == run]
+    if "status" in records:
+        # Los fallos no cuentan en los tiempos
+        records = records[records["status"].fillna("ok") != "failed"]
+    if records.empty:
+        print(f"No metrics in {path}" + (f" for run {run}" if run is not None else ""))
+        return None
+
+    grouped = records.groupby("stage", sort=False)
+    report = pd.DataFrame({
+        "n": grouped["duration"].size(),
+        "p50": grouped["duration"].median(),
+        "p95": grouped["duration"].quantile(0.95),
+        "mean": grouped["duration"].mean(),
+        "total": grouped["duration"].sum(),
+        "mb_written": grouped["bytes"].sum(min_count=1) / 1024**2,
+        "rss_peak_mb": grouped["rss_peak"].max() / 1024**2,
+    })
+    report["configs_per_hour"] = 3600 / report["mean"]
+
+    solved = records[records["stage"] == "solve"]
+    print("\n" + "="*50)
+    if run is not None and not pd.isna(run):
+        print(f"Run {run}")
+    if len(solved):
+        wall = records["time"].max() - (solved["time"] - solved["duration"]).min()
+        print(f"Campaign: {solved['idx'].nunique()} configurations solved in {wall:.1f} s "
+              f"({3600 * solved['idx'].nunique() / max(wall, 1e-9):.0f} configurations/hour)")
+    print("="*50)
+    print(report.to_string(float_format=lambda v: f"{v:.4f}"))
+    if report_path is not None:
+        report.to_csv(report_path)
+        print(f"Report saved to: {report_path}")
+    return report
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Resumen de las metricas de la campaña del directorio actual
+    summary('campaign_metrics.jsonl', report_path='metrics_report.csv')
@@ -1,112 +1,253 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Fri Aug 29 14:57:38 2025
-
-@author: Aspirant2
-"""
-import numpy as np
-
-def find_min_dcp(file, all_min):
-    """
-    Analiza el archivo '0.txt' y encuentra el valor mínimo en la tercera columna.
-    
-    Returns:
-        float: El valor mínimo encontrado en la tercera columna
-    """
-    min_value = all_min # Inicializar con infinito para asegurar que cualquier número será menor
-    
-    try:
-        with open(f'{file}', 'r') as file:
-            for line in file:
-                # Saltar líneas vacías
-                if not line.strip():
-                    continue
-                
-                # Dividir por tabulaciones y limpiar espacios
-                columns = line.strip().split('\t')
-                
-                # Verificar que tenga al menos 3 columnas
-                if len(columns) >= 3:
-                    try:
-                        # Convertir la tercera columna a float
-                        dcp_value = float(columns[2])
-                        
-                        # Actualizar el mínimo si encontramos un valor menor
-                        if dcp_value < min_value:
-                            min_value = dcp_value
-                    except ValueError:
-                        # Ignorar líneas con valores no numéricos en la tercera columna
-                        continue
-    
-    except FileNotFoundError:
-        print("Error: El archivo '0.txt' no se encontró en el directorio actual.")
-        return None
-    
-    # Si no se encontró ningún valor válido
-    if min_value == float('inf'):
-        print("Advertencia: No se encontraron valores numéricos válidos en la tercera columna.")
-        return None
-    
-    return min_value
-
-def find_max_dcp(file, all_max):
-    """
-    Analiza el archivo '0.txt' y encuentra el valor mínimo en la tercera columna.
-    
-    Returns:
-        float: El valor mínimo encontrado en la tercera columna
-    """
-    max_value = all_max  # Inicializar con menos infinito para asegurar que cualquier número será mayor
-    
-    try:
-        with open(f'{file}', 'r') as file:
-            for line in file:
-                # Saltar líneas vacías
-                if not line.strip():
-                    continue
-                
-                # Dividir por tabulaciones y limpiar espacios
-                columns = line.strip().split('\t')
-                
-                # Verificar que tenga al menos 3 columnas
-                if len(columns) >= 3:
-                    try:
-                        # Convertir la tercera columna a float
-                        dcp_value = float(columns[2])
-                        
-                        # Actualizar el mínimo si encontramos un valor menor
-                        if dcp_value > max_value:
-                            max_value = dcp_value
-                    except ValueError:
-                        # Ignorar líneas con valores no numéricos en la tercera columna
-                        continue
-    
-    except FileNotFoundError:
-        print("Error: El archivo '0.txt' no se encontró en el directorio actual.")
-        return None
-    
-    # Si no se encontró ningún valor válido
-    if max_value == float('-inf'):
-        print("Advertencia: No se encontraron valores numéricos válidos en la tercera columna.")
-        return None
-    
-    return max_value
-'''
-configurations = np.load('wing_configurations.npy')
-
-all_min = float('inf')                              #encontrar el minimo total
-for idx, config in enumerate(configurations):
-    input_filename = f"{idx}.txt"
-    dcp_min = find_min_dcp(input_filename, all_min)
-    if dcp_min < all_min:
-        all_min=dcp_min
-        print(f" new minimum in {input_filename}")
-        
-all_max = float('-inf')                            #encontrar el minimo total
-for idx, config in enumerate(configurations):
-    input_filename = f"{idx}.txt"
-    dcp_max = find_max_dcp(input_filename, all_max)
-    if dcp_max > all_max:
-        all_max = dcp_max
-        print(f" new maximum in {input_filename}")
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Aug 29 14:57:38 2025
+
+@author: Aspirant2
+"""
+import os
+import numpy as np
+
+def find_min_dcp(file, all_min):
+    """
+    Analiza el archivo '0.txt' y encuentra el valor mínimo en la tercera columna.
+    
+    Returns:
+        float: El valor mínimo encontrado en la tercera columna
+    """
+    min_value = all_min # Inicializar con infinito para asegurar que cualquier número será menor
+    
+    try:
+        with open(f'{file}', 'r') as file:
+            for line in file:
+                # Saltar líneas vacías
+                if not line.strip():
+                    continue
+                
+                # Dividir por tabulaciones y limpiar espacios
+                columns = line.strip().split('\t')
+                
+                # Verificar que tenga al menos 3 columnas
+                if len(columns) >= 3:
+                    try:
+                        # Convertir la tercera columna a float
+                        dcp_value = float(columns[2])
+                        
+                        # Actualizar el mínimo si encontramos un valor menor
+                        if dcp_value < min_value:
+                            min_value = dcp_value
+                    except ValueError:
+                        # Ignorar líneas con valores no numéricos en la tercera columna
+                        continue
+    
+    except FileNotFoundError:
+        print("Error: El archivo '0.txt' no se encontró en el directorio actual.")
+        return None
+    
+    # Si no se encontró ningún valor válido
+    if min_value == float('inf'):
+        print("Advertencia: No se encontraron valores numéricos válidos en la tercera columna.")
+        return None
+    
+    return min_value
+
+def find_max_dcp(file, all_max):
+    """
+    Analiza el archivo '0.txt' y encuentra el valor mínimo en la tercera columna.
+    
+    Returns:
+        float: El valor mínimo encontrado en la tercera columna
+    """
+    max_value = all_max  # Inicializar con menos infinito para asegurar que cualquier número será mayor
+    
+    try:
+        with open(f'{file}', 'r') as file:
+            for line in file:
+                # Saltar líneas vacías
+                if not line.strip():
+                    continue
+                
+                # Dividir por tabulaciones y limpiar espacios
+                columns = line.strip().split('\t')
+                
+                # Verificar que tenga al menos 3 columnas
+                if len(columns) >= 3:
+                    try:
+                        # Convertir la tercera columna a float
+                        dcp_value = float(columns[2])
+                        
+                        # Actualizar el mínimo si encontramos un valor menor
+                        if dcp_value > max_value:
+                            max_value = dcp_value
+                    except ValueError:
+                        # Ignorar líneas con valores no numéricos en la tercera columna
+                        continue
+    
+    except FileNotFoundError:
+        print("Error: El archivo '0.txt' no se encontró en el directorio actual.")
+        return None
+    
+    # Si no se encontró ningún valor válido
+    if max_value == float('-inf'):
+        print("Advertencia: No se encontraron valores numéricos válidos en la tercera columna.")
+        return None
+    
+    return max_value
+
+
+def _empty_stats():
+    return {"count": 0, "mean": 0.0, "m2": 0.0,
+            "min": float('inf'), "max": float('-inf')}
+
+
+def array_stats(values):
+    """
+    Estadisticas parciales de un array de dCp (los NaN se ignoran)
+
+    Returns:
+        dict: count, mean, m2 (suma de cuadrados de desviaciones), min, max
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return _empty_stats()
+    mean = float(values.mean())
+    return {"count": int(len(values)), "mean": mean,
+            "m2": float(((values - mean)**2).sum()),
+            "min": float(values.min()), "max": float(values.max())}
+
+
+def merge_stats(a, b):
+    """
+    Combina dos estadisticas parciales (algoritmo paralelo de Chan), de modo
+    que añadir configuraciones nuevas no obliga a releer las anteriores
+    """
+    if a["count"] == 0:
+        return dict(b)
+    if b["count"] == 0:
+        return dict(a)
+    count = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+    return {"count": count,
+            "mean": a["mean"] + delta * b["count"] / count,
+            "m2": a["m2"] + b["m2"] + delta**2 * a["count"] * b["count"] / count,
+            "min": min(a["min"], b["min"]),
+            "max": max(a["max"], b["max"])}
+
+
+def finalize_stats(stats):
+    """
+    Añade la desviacion estandar a unas estadisticas combinadas
+    """
+    stats = dict(stats)
+    stats["std"] = (stats["m2"] / stats["count"])**0.5 if stats["count"] else float('nan')
+    return stats
+
+
+def _read_dcp_column(file):
+    with open(file, 'r') as f:
+        text = f.read()
+
+    # Camino rapido: archivo de columnas separadas por tabulaciones con
+    # exactamente 3 valores en cada linea. Dos tabulaciones por linea dejan
+    # como mucho 3 valores en cada una, asi que si el total es 3 por linea
+    # ninguna tiene menos (un total multiplo de 3 no basta: una fila de 2
+    # y otra de 4 lo cumplen)
+    if ' ' not in text:
+        tokens = text.split()
+        data = np.frombuffer(text.rstrip('\r\n').encode(), dtype=np.uint8)
+        ends = np.flatnonzero(data == ord('\n'))
+        tabs = np.concatenate(([0], np.cumsum(data == ord('\t'))))
+        per_line = np.diff(tabs[np.concatenate(([0], ends, [len(data)]))])
+        if len(data) and np.all(per_line == 2) and len(tokens) == 3 * len(per_line):
+            try:
+                return np.array(tokens, dtype=float).reshape(-1, 3)[:, 2]
+            except ValueError:
+                pass
+
+    # Mismas reglas que find_min_dcp: lineas con menos de 3 columnas o con
+    # una tercera columna no numerica se ignoran
+    values = []
+    for line in text.splitlines():
+        columns = line.strip().split('\t')
+        if len(columns) >= 3:
+            try:
+                values.append(float(columns[2]))
+            except ValueError:
+                continue
+    return np.array(values, dtype=float)
+
+
+def file_stats(file):
+    """
+    Estadisticas parciales del dCp (tercera columna) de un {idx}.txt en una
+    sola lectura
+    """
+    return array_stats(_read_dcp_column(file))
+
+
+def iter_file_stats(files, n_workers=None):
+    """
+    Calcula file_stats de varios archivos en paralelo, en el orden dado
+    """
+    files = list(files)
+    if n_workers == 1 or len(files) < 2:
+        for file in files:
+            yield file_stats(file)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(files) // (4 * (n_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        yield from pool.map(file_stats, files, chunksize=chunksize)
+
+
+def campaign_stats(files, n_workers=None, previous=None):
+    """
+    Minimo, maximo, numero de puntos, media y desviacion del dCp de toda una
+    campaña en una sola pasada, en lugar de find_min_dcp + find_max_dcp
+
+    Parameters:
+    - files: archivos {idx}.txt a reducir
+    - n_workers: procesos en paralelo (1 para leer en serie)
+    - previous: estadisticas ya calculadas (con m2) a las que se suman
+      los archivos nuevos sin releer los antiguos
+
+    Returns:
+        dict: min, max, count, mean, std, m2
+    """
+    total = _empty_stats() if previous is None else previous
+    for stats in iter_file_stats(files, n_workers=n_workers):
+        total = merge_stats(total, stats)
+    return finalize_stats(total)
+
+
+def iter_store_stats(store, indices, chunk=256):
+    """
+    Igual que iter_file_stats pero sobre el dCp de un DatasetStore, leyendo
+    el memory-map por bloques de 'chunk' configuraciones en vez de los .txt
+    """
+    indices = np.asarray(indices, dtype=int)
+    for start in range(0, len(indices), chunk):
+        block = np.asarray(store.dcp[indices[start:start + chunk]])
+        for values in block:
+            yield array_stats(values)
+
+'''
+configurations = np.load('wing_configurations.npy')
+
+all_min = float('inf')                              #encontrar el minimo total
+for idx, config in enumerate(configurations):
+    input_filename = f"{idx}.txt"
+    dcp_min = find_min_dcp(input_filename, all_min)
+    if dcp_min < all_min:
+        all_min=dcp_min
+        print(f" new minimum in {input_filename}")
+        
+all_max = float('-inf')                            #encontrar el minimo total
+for idx, config in enumerate(configurations):
+    input_filename = f"{idx}.txt"
+    dcp_max = find_max_dcp(input_filename, all_max)
+    if dcp_max > all_max:
+        all_max = dcp_max
+        print(f" new maximum in {input_filename}")
 '''
\ No newline at end of file
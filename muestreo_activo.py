@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as np
+import metricas as mt
+import parametros as pm
+
+
+def _kernel(A, B, length):
+    d = (A**2).sum(axis=1)[:, None] + (B**2).sum(axis=1)[None, :] - 2 * A @ B.T
+    return np.exp(-0.5 * np.maximum(d, 0.0) / length**2)
+
+
+def median_distance(X):
+    """
+    Mediana de las distancias entre pares de filas de X, sin el array
+    [N, N, d] de diferencias (pdist guarda solo las N (N - 1) / 2 distancias)
+    """
+    from scipy.spatial.distance import pdist
+    return float(np.median(pdist(X))) if len(X) > 1 else 0.0
+
+
+def fit_ensemble(X, Y, n_models=8, ridge=1e-6, seed=None):
+    """
+    Surrogate barato: conjunto de regresiones kernel ridge (kernel
+    gaussiano, parametros pesados con relevance) ajustadas sobre remuestreos
+    bootstrap de las configuraciones resueltas. La dispersion entre modelos
+    estima la incertidumbre
+
+    Parameters:
+    - X: configuraciones resueltas escaladas a [0, 1] [N, d]
+    - Y: campos dCp de cada configuracion [N, F]
+    - n_models: modelos del conjunto
+    - ridge: regularizacion relativa a la diagonal del kernel
+
+    Returns:
+        list: modelos (X_train pesado, pesos, media de Y, longitud del kernel,
+        pesos de los parametros)
+    """
+    rng = np.random.default_rng(seed)
+    scales = relevance(X, Y)
+    Xs = X * scales
+    # Longitud del kernel: mediana de las distancias entre configuraciones
+    length = median_distance(Xs) if len(X) > 1 else 1.0
+
+    models = []
+    for _ in range(n_models):
+        sample = np.unique(rng.integers(0, len(X), len(X)))
+        Xb, Yb = Xs[sample], Y[sample]
+        mean = Yb.mean(axis=0)
+        K = _kernel(Xb, Xb, length)
+        weights = np.linalg.solve(K + ridge * len(Xb) * np.eye(len(Xb)), Yb - mean)
+        models.append((Xb, weights, mean, length, scales))
+    return models
+
+
+def relevance(X, Y, floor=0.05):
+    """
+    Peso de cada parametro en la distancia del kernel: sensibilidad lineal
+    del campo a cada parametro, relativa a la del mas influyente. Los
+    parametros que apenas cambian el dCp (area, por ejemplo, una vez
+    normalizado el campo) casi no separan configuraciones
+    """
+    if len(X) <= X.shape[1] + 1:
+        return np.ones(X.shape[1])
+    A = np.column_stack((X - X.mean(axis=0), np.ones(len(X))))
+    coef = np.linalg.lstsq(A, Y - Y.mean(axis=0), rcond=None)[0][:-1]
+    sensitivity = np.sqrt((coef**2).sum(axis=1))
+    return np.maximum(sensitivity / sensitivity.max(), floor)
+
+
+def predict_ensemble(models, X):
+    """
+    Returns:
+        tuple: (media [M, F], desviacion entre modelos [M, F])
+    """
+    predictions = np.stack([_kernel(X * scales, Xb, length) @ weights + mean
+                            for Xb, weights, mean, length, scales in models])
+    return predictions.mean(axis=0), predictions.std(axis=0)
+
+
+def select_batch(candidates, score, batch_size, length):
+    """
+    Elige los batch_size candidatos de mayor puntuacion sin amontonarlos:
+    tras cada eleccion se penaliza el entorno del elegido (radio ~ length)
+    """
+    score = score.copy()
+    chosen = []
+    for _ in range(min(batch_size, len(candidates))):
+        best = int(np.argmax(score))
+        chosen.append(best)
+        d = ((candidates - candidates[best])**2).sum(axis=1)
+        score *= 1.0 - np.exp(-0.5 * d / length**2)
+        score[best] = -np.inf
+    return np.array(chosen, dtype=int)
+
+
+def active_sampling(evaluate, n_initial=20, batch_size=10, n_rounds=5, n_candidates=2000,
+                    n_models=8, initial=None, seed=None, callback=None):
+    """
+    Campaña adaptativa: en cada ronda ajusta el surrogate con lo resuelto,
+    puntua candidatos LHS por la discrepancia entre modelos y solo resuelve
+    los batch_size mas inciertos
+
+    Parameters:
+    - evaluate: funcion configuraciones [k, C] -> campos dCp [k, F] (fila
+      de NaN si una configuracion falla); ver CampaignEvaluator o
+      sintetico.synthetic_field
+    - n_initial: configuraciones LHS iniciales si no se da 'initial'
+    - batch_size: configuraciones resueltas por ronda
+    - n_rounds: numero de rondas
+    - n_candidates: candidatos puntuados por ronda
+    - initial: tupla (configuraciones, campos) ya resueltas para empezar;
+      si es una tabla de condiciones (parametros.condition_table) los
+      candidatos incluyen tambien Mach y alpha
+    - callback: funcion(ronda, configuraciones, campos, modelos) tras cada
+      ronda, por ejemplo para medir el error frente a un conjunto de prueba
+
+    Returns:
+        tuple: (configuraciones [N, C], campos [N, F])
+    """
+    from pyDOE2 import lhs
+
+    rng = np.random.default_rng(seed)
+
+    if initial is None:
+        n_variables = len(pm.parameter_space()[0])
+        configurations = pm.scale_samples(lhs(n_variables, samples=n_initial,
+                                              random_state=rng.integers(2**31)))
+        fields = evaluate(configurations)
+    else:
+        configurations, fields = (np.asarray(a) for a in initial)
+    # Dimension del espacio [0, 1] (geometria, mas Mach y alpha si los hay)
+    n_variables = pm.unit_samples(configurations[:1]).shape[1]
+
+    for round_idx in range(n_rounds):
+        valid = ~np.isnan(fields).any(axis=1)
+        X = pm.unit_samples(configurations[valid])
+        models = fit_ensemble(X, fields[valid], n_models=n_models,
+                              seed=rng.integers(2**31))
+
+        candidates = lhs(n_variables, samples=n_candidates, random_state=rng.integers(2**31))
+        mean, spread = predict_ensemble(models, candidates)
+        score = spread.mean(axis=1)
+        length, scales = models[0][3], models[0][4]
+        chosen = select_batch(candidates * scales, score, batch_size, length)
+
+        new_configurations = pm.scale_samples(candidates[chosen])
+        configurations = np.vstack((configurations, new_configurations))
+        fields = np.vstack((fields, evaluate(new_configurations)))
+
+        mt.log(f"Round {round_idx + 1}/{n_rounds}: {len(chosen)} configurations solved "
+               f"(mean spread {score[chosen].mean():.4g}), {len(configurations)} in total")
+        if callback is not None:
+            callback(round_idx, configurations, fields, models)
+
+    return configurations, fields
+
+
+class CampaignEvaluator:
+    """
+    Evaluador de active_sampling sobre la campaña real: añade las
+    configuraciones nuevas al final de la poblacion (indices estables, como
+    parametros.generate_configurations con append=True), las resuelve con
+    las etapas solve y organize de campana (CPWING.process_configuration
+    por defecto) y devuelve sus campos en la rejilla de test1.resample_sections
+    """
+
+    def __init__(self, population_file='wing_configurations.npy',
+                 manifest_path='campaign_manifest.jsonl', output_dir='.',
+                 n_workers=None, solver=None, nx=20):
+        self.population_file = population_file
+        self.manifest_path = manifest_path
+        self.output_dir = output_dir
+        self.n_workers = n_workers
+        self.solver = solver
+        self.nx = nx
+
+    def population(self):
+        if os.path.exists(self.population_file):
+            return np.load(self.population_file)
+        return None
+
+    def fields(self, indices):
+        """
+        Campos [k, secciones * nx] de los indices ya organizados (NaN si no)
+        """
+        from predictor import load_fields
+        from manifiesto import RunManifest
+
+        manifest = RunManifest(self.manifest_path)
+        indices = list(indices)
+        grids = load_fields(indices, self.output_dir, self.nx)
+        done = np.array([manifest.is_done(idx, "organize") for idx in indices], dtype=bool)
+        grids[~done] = np.nan
+        return grids.reshape(len(indices), -1)
+
+    def solve(self, configurations):
+        import campana
+        from manifiesto import RunManifest
+
+        manifest = RunManifest(self.manifest_path)
+        campana.stage_solve(configurations, manifest, output_dir=self.output_dir,
+                            n_workers=self.n_workers, solver=self.solver)
+        campana.stage_organize(configurations, manifest, output_dir=self.output_dir)
+
+    def initial(self):
+        """
+        Poblacion existente y sus campos (resolviendo lo que falte), para
+        empezar active_sampling desde ella
+        """
+        configurations = self.population()
+        self.solve(configurations)
+        return configurations, self.fields(range(len(configurations)))
+
+    def __call__(self, new_configurations):
+        population = self.population()
+        start = 0 if population is None else len(population)
+        configurations = (new_configurations if population is None
+                          else np.vstack((population, new_configurations)))
+        np.save(self.population_file, configurations)
+
+        self.solve(configurations)
+        return self.fields(range(start, len(configurations)))
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Campaña adaptativa sobre wing_configurations.npy: si ya existe se parte
+    # de lo resuelto; si no, de N_INITIAL configuraciones LHS
+    N_INITIAL = 20
+    BATCH_SIZE = 10
+    N_ROUNDS = 5
+
+    evaluator = CampaignEvaluator()
+    initial = evaluator.initial() if evaluator.population() is not None else None
+    configurations, fields = active_sampling(evaluator, n_initial=N_INITIAL,
+                                             batch_size=BATCH_SIZE, n_rounds=N_ROUNDS,
+                                             initial=initial)
+    print(f"{len(configurations)} configurations in {evaluator.population_file}")
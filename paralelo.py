@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import shutil
+import multiprocessing as mp
+import numpy as np
+import metricas as mt
+
+
+def vsp_solver(config_idx, config, **kwargs):
+    """
+    Solver por defecto: CPWING.process_configuration. Se importa dentro
+    del worker para que cada proceso tenga su propio estado de OpenVSP
+    """
+    import CPWING
+    return CPWING.process_configuration(config_idx, config, **kwargs)
+
+
+def vsp_sweep_solver(config_indices, configs, **kwargs):
+    """
+    Solver por defecto con sweep=True: CPWING.process_geometry, que
+    resuelve todas las condiciones de una geometria con un solo modelo
+    """
+    import CPWING
+    return CPWING.process_geometry(config_indices, configs, **kwargs)
+
+
+def geometry_groups(configurations, indices):
+    """
+    Agrupa los indices por geometria (area, AR, taper, flecha), en el orden
+    en que aparece cada geometria
+
+    Returns:
+        list: listas de indices
+    """
+    groups = {}
+    for idx in indices:
+        groups.setdefault(tuple(np.asarray(configurations[idx][:4]).tolist()), []).append(int(idx))
+    return list(groups.values())
+
+
+def _init_worker(scratch_root):
+    # Cada worker trabaja en su propio directorio para que los archivos
+    # VSPAERO_run.* de dos configuraciones nunca se pisen
+    scratch_dir = os.path.join(scratch_root, f"worker_{os.getpid()}")
+    os.makedirs(scratch_dir, exist_ok=True)
+    os.chdir(scratch_dir)
+
+
+def _clean_scratch():
+    for name in os.listdir('.'):
+        if os.path.isdir(name):
+            shutil.rmtree(name, ignore_errors=True)
+        else:
+            os.remove(name)
+
+
+def _solve_one(task):
+    config_idx, config, solver, output_dir = task
+    produced = f"{config_idx}.slc"
+    inicio = time.perf_counter()
+    result = {"idx": config_idx, "path": None, "duration": 0.0, "error": None}
+
+    try:
+        solver(config_idx, config)
+        if not os.path.exists(produced):
+            raise FileNotFoundError(f"{produced} not generated for configuration {config_idx}")
+
+        # os.replace es atomico dentro del mismo sistema de archivos: nunca
+        # queda un {idx}.slc a medio escribir en el directorio de salida
+        result["path"] = os.path.join(output_dir, produced)
+        os.replace(produced, result["path"])
+
+        vsp_file = f"drone_{config_idx}.vsp3"
+        if os.path.exists(vsp_file):
+            os.replace(vsp_file, os.path.join(output_dir, vsp_file))
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        _clean_scratch()
+
+    result["duration"] = time.perf_counter() - inicio
+    # Sub-etapas que el solver midio con metricas.timer
+    result["timings"] = mt.collect()
+    result["rss_peak"] = mt.peak_rss()
+    return result
+
+
+def _solve_group(task):
+    config_indices, configs, solver, output_dir = task
+    inicio = time.perf_counter()
+    results = [{"idx": idx, "path": None, "duration": 0.0, "error": None}
+               for idx in config_indices]
+
+    try:
+        solver(config_indices, configs)
+        for result in results:
+            produced = f"{result['idx']}.slc"
+            if not os.path.exists(produced):
+                result["error"] = (f"FileNotFoundError: {produced} not generated for "
+                                   f"configuration {result['idx']}")
+                continue
+            result["path"] = os.path.join(output_dir, produced)
+            os.replace(produced, result["path"])
+
+        vsp_file = f"drone_{config_indices[0]}.vsp3"
+        if os.path.exists(vsp_file):
+            os.replace(vsp_file, os.path.join(output_dir, vsp_file))
+    except Exception as exc:
+        for result in results:
+            result["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        _clean_scratch()
+
+    # El tiempo de la geometria se reparte entre sus condiciones
+    duration = (time.perf_counter() - inicio) / len(results)
+    timings = {name: value / len(results) for name, value in mt.collect().items()}
+    rss_peak = mt.peak_rss()
+    for result in results:
+        result["duration"] = duration
+        result["timings"] = timings
+        result["rss_peak"] = rss_peak
+    return results
+
+
+def iter_campaign(configurations, output_dir='.', n_workers=None, solver=None,
+                  indices=None, scratch_root=None, sweep=False):
+    """
+    Resuelve configuraciones en un pool de procesos y devuelve los resultados
+    a medida que terminan (en orden de finalizacion)
+
+    Parameters:
+    - configurations: array de wing_configurations.npy
+    - output_dir: directorio donde se dejan los {idx}.slc
+    - n_workers: numero de procesos (por defecto os.cpu_count())
+    - solver: callable(config_idx, config) que escribe {config_idx}.slc en el
+      directorio actual; por defecto vsp_solver. Debe ser serializable
+    - indices: subconjunto de indices a resolver (por defecto todos)
+    - scratch_root: raiz de los directorios de trabajo de cada worker; por
+      defecto output_dir/.scratch para que el movimiento final sea atomico
+    - sweep: si es True cada tarea es una geometria con todas sus
+      condiciones de vuelo (geometry_groups) y solver es
+      callable(config_indices, configs), por defecto vsp_sweep_solver
+
+    Yields:
+        dict: {"idx", "path", "duration", "error"} por configuracion
+    """
+    output_dir = os.path.abspath(output_dir)
+    own_scratch = scratch_root is None
+    if own_scratch:
+        scratch_root = os.path.join(output_dir, ".scratch")
+    scratch_root = os.path.abspath(scratch_root)
+
+    if solver is None:
+        solver = vsp_sweep_solver if sweep else vsp_solver
+    if indices is None:
+        indices = range(len(configurations))
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    if sweep:
+        tasks = [(group, configurations[group], solver, output_dir)
+                 for group in geometry_groups(configurations, indices)]
+    else:
+        tasks = [(int(idx), configurations[idx], solver, output_dir) for idx in indices]
+    if not tasks:
+        # Sin nada pendiente no se crea el directorio scratch
+        return
+
+    # spawn: ningun worker hereda el modelo OpenVSP del proceso principal
+    ctx = mp.get_context("spawn")
+    try:
+        os.makedirs(scratch_root, exist_ok=True)
+        with ctx.Pool(min(n_workers, len(tasks)), initializer=_init_worker,
+                      initargs=(scratch_root,)) as pool:
+            if sweep:
+                for results in pool.imap_unordered(_solve_group, tasks):
+                    yield from results
+            else:
+                for result in pool.imap_unordered(_solve_one, tasks):
+                    yield result
+    finally:
+        if own_scratch:
+            shutil.rmtree(scratch_root, ignore_errors=True)
+
+
+def run_campaign(configurations, output_dir='.', n_workers=None, solver=None,
+                 indices=None, scratch_root=None, sweep=False):
+    """
+    Igual que iter_campaign pero devuelve la lista completa ordenada por indice
+    """
+    results = iter_campaign(configurations, output_dir=output_dir, n_workers=n_workers,
+                            solver=solver, indices=indices, scratch_root=scratch_root,
+                            sweep=sweep)
+    return sorted(results, key=lambda r: r["idx"])
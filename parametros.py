@@ -1,98 +1,331 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Fri Apr 25 10:01:04 2025
-
-@author: Damian
-"""
-"""
-wing_area = 10.0       # Wing area [m^2]
-aspect_ratio = 5.0     # Aspect ratio (AR)
-taper_ratio = 0.5      # Taper ratio (c_tip/c_root)
-sweep_angle = 10.0     # Sweep angle [deg] (measured at leading edge)
-flight_speed = 50.0    # Flight speed [m/s]
-air_density = 1.225    # air density [Kg/m3]
-"""
-import numpy as np
-from pyDOE2 import lhs
-import time
-
-
-def generate_configurations(n_samples=20, output_file='configurations.npy'):
-    """
-    Genera configuraciones aleatorias usando Latin Hypercube Sampling (LHS)
-    
-    Parámetros:
-    n_samples (int): Número de configuraciones a generar
-    output_file (str): Nombre del archivo de salida .npy
-    """
-    # Definición de parámetros con sus rangos
-    wing_area = [5.0, 15.0]        # [m²]
-    aspect_ratio = [4.0, 15.0]      # Adimensional
-    taper_ratio = [1.0, 4.0]       # Adimensional
-    sweep_angle = [0.0, 30.0]      # [grados]
-   
-    
-    # Parámetros fijos
-    flight_speed = 50.0            # [m/s]
-    air_density = 1.204            # [kg/m³]
-    num_lonzh = [1.0, 5.0]
-    num_nerv = [1.0, 5.0]
-
-    # Lista de rangos para los parámetros variables
-    variable_ranges = [
-        wing_area,
-        aspect_ratio,
-        taper_ratio,
-        sweep_angle,
-        num_lonzh,
-        num_nerv,
-    ]
-    
-    # Número de parámetros variables
-    n_variables = len(variable_ranges)
-    
-    # Generar muestras LHS en el espacio [0, 1]
-    samples = lhs(n_variables, samples=n_samples)
-    
-    # Escalar las muestras a los rangos reales
-    for i in range(n_variables):
-        low, high = variable_ranges[i]
-        samples[:, i] = low + (high - low) * samples[:, i]
-    
-    # Crear matriz de parámetros fijos (repetidos para cada muestra)
-    fixed_params = np.array([[flight_speed, air_density]] * n_samples)
-    
-    # Combinar parámetros variables y fijos
-    all_configurations = np.hstack((samples, fixed_params))
-    
-    # Guardar en archivo .npy
-    np.save(output_file, all_configurations)
-    
-    print(f"✅ Generadas {n_samples} configuraciones usando LHS")
-    print(f"   Archivo guardado: {output_file}")
-    print(f"   Dimensiones del array: {all_configurations.shape} (filas, columnas)")
-    print("\nColumnas en orden:")
-    print("1. Wing Area [m²]")
-    print("2. Aspect Ratio")
-    print("3. Taper Ratio")
-    print("4. Sweep Angle [deg]")
-    print("5. Flight Speed [m/s] (fijo)")
-    print("6. Air Density [kg/m³] (fijo)")
-
-inicio = time.perf_counter()
-# Parámetro para controlar el número de configuraciones
-NUM_CONFIGURATIONS = 10
-
-# Generar y guardar las configuraciones
-generate_configurations(
-    n_samples=NUM_CONFIGURATIONS,
-    output_file='wing_configurations.npy'
-)
-
-configs = np.load('wing_configurations.npy')
-print(configs[0])  # Primera configuración
-fin = time.perf_counter()
-duracion = fin - inicio
-print("\n" + "="*50)
-print(f"Tiempo de ejecución: {duracion:.4f} segundos")
-print("\n" + "="*50)
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Apr 25 10:01:04 2025
+
+@author: Damian
+"""
+"""
+wing_area = 10.0       # Wing area [m^2]
+aspect_ratio = 5.0     # Aspect ratio (AR)
+taper_ratio = 0.5      # Taper ratio (c_tip/c_root)
+sweep_angle = 10.0     # Sweep angle [deg] (measured at leading edge)
+flight_speed = 50.0    # Flight speed [m/s]
+air_density = 1.225    # air density [Kg/m3]
+"""
+import os
+import numpy as np
+import time
+
+
+# Velocidad del sonido con la que condition_table pasa de Mach a velocidad
+SPEED_OF_SOUND = 343.0
+
+
+def parameter_space():
+    """
+    Rangos de los parámetros variables y valores de los fijos, en el orden
+    de las columnas de las configuraciones
+    """
+    # Definición de parámetros con sus rangos
+    wing_area = [5.0, 15.0]        # [m²]
+    aspect_ratio = [4.0, 15.0]      # Adimensional
+    taper_ratio = [1.0, 4.0]       # Adimensional
+    sweep_angle = [0.0, 30.0]      # [grados]
+   
+    
+    # Parámetros fijos
+    flight_speed = 50.0            # [m/s]
+    air_density = 1.204            # [kg/m³]
+    num_lonzh = [1.0, 5.0]
+    num_nerv = [1.0, 5.0]
+
+    # Lista de rangos para los parámetros variables
+    variable_ranges = [
+        wing_area,
+        aspect_ratio,
+        taper_ratio,
+        sweep_angle,
+        num_lonzh,
+        num_nerv,
+    ]
+    return variable_ranges, [flight_speed, air_density]
+
+
+def condition_space():
+    """
+    Rangos de referencia de las condiciones de vuelo de condition_table
+    (Mach, alpha [grados]); solo sirven para escalarlas a [0, 1] junto a la
+    geometria
+    """
+    return [[0.0, 0.5], [-5.0, 15.0]]
+
+
+def has_conditions(configurations):
+    """
+    True si la tabla lleva la columna de alpha de condition_table (y la
+    velocidad de cada fila sale de su Mach)
+    """
+    variable_ranges, fixed_values = parameter_space()
+    return np.shape(configurations)[1] == len(variable_ranges) + len(fixed_values) + 1
+
+
+def scale_samples(unit_samples):
+    """
+    Convierte muestras en [0, 1]^d a configuraciones completas: parámetros
+    variables en sus rangos reales seguidos de los fijos. Con dos columnas
+    mas (Mach y alpha, como las de unit_samples de una tabla de condiciones)
+    la velocidad pasa a ser Mach * a y alpha se añade al final
+    """
+    variable_ranges, fixed_values = parameter_space()
+    n_variables = len(variable_ranges)
+    unit_samples = np.asarray(unit_samples)
+    low = np.array([r[0] for r in variable_ranges])
+    high = np.array([r[1] for r in variable_ranges])
+    samples = low + (high - low) * unit_samples[:, :n_variables]
+    
+    # Crear matriz de parámetros fijos (repetidos para cada muestra)
+    fixed_params = np.array([fixed_values] * len(samples)).reshape(len(samples), -1)
+    configurations = np.hstack((samples, fixed_params))
+    if unit_samples.shape[1] == n_variables:
+        return configurations
+
+    (mach_low, mach_high), (alpha_low, alpha_high) = condition_space()
+    mach = mach_low + (mach_high - mach_low) * unit_samples[:, n_variables]
+    alpha = alpha_low + (alpha_high - alpha_low) * unit_samples[:, n_variables + 1]
+    configurations[:, n_variables] = mach * SPEED_OF_SOUND
+    return np.column_stack((configurations, alpha))
+
+
+def unit_samples(configurations):
+    """
+    Parámetros variables de las configuraciones escalados a [0, 1]. En una
+    tabla de condiciones (has_conditions) se añaden Mach y alpha escalados
+    con condition_space, para que dos filas de la misma geometria no sean
+    el mismo punto
+    """
+    variable_ranges, fixed_values = parameter_space()
+    n_variables = len(variable_ranges)
+    configurations = np.asarray(configurations)
+    low = np.array([r[0] for r in variable_ranges])
+    high = np.array([r[1] for r in variable_ranges])
+    unit = (configurations[:, :n_variables] - low) / (high - low)
+    if not has_conditions(configurations):
+        return unit
+
+    (mach_low, mach_high), (alpha_low, alpha_high) = condition_space()
+    mach = configurations[:, n_variables] / SPEED_OF_SOUND
+    return np.column_stack((unit, (mach - mach_low) / (mach_high - mach_low),
+                            (configurations[:, -1] - alpha_low) / (alpha_high - alpha_low)))
+
+
+def table_conditions(configurations):
+    """
+    Angulos de ataque y numeros de Mach de una tabla de condition_table
+
+    Returns:
+        tuple: (alphas, machs) ordenados
+    """
+    n_variables = len(parameter_space()[0])
+    configurations = np.asarray(configurations)
+    alphas = np.unique(np.round(configurations[:, -1], 10))
+    machs = np.unique(np.round(configurations[:, n_variables] / SPEED_OF_SOUND, 10))
+    return alphas, machs
+
+
+def condition_table(configurations, alphas, machs, speed_of_sound=SPEED_OF_SOUND):
+    """
+    Repite cada geometria para todas las condiciones de vuelo (alpha, Mach)
+    y añade el angulo de ataque como ultima columna. Las filas de una
+    geometria quedan seguidas, con Mach en el bucle exterior y alpha en el
+    interior (el orden de los casos de un barrido VSPAERO), de modo que
+    campana resuelve cada geometria una sola vez (sweep=True)
+
+    Parameters:
+    - configurations: configuraciones sin columna de alpha [N, C]
+    - alphas: angulos de ataque [grados]
+    - machs: numeros de Mach; la velocidad de vuelo pasa a ser Mach * a
+
+    Returns:
+        np.ndarray: [N * len(machs) * len(alphas), C + 1]
+    """
+    configurations = np.asarray(configurations, dtype=float)
+    mach_grid, alpha_grid = (g.ravel() for g in np.meshgrid(machs, alphas, indexing='ij'))
+    rows = np.repeat(configurations, len(mach_grid), axis=0)
+    rows[:, 6] = np.tile(mach_grid, len(configurations)) * speed_of_sound
+    return np.column_stack((rows, np.tile(alpha_grid, len(configurations))))
+
+
+def maximin_extend(existing, n_new, n_candidates=None, seed=None):
+    """
+    Elige n_new puntos nuevos en [0, 1]^d que se alejen lo mas posible de
+    los existentes y entre si (criterio maximin voraz sobre candidatos LHS)
+
+    Parameters:
+    - existing: puntos ya muestreados, escalados a [0, 1] [N, d]
+    - n_new: numero de puntos a añadir
+    - n_candidates: tamaño del conjunto de candidatos (por defecto 50*n_new,
+      al menos 1000)
+    - seed: semilla para reproducir la seleccion
+
+    Returns:
+        np.ndarray: puntos nuevos [n_new, d]
+    """
+    from pyDOE2 import lhs
+    from scipy.spatial import cKDTree
+
+    n_variables = existing.shape[1]
+    n_candidates = n_candidates or max(50 * n_new, 1000)
+    candidates = lhs(n_variables, samples=n_candidates, random_state=seed)
+    
+    # Distancia (al cuadrado) de cada candidato al punto mas cercano ya
+    # elegido, con un KD-tree en vez de la matriz candidatos x existentes
+    nearest = np.full(n_candidates, np.inf)
+    if len(existing):
+        nearest = cKDTree(existing).query(candidates)[0]**2
+    
+    # Al elegir un candidato solo puede acercarse a los que estan a menos
+    # de su distancia: como es el maximo, basta actualizar esa bola
+    tree = cKDTree(candidates)
+    chosen = np.empty(n_new, dtype=int)
+    for k in range(n_new):
+        best = int(np.argmax(nearest))
+        chosen[k] = best
+        if np.isfinite(nearest[best]):
+            near = np.asarray(tree.query_ball_point(candidates[best], np.sqrt(nearest[best])),
+                              dtype=int)
+        else:
+            near = np.arange(n_candidates)
+        d = ((candidates[near] - candidates[best])**2).sum(axis=1)
+        nearest[near] = np.minimum(nearest[near], d)
+        nearest[best] = -1.0
+    return candidates[chosen]
+
+
+def min_distance(unit_samples):
+    """
+    Menor distancia entre dos puntos de una muestra en [0, 1]^d
+    """
+    from scipy.spatial import cKDTree
+
+    if len(unit_samples) < 2:
+        return float('inf')
+    # Vecino mas cercano de cada punto (el primero es el propio punto)
+    return float(cKDTree(unit_samples).query(unit_samples, k=2)[0][:, 1].min())
+
+
+def generate_configurations(n_samples=20, output_file='configurations.npy', append=False,
+                            seed=None, alphas=None, machs=None):
+    """
+    Genera configuraciones aleatorias usando Latin Hypercube Sampling (LHS)
+    
+    Parámetros:
+    n_samples (int): Número de configuraciones a generar
+    output_file (str): Nombre del archivo de salida .npy
+    append (bool): Si output_file ya existe, añade n_samples configuraciones
+        nuevas al final (criterio maximin frente a las existentes) en vez de
+        reemplazarlas; las filas antiguas conservan su índice, así que sus
+        {idx}.slc resueltos siguen siendo válidos
+    seed (int): Semilla opcional para reproducir el muestreo
+    alphas, machs (list): Condiciones de vuelo de las geometrias nuevas
+        (condition_table); al ampliar una tabla de condiciones se usan por
+        defecto las que ya tiene
+    """
+    variable_ranges, fixed_values = parameter_space()
+    
+    # Número de parámetros variables
+    n_variables = len(variable_ranges)
+    n_columns = n_variables + len(fixed_values)
+    
+    existing = None
+    if append and os.path.exists(output_file):
+        existing = np.load(output_file)
+        if existing.shape[1] not in (n_columns, n_columns + 1):
+            raise ValueError(f"{output_file} has {existing.shape[1]} columns, "
+                             f"expected {n_columns} or {n_columns + 1} (with alpha)")
+        if len(existing) == 0:
+            existing = None
+    
+    conditions = alphas is not None and machs is not None
+    if existing is not None and has_conditions(existing) and not conditions:
+        alphas, machs = table_conditions(existing)
+        conditions = True
+    if existing is not None and conditions != has_conditions(existing):
+        raise ValueError(f"{output_file} has {existing.shape[1]} columns; cannot append "
+                         f"rows {'with' if conditions else 'without'} flight conditions")
+    
+    if existing is None:
+        # Generar muestras LHS en el espacio [0, 1]
+        from pyDOE2 import lhs
+        samples = lhs(n_variables, samples=n_samples, random_state=seed)
+    else:
+        # Nuevas geometrias lejos de las existentes (cada geometria una vez,
+        # sin sus condiciones), en el mismo espacio [0, 1]
+        geometries = np.unique(unit_samples(existing)[:, :n_variables], axis=0)
+        samples = maximin_extend(geometries, n_samples, seed=seed)
+    
+    # Escalar las muestras a los rangos reales y añadir los parámetros fijos
+    new_configurations = scale_samples(samples)
+    if conditions:
+        new_configurations = condition_table(new_configurations, alphas, machs)
+    all_configurations = new_configurations
+    if existing is not None:
+        all_configurations = np.vstack((existing, new_configurations))
+    
+    # Guardar en archivo .npy
+    np.save(output_file, all_configurations)
+    
+    if existing is not None:
+        unit = np.unique(unit_samples(all_configurations)[:, :n_variables], axis=0)
+        print(f"✅ Añadidas {len(new_configurations)} configuraciones a las {len(existing)} "
+              f"existentes (índices {len(existing)}-{len(all_configurations) - 1})")
+        print(f"   Distancia mínima entre geometrias (espacio [0, 1]): {min_distance(unit):.4f}")
+    else:
+        print(f"✅ Generadas {len(new_configurations)} configuraciones usando LHS")
+    if conditions:
+        print(f"   {len(alphas) * len(machs)} condiciones por geometria "
+              f"(alpha {[float(a) for a in alphas]}, Mach {[float(m) for m in machs]})")
+    print(f"   Archivo guardado: {output_file}")
+    print(f"   Dimensiones del array: {all_configurations.shape} (filas, columnas)")
+    print("\nColumnas en orden:")
+    print("1. Wing Area [m²]")
+    print("2. Aspect Ratio")
+    print("3. Taper Ratio")
+    print("4. Sweep Angle [deg]")
+    print("5. Flight Speed [m/s] (fijo)")
+    print("6. Air Density [kg/m³] (fijo)")
+    if conditions:
+        print("   + Alpha [deg] (última columna; la velocidad es Mach * a)")
+    return all_configurations
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    # Parámetro para controlar el número de configuraciones
+    NUM_CONFIGURATIONS = 10
+    # True para añadir NUM_CONFIGURATIONS nuevas a wing_configurations.npy
+    # sin tocar las ya resueltas
+    APPEND = False
+    # Condiciones de vuelo por geometria (None = una sola, la de ALPHA y la
+    # velocidad fija de CPWING). Con listas, cada geometria se repite para
+    # todas las combinaciones y la tabla lleva alpha como ultima columna;
+    # para VSPAERO deben estar equiespaciadas
+    ALPHAS = None       # p. ej. [0.0, 2.0, 4.0]
+    MACHS = None        # p. ej. [0.1, 0.2]
+    
+    # Generar y guardar las configuraciones; con APPEND las condiciones
+    # solo se aplican a las geometrias nuevas
+    configs = generate_configurations(
+        n_samples=NUM_CONFIGURATIONS,
+        output_file='wing_configurations.npy',
+        append=APPEND,
+        alphas=ALPHAS,
+        machs=MACHS
+    )
+    
+    configs = np.load('wing_configurations.npy')
+    print(configs[0])  # Primera configuración
+    fin = time.perf_counter()
+    duracion = fin - inicio
+    print("\n" + "="*50)
+    print(f"Tiempo de ejecución: {duracion:.4f} segundos")
+    print("\n" + "="*50)
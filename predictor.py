@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import numpy as np
+import parametros as pm
+from muestreo_activo import _kernel, median_distance, relevance
+
+
+def load_fields(indices, output_dir='.', nx=20, store=None):
+    """
+    Campos dCp remuestreados (rejilla de test1.resample_sections, la misma
+    que usa test1.normalizador) de las configuraciones resueltas
+
+    Parameters:
+    - indices: configuraciones a cargar
+    - output_dir: directorio de los {idx}.txt
+    - nx: puntos por seccion
+    - store: DatasetStore de la campaña; si se da se lee de el
+
+    Returns:
+        np.ndarray: campos [k, secciones, nx]; NaN en las configuraciones
+        que faltan o tienen otro numero de secciones
+    """
+    import test1 as t1
+
+    grids = []
+    for idx in indices:
+        try:
+            if store is not None:
+                if not store.filled[idx]:
+                    raise FileNotFoundError(idx)
+                M = np.column_stack(store.read(idx))
+            else:
+                M = np.loadtxt(os.path.join(output_dir, f"{idx}.txt"), ndmin=2)
+            grids.append(t1.resample_sections(M, nx)[2])
+        except (FileNotFoundError, ValueError, IndexError):
+            grids.append(None)
+
+    shapes = [grid.shape for grid in grids if grid is not None]
+    shape = max(set(shapes), key=shapes.count) if shapes else (0, nx)
+    return np.stack([grid if grid is not None and grid.shape == shape else np.full(shape, np.nan)
+                     for grid in grids]) if grids else np.empty((0,) + shape)
+
+
+class PODSurrogate:
+    """
+    Modelo de orden reducido del campo dCp: base POD de los campos
+    remuestreados y regresion kernel ridge de los parametros del ala, mas
+    Mach y alpha en una tabla de condiciones (parametros.unit_samples,
+    pesados con muestreo_activo.relevance), a los coeficientes modales. Predecir es una matriz kernel y dos productos,
+    sin OpenVSP.
+    """
+
+    def __init__(self, mean, basis, train, weights, coef_mean, length, scales, shape):
+        self.mean = mean            # campo medio [F]
+        self.basis = basis          # modos POD [modos, F]
+        self.train = train          # parametros de entrenamiento pesados [N, d]
+        self.weights = weights      # pesos kernel ridge [N, modos]
+        self.coef_mean = coef_mean  # coeficiente medio [modos]
+        self.length = length        # longitud del kernel
+        self.scales = scales        # peso de cada parametro [d]
+        self.shape = tuple(shape)   # (secciones, puntos)
+
+    @classmethod
+    def fit(cls, configurations, fields, energy=0.9999, max_modes=None, ridge=1e-8,
+            length_factors=(0.25, 0.5, 1.0, 2.0)):
+        """
+        Ajusta el modelo con las configuraciones resueltas
+
+        Parameters:
+        - configurations: tabla de configuraciones [N, C]
+        - fields: campos dCp [N, secciones, puntos] (load_fields); las
+          configuraciones con NaN se descartan
+        - energy: fraccion de la varianza que conservan los modos POD
+        - max_modes: limite de modos
+        - ridge: regularizacion relativa a la diagonal del kernel
+        - length_factors: multiplos de la distancia mediana entre
+          configuraciones que se prueban como longitud del kernel; se elige
+          la de menor error leave-one-out
+
+        Returns:
+            PODSurrogate
+        """
+        fields = np.asarray(fields, dtype=float)
+        shape = fields.shape[1:]
+        Y = fields.reshape(len(fields), -1)
+        valid = ~np.isnan(Y).any(axis=1)
+        Y = Y[valid]
+        X = pm.unit_samples(np.asarray(configurations)[valid])
+        if len(Y) < 2:
+            raise ValueError(f"Need at least 2 solved configurations, got {len(Y)}")
+
+        # Base POD: SVD de los campos centrados
+        mean = Y.mean(axis=0)
+        U, s, Vt = np.linalg.svd(Y - mean, full_matrices=False)
+        captured = np.cumsum(s**2) / max((s**2).sum(), np.finfo(float).tiny)
+        n_modes = int(np.searchsorted(captured, energy) + 1)
+        if max_modes is not None:
+            n_modes = min(n_modes, max_modes)
+        n_modes = min(n_modes, len(s))
+        basis = Vt[:n_modes]
+        coefficients = U[:, :n_modes] * s[:n_modes]
+
+        from scipy.linalg import cho_factor, cho_solve, solve_triangular
+
+        scales = relevance(X, coefficients)
+        Xs = X * scales
+        median = median_distance(Xs) or 1.0
+
+        # Longitud del kernel por error leave-one-out en forma cerrada:
+        # residuo_i = (A^-1 c)_i / (A^-1)_ii con A = K + ridge = L L^T, y
+        # (A^-1)_ii es la norma al cuadrado de la columna i de L^-1
+        coef_mean = coefficients.mean(axis=0)
+        C = coefficients - coef_mean
+        best = None
+        for factor in length_factors:
+            length = factor * median
+            A = _kernel(Xs, Xs, length)
+            A[np.diag_indices_from(A)] += ridge * len(Xs)
+            try:
+                factorization = cho_factor(A, lower=True, overwrite_a=True)
+            except np.linalg.LinAlgError:
+                # Kernel casi singular con esta longitud
+                continue
+            weights = cho_solve(factorization, C)
+            L_inv = solve_triangular(factorization[0], np.eye(len(Xs)), lower=True,
+                                     overwrite_b=True)
+            loo = ((weights / (L_inv**2).sum(axis=0)[:, None])**2).sum()
+            if best is None or loo < best[0]:
+                best = (loo, length, weights)
+        if best is None:
+            raise ValueError("Kernel matrix is not positive definite for any length "
+                             "factor: increase ridge")
+        _, length, weights = best
+
+        return cls(mean, basis, Xs, weights, coef_mean, length, scales, shape)
+
+    @property
+    def n_modes(self):
+        return len(self.basis)
+
+    def predict(self, configurations):
+        """
+        Campos dCp de un lote de configuraciones
+
+        Returns:
+            np.ndarray: campos [N, secciones, puntos]
+        """
+        X = pm.unit_samples(np.atleast_2d(configurations))
+        if X.shape[1] != len(self.scales):
+            raise ValueError(f"Model was fitted on {len(self.scales)} parameters, got "
+                             f"{X.shape[1]}: use a table with the same flight-condition "
+                             f"columns (parametros.condition_table)")
+        X = X * self.scales
+        coefficients = _kernel(X, self.train, self.length) @ self.weights + self.coef_mean
+        return (coefficients @ self.basis + self.mean).reshape((-1,) + self.shape)
+
+    def save(self, path):
+        np.savez(path, mean=self.mean, basis=self.basis, train=self.train,
+                 weights=self.weights, coef_mean=self.coef_mean, length=self.length,
+                 scales=self.scales, shape=np.array(self.shape))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["mean"], data["basis"], data["train"], data["weights"],
+                       data["coef_mean"], float(data["length"]), data["scales"],
+                       data["shape"])
+
+
+def holdout_report(configurations, fields, test_fraction=0.2, seed=None,
+                   report_path='surrogate_report.csv', top=10, **fit_kwargs):
+    """
+    Precision del surrogate sobre configuraciones que no ha visto: ajusta
+    con una parte de la campaña, predice el resto y lo compara con los
+    campos resueltos. Guarda la tabla por configuracion (de peor a mejor
+    RMSE) en CSV e imprime las 'top' peores
+
+    Parameters:
+    - configurations, fields: como PODSurrogate.fit
+    - test_fraction: fraccion de configuraciones reservada para la prueba
+    - fit_kwargs: argumentos de PODSurrogate.fit
+
+    Returns:
+        tuple: (modelo ajustado con la parte de entrenamiento, pd.DataFrame)
+    """
+    import pandas as pd
+
+    configurations = np.asarray(configurations)
+    fields = np.asarray(fields, dtype=float)
+    solved = np.flatnonzero(~np.isnan(fields.reshape(len(fields), -1)).any(axis=1))
+    rng = np.random.default_rng(seed)
+    test = np.sort(rng.choice(solved, max(1, int(round(test_fraction * len(solved)))),
+                              replace=False))
+    train = np.setdiff1d(solved, test)
+
+    inicio = time.perf_counter()
+    model = PODSurrogate.fit(configurations[train], fields[train], **fit_kwargs)
+    fit_time = time.perf_counter() - inicio
+
+    predicted = model.predict(configurations[test])
+    repeats = max(1, int(np.ceil(1000 / len(test))))
+    inicio = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(configurations[test])
+    predict_time = (time.perf_counter() - inicio) / (repeats * len(test))
+
+    error = (predicted - fields[test]).reshape(len(test), -1)
+    span = np.ptp(fields[solved])
+    report = pd.DataFrame({
+        "idx": test,
+        "rmse": np.sqrt((error**2).mean(axis=1)),
+        "max_abs": np.abs(error).max(axis=1),
+        "mean_abs": np.abs(error).mean(axis=1),
+    }).set_index("idx")
+    report["rmse_rel"] = report["rmse"] / span
+    report = report.sort_values("rmse", ascending=False)
+    report.to_csv(report_path)
+
+    print("\n" + "="*50)
+    print(f"Surrogate: {len(train)} train / {len(test)} test configurations | "
+          f"{model.n_modes} POD modes")
+    print(f"Fit {fit_time:.3f} s | predict {predict_time*1e6:.1f} us per configuration")
+    print(f"Hold-out RMSE median {report['rmse'].median():.4f} | worst "
+          f"{report['rmse'].max():.4f} | global {np.sqrt((error**2).mean()):.4f} "
+          f"({100*np.sqrt((error**2).mean())/span:.2f}% of dCp range)")
+    print("="*50)
+    print(report.head(top).to_string(float_format=lambda v: f"{v:.4f}"))
+    print(f"Report saved to: {report_path}")
+    return model, report
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    # Surrogate de la campaña del directorio actual: informe hold-out y
+    # modelo final ajustado con todas las configuraciones resueltas
+    configurations = np.load('wing_configurations.npy')
+    fields = load_fields(range(len(configurations)))
+
+    holdout_report(configurations, fields, seed=0)
+    model = PODSurrogate.fit(configurations, fields)
+    model.save('surrogate.npz')
+    print(f"Surrogate saved to: surrogate.npz ({model.n_modes} modes)")
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+SPEED_OF_SOUND = 343.0  # m/s a nivel del mar
+
+
+def wing_planform(config):
+    """
+    Calcula la geometria en planta a partir de una fila de configuracion,
+    con las mismas ecuaciones que CPWING.process_configuration
+
+    Returns:
+        tuple: (span, root_chord, tip_chord, sweep_angle)
+    """
+    wing_area = config[0]
+    aspect_ratio = config[1]
+    taper_ratio = config[2]
+    sweep_angle = config[3]
+
+    span = (aspect_ratio * wing_area)**0.5
+    tip_chord = 2 * wing_area / (span * (1 + taper_ratio))
+    root_chord = tip_chord * taper_ratio
+    return span, root_chord, tip_chord, sweep_angle
+
+
+def analytic_dcp(config, xi, eta, alpha=2.0, mach=None):
+    """
+    Campo dCp analitico (placa plana con carga eliptica en envergadura)
+    que sustituye al solver en pruebas y benchmarks.
+
+    Parameters:
+    - config: fila de wing_configurations.npy
+    - xi: posicion a lo largo de la cuerda (0=borde ataque, 1=borde salida)
+    - eta: posicion en semi-envergadura (0=raiz, 1=punta)
+    - alpha: angulo de ataque [grados]
+    - mach: numero de Mach; si es None se usa la velocidad de la configuracion
+    """
+    aspect_ratio = config[1]
+    taper_ratio = config[2]
+    sweep_angle = config[3]
+    if mach is None:
+        mach = config[6] / SPEED_OF_SOUND
+
+    xi = np.clip(np.asarray(xi, dtype=float), 1e-3, 1.0)
+    eta = np.clip(np.asarray(eta, dtype=float), 0.0, 1.0)
+
+    beta = np.sqrt(1.0 - mach**2)
+    lift_slope = aspect_ratio / (aspect_ratio + 2.0) * np.cos(np.radians(sweep_angle))
+    chordwise = np.sqrt((1.0 - xi) / xi)
+    spanwise = np.sqrt(1.0 - 0.95 * eta**2) * (1.0 + 0.1 * (taper_ratio - 1.0) * eta)
+
+    return -4.0 * np.radians(alpha) / beta * lift_slope * chordwise * spanwise
+
+
+def write_slc(path, ycuts, sections):
+    """
+    Escribe un archivo .slc con el formato de bloques del CpSlicer
+
+    Parameters:
+    - path: archivo de salida
+    - ycuts: posiciones Y de cada corte
+    - sections: lista de tuplas (x, z, dcp) con un array por corte
+    """
+    lines = []
+    for k, (y_cut, (x, z, dcp)) in enumerate(zip(ycuts, sections), start=1):
+        lines.append(f"BLOCK Cut_{k}_at_Y:_{y_cut:.6f}\n")
+        lines.append("           x            y            z          dCp\n")
+        for x_i, z_i, dcp_i in zip(x, z, dcp):
+            lines.append(f"  {x_i:12.6f} {y_cut:12.6f} {z_i:12.6f} {dcp_i:12.6f}\n")
+        lines.append("\n")
+
+    with open(path, 'w') as f:
+        f.writelines(lines)
+    return path
+
+
+def synthetic_sections(config, number_cut=20, chordwise_panels=20, alpha=2.0, mach=None):
+    """
+    Genera los cortes de un ala sintetica sobre las mismas estaciones
+    que el CpSlicer de CPWING (de la raiz a la semi-envergadura); alpha es
+    el de las filas sin columna de alpha (parametros.condition_table)
+
+    Returns:
+        tuple: (ycuts, sections) listos para write_slc
+    """
+    span, root_chord, tip_chord, sweep_angle = wing_planform(config)
+    if len(config) > 8:
+        alpha = float(config[8])
+    semi_span = span / 2
+    ycuts = np.linspace(0.0, semi_span, number_cut)
+    xi = (np.arange(chordwise_panels) + 0.5) / chordwise_panels
+
+    sections = []
+    for y_cut in ycuts:
+        eta = y_cut / semi_span
+        local_chord = root_chord + (tip_chord - root_chord) * eta
+        x_le = y_cut * np.tan(np.radians(sweep_angle))
+        x = x_le + xi * local_chord
+        z = np.zeros_like(x)
+        dcp = analytic_dcp(config, xi, eta, alpha=alpha, mach=mach)
+        sections.append((x, z, dcp))
+    return ycuts, sections
+
+
+def synthetic_field(configurations, nx=20, number_cut=20, alpha=2.0):
+    """
+    Campo dCp analitico de varias configuraciones sobre la rejilla
+    normalizada de test1.resample_sections (number_cut secciones de raiz a
+    punta, nx puntos del borde de salida al de ataque), sin pasar por .slc.
+    Las filas con columna de alpha usan la suya
+
+    Returns:
+        np.ndarray: campos [N, number_cut * nx]
+    """
+    configurations = np.atleast_2d(configurations)
+    xi = np.linspace(1.0, 0.0, nx)
+    eta = np.linspace(0.0, 1.0, number_cut)[:, None]
+    return np.stack([analytic_dcp(config, xi, eta,
+                                  alpha=float(config[8]) if len(config) > 8 else alpha).ravel()
+                     for config in configurations])
+
+
+def stub_solver(config_idx, config):
+    """
+    Sustituto de CPWING.process_configuration: escribe {config_idx}.slc
+    sintetico en el directorio actual sin necesitar OpenVSP
+    """
+    ycuts, sections = synthetic_sections(config)
+    return write_slc(f"{config_idx}.slc", ycuts, sections)
@@ -1,112 +1,356 @@
-import numpy as np
-from scipy.interpolate import InterpolatedUnivariateSpline
-import matplotlib.pyplot as plt  # Aseguramos tener plt importado
-
-def interpol(x, p, nx):
-    FI = InterpolatedUnivariateSpline(x[::-1], p[::-1])
-    X = np.linspace(x[-1], x[0], nx)
-    P = FI(X)
-    return X[::-1], P[::-1]
-
-def normalizador(in_file, out_file, dcp_min, dcp_max):
-    M = np.loadtxt(f"{in_file}")
-    py = np.array([])
-    
-    for i in range(len(M)):
-        if i == 0:
-            py = np.append(py, M[i,1])
-        else:
-            if M[i,1] != py[-1]:
-                py = np.append(py, M[i,1])
-                
-    px = []
-    pdcp = []
-    Mx = M.copy()
-    for j in range(len(py)):
-        i=0
-        pxy = np.array([])
-        ppy = np.array([])
-        while(1==1):
-            if i == 0:
-                pxy = np.append(pxy, Mx[i,0])
-                ppy = np.append(ppy, Mx[i,2])
-                i += 1
-            else:
-                if Mx[i,0] < pxy[-1]:
-                    pxy = np.append(pxy, Mx[i,0])
-                    ppy = np.append(ppy, Mx[i,2])
-                    i += 1
-                elif Mx[i,0] == pxy[-1]:
-                    i += 1
-                else:
-                    break
-            if i == len(Mx):
-                break
-        px.append(pxy)
-        pdcp.append(ppy)
-        Mx = np.delete(Mx, np.arange(i), axis=0)
-    
-    nx = 20
-    
-    XX = np.empty((0,nx))
-    PP = np.empty((0,nx))
-    
-    for j in range(len(px)):
-        X, P = interpol(px[j], pdcp[j], nx)  
-        XX = np.row_stack((XX, X))
-        PP = np.row_stack((PP, P))
-    
-    def scaler(W, wmin, wmax):
-        Ws = (W-wmin)/(wmax-wmin)
-        return Ws
-    
-    XN = np.empty((0, nx))
-    
-    for j in range(len(px)):
-        Xs = scaler(XX[j], XX[j,-1], XX[j,0])
-        XN = np.row_stack((XN, Xs))
-    
-    YN = np.empty((len(py), 0))
-    
-    for i in range(nx):
-        Ys = scaler(py, py[0], py[-1])
-        YN = np.column_stack((YN, Ys))
-        
-    #%%
-    # Generar y guardar la imagen en formato PNG
-    '''
-    fig = plt.figure(1, figsize=(2, 2))
-    ax = fig.add_subplot(111)
-    ms = ax.pcolormesh(XN, YN, PP, vmin=-1.64, vmax=0, cmap='gray')
-    plt.colorbar(ms)
-    fig.tight_layout()
-    '''
-    # Guardar la figura en formato PNG
-    fig = plt.figure(1, figsize=(2, 2))
-    ax = fig.add_subplot(111)
-    ms = ax.contourf(XN, YN, PP, vmin=dcp_min, 
-                     vmax=dcp_max, levels=75, cmap='gray')
-    ax.set_xlim(0, 1)
-    ax.set_ylim(0, 1)
-    fig.tight_layout()  
-    ax.axis('off')
-    ax.tick_params(labelbottom=False,
-                    bottom=False,
-                    labelleft=False,
-                    left=False)
-    fig.tight_layout()    
-    fig.subplots_adjust(bottom = 0)
-    fig.subplots_adjust(top = 1)
-    fig.subplots_adjust(right = 1)
-    fig.subplots_adjust(left = 0)
-    
-    fig.savefig(out_file, format='png', dpi=128)
-    
-    
-    
-    
-    print(f"Imagen guardada exitosamente como: {out_file}")
-    
-    # Si también quieres mostrar la imagen (opcional)
-   # plt.show()
-    
+import math
+import numpy as np
+import metricas as mt
+
+def interpol(x, p, nx):
+    from scipy.interpolate import InterpolatedUnivariateSpline
+    FI = InterpolatedUnivariateSpline(x[::-1], p[::-1])
+    X = np.linspace(x[-1], x[0], nx)
+    P = FI(X)
+    return X[::-1], P[::-1]
+
+def _spline_batch(x, p, q):
+    """
+    Spline cubico interpolante 'not-a-knot' (el mismo que
+    InterpolatedUnivariateSpline con k=3) para varias secciones a la vez
+
+    Parameters:
+    - x: nodos crecientes [S, n] (n >= 4)
+    - p: valores en los nodos [S, n]
+    - q: puntos donde evaluar [S, m]
+    """
+    S, n = x.shape
+    h = np.diff(x, axis=1)
+    slope = np.diff(p, axis=1) / h
+
+    # Sistema tridiagonal para las pendientes en los nodos (lower, diag,
+    # upper, rhs); las filas extremas imponen tercera derivada continua en
+    # el segundo y el penultimo nodo
+    lower = np.zeros((S, n))
+    diag = np.empty((S, n))
+    upper = np.zeros((S, n))
+    rhs = np.empty((S, n))
+    lower[:, 1:-1] = h[:, 1:]
+    diag[:, 1:-1] = 2 * (h[:, :-1] + h[:, 1:])
+    upper[:, 1:-1] = h[:, :-1]
+    rhs[:, 1:-1] = 3 * (h[:, 1:] * slope[:, :-1] + h[:, :-1] * slope[:, 1:])
+
+    d = x[:, 2] - x[:, 0]
+    diag[:, 0] = h[:, 1]
+    upper[:, 0] = d
+    rhs[:, 0] = ((h[:, 0] + 2 * d) * h[:, 1] * slope[:, 0] + h[:, 0]**2 * slope[:, 1]) / d
+    d = x[:, -1] - x[:, -3]
+    diag[:, -1] = h[:, -2]
+    lower[:, -1] = d
+    rhs[:, -1] = (h[:, -1]**2 * slope[:, -2] + (2 * d + h[:, -1]) * h[:, -2] * slope[:, -1]) / d
+
+    # Algoritmo de Thomas, vectorizado sobre las secciones
+    for k in range(1, n):
+        w = lower[:, k] / diag[:, k - 1]
+        diag[:, k] -= w * upper[:, k - 1]
+        rhs[:, k] -= w * rhs[:, k - 1]
+    s = np.empty((S, n))
+    s[:, -1] = rhs[:, -1] / diag[:, -1]
+    for k in range(n - 2, -1, -1):
+        s[:, k] = (rhs[:, k] - upper[:, k] * s[:, k + 1]) / diag[:, k]
+
+    # Tramo de cada punto de evaluacion y polinomio de Hermite del tramo
+    i = np.sum(x[:, None, 1:-1] <= q[:, :, None], axis=2)
+    x0 = np.take_along_axis(x, i, axis=1)
+    hi = np.take_along_axis(h, i, axis=1)
+    m = np.take_along_axis(slope, i, axis=1)
+    s0 = np.take_along_axis(s, i, axis=1)
+    s1 = np.take_along_axis(s, i + 1, axis=1)
+    t = q - x0
+
+    c2 = (3 * m - 2 * s0 - s1) / hi
+    c3 = (s0 + s1 - 2 * m) / hi**2
+    return np.take_along_axis(p, i, axis=1) + t * (s0 + t * (c2 + t * c3))
+
+def resample_sections(M, nx=20):
+    """
+    Agrupa las filas X Y dCp de un {idx}.txt en secciones de Y constante y
+    remuestrea cada una en nx puntos equiespaciados a lo largo de la cuerda
+
+    Returns:
+        tuple: (XN, YN, PP, py) rejillas normalizadas [secciones, nx] y las
+        posiciones Y de cada seccion
+    """
+    # Secciones = tramos consecutivos con la misma Y
+    bounds = np.flatnonzero(np.diff(M[:, 1]) != 0) + 1
+    sections = np.split(M, bounds)
+    py = M[np.concatenate(([0], bounds)), 1]
+
+    # Dentro de cada seccion X decrece; los X repetidos se descartan
+    px = []
+    pdcp = []
+    for section in sections:
+        keep = np.ones(len(section), dtype=bool)
+        keep[1:] = section[1:, 0] != section[:-1, 0]
+        px.append(section[keep, 0])
+        pdcp.append(section[keep, 2])
+
+    n_sections = len(sections)
+    XX = np.empty((n_sections, nx))
+    PP = np.empty((n_sections, nx))
+    x_max = np.array([x[0] for x in px])
+    x_min = np.array([x[-1] for x in px])
+    X = np.linspace(x_min, x_max, nx, axis=1)
+    XX[:] = X[:, ::-1]
+
+    # Las secciones con el mismo numero de puntos se interpolan juntas
+    lengths = np.array([len(x) for x in px])
+    for n in np.unique(lengths):
+        group = np.flatnonzero(lengths == n)
+        if n < 4:
+            for j in group:
+                XX[j], PP[j] = interpol(px[j], pdcp[j], nx)
+            continue
+        x = np.stack([px[j][::-1] for j in group])
+        p = np.stack([pdcp[j][::-1] for j in group])
+        PP[group] = _spline_batch(x, p, X[group])[:, ::-1]
+
+    def scaler(W, wmin, wmax):
+        Ws = (W-wmin)/(wmax-wmin)
+        return Ws
+
+    XN = scaler(XX, XX[:, -1:], XX[:, :1])
+    YN = np.repeat(scaler(py, py[0], py[-1])[:, None], nx, axis=1)
+
+    return XN, YN, PP, py
+
+def _contour_levels(zmin, zmax, n=75):
+    """
+    Niveles que elige contourf(levels=n): los de MaxNLocator(n + 1) con
+    sus pasos por defecto, recortados al rango de los datos
+    """
+    if zmax - zmin <= 1e-14 * max(abs(zmin), abs(zmax), 1e-300):
+        zmin, zmax = zmin - 0.001 * abs(zmin) - 1e-3, zmax + 0.001 * abs(zmax) + 1e-3
+
+    nbins = n + 1
+    dv = zmax - zmin
+    meanv = (zmax + zmin) / 2
+    if abs(meanv) / dv < 100:
+        offset = 0
+    else:
+        offset = math.copysign(10 ** (math.log10(abs(meanv)) // 1), meanv)
+    scale = 10 ** (math.log10(dv / nbins) // 1)
+    vmin, vmax = zmin - offset, zmax - offset
+
+    steps = np.array([0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.6, 0.8,
+                      1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10, 15]) * scale
+    large = np.nonzero(steps >= dv / nbins)[0]
+    istep = large[0] if len(large) else len(steps) - 1
+
+    def closeto(ms, edge, step):
+        if offset > 0:
+            tol = min(0.4999, max(1e-10, 10 ** (np.log10(offset / step) - 12)))
+        else:
+            tol = 1e-10
+        return abs(ms - edge) < tol
+
+    for step in steps[:istep + 1][::-1]:
+        best_vmin = (vmin // step) * step
+        d, m = divmod(vmin - best_vmin, step)
+        low = d + 1 if closeto(m / step, 1, step) else d
+        d, m = divmod(vmax - best_vmin, step)
+        high = d if closeto(m / step, 0, step) else d + 1
+        ticks = np.arange(low, high + 1) * step + best_vmin
+        if ((ticks <= vmax) & (ticks >= vmin)).sum() >= 2:
+            break
+    lev = ticks + offset
+
+    under = np.nonzero(lev < zmin)[0]
+    i0 = under[-1] if len(under) else 0
+    over = np.nonzero(lev > zmax)[0]
+    i1 = over[0] + 1 if len(over) else len(lev)
+    if i1 - i0 < 3:
+        i0, i1 = 0, len(lev)
+    return lev[i0:i1]
+
+def _raster_bands(XN, YN, PP, size, levels):
+    """
+    dCp de cada pixel de render_raster antes de pasar a gris
+
+    Returns:
+        tuple: (valores, band); con levels el dCp de pixel es valores[band]
+        (valor medio de cada banda), sin levels band es None y valores es
+        la imagen [size, size]
+    """
+    xs = XN[0, ::-1]
+    ys = YN[:, 0]
+    P = PP[:, ::-1]
+
+    # contourf (Agg sin antialiasing) pinta cada pixel con el valor de su
+    # esquina superior derecha, no con el de su centro
+    corners = np.arange(size) / size
+    px = corners + 1.0 / size
+    py = 1.0 - corners
+
+    # Pesos de la bilineal (dos entradas no nulas por fila) y celda de cada
+    # punto (una)
+    def weights(nodes, points):
+        i = np.clip(np.searchsorted(nodes, points) - 1, 0, len(nodes) - 2)
+        t = (points - nodes[i]) / (nodes[i + 1] - nodes[i])
+        W = np.zeros((len(points), len(nodes)))
+        E = np.zeros((len(points), len(nodes) - 1))
+        rows = np.arange(len(points))
+        W[rows, i] = 1 - t
+        W[rows, i + 1] = t
+        E[rows, i] = 1
+        return W, E, t
+
+    (Wy, Ey, s), (Wx, Ex, t) = weights(ys, py), weights(xs, px)
+
+    # Interpolacion lineal en los dos triangulos de cada celda (diagonal
+    # (i, j+1)-(i+1, j)), como en los poligonos de contourf las isolineas
+    # son rectas dentro de la celda. Es la bilineal, separable
+    # (Wy @ F @ Wx.T), menos el termino cruzado de la celda por
+    # min(s t, (1-s)(1-t))
+    corner = np.minimum(np.outer(s, t), np.outer(1 - s, 1 - t))
+
+    def interpolate(F):
+        K = F[:-1, :-1] - F[:-1, 1:] - F[1:, :-1] + F[1:, 1:]
+        return Wy @ F @ Wx.T - (Ey @ K @ Ex.T) * corner
+
+    if not levels:
+        return interpolate(P), None
+
+    # Los niveles son equiespaciados: interpolando (P - lev[0]) / paso la
+    # banda de cada pixel (lev[b] < Z <= lev[b+1]) es ceil(valor) - 1, y su
+    # gris sale de una tabla con el valor medio de cada banda
+    lev = _contour_levels(float(PP.min()), float(PP.max()), levels)
+    Q = interpolate((P - lev[0]) / (lev[1] - lev[0]))
+    band = np.ceil(Q, out=Q).astype(np.intp)
+    band -= 1
+    np.clip(band, 0, len(lev) - 2, out=band)
+    return 0.5 * (lev[:-1] + lev[1:]), band
+
+def quantize(values, dcp_min, dcp_max, normalized=False):
+    """
+    dCp a gris uint8 (negro = dcp_min, blanco = dcp_max) o, con
+    normalized=True, a float32 (dCp - dcp_min) / (dcp_max - dcp_min)
+    """
+    # En float64 aunque values sea float16/float32, y sobre el mismo array
+    norm = np.subtract(values, dcp_min, dtype=np.float64)
+    norm /= dcp_max - dcp_min
+    if normalized:
+        return np.clip(norm, 0, 1, out=norm).astype(np.float32)
+    norm *= 256
+    np.floor(norm, out=norm)
+    return np.clip(norm, 0, 255, out=norm).astype(np.uint8)
+
+def render_raster(XN, YN, PP, dcp_min, dcp_max, size=256, levels=75, normalized=False):
+    """
+    Rasteriza directamente la rejilla normalizada (XN, YN, PP) a una imagen
+    en escala de grises uint8 [size, size], sin pasar por matplotlib
+
+    La rejilla es rectilinea (XN igual en todas las filas, YN en todas las
+    columnas), asi que cada pixel se obtiene por interpolacion lineal en
+    los dos triangulos de su celda.
+    Con levels=n el valor se cuantiza a las bandas que usaria
+    contourf(levels=n) y cada banda toma el gris de su valor medio, como en
+    la imagen original; con levels=None el gris es continuo.
+
+    Negro = dcp_min, blanco = dcp_max; la fila 0 de la imagen es YN = 1.
+    Con normalized=True devuelve float32 (dCp - dcp_min) / (dcp_max - dcp_min)
+    en vez de los grises uint8.
+    """
+    values, band = _raster_bands(XN, YN, PP, size, levels)
+    gray = quantize(values, dcp_min, dcp_max, normalized=normalized)
+    return gray if band is None else gray[band]
+
+def render_dcp(XN, YN, PP, size=256, levels=75, dtype=np.float32):
+    """
+    Imagen de render_raster en dCp, sin rango: quantize(render_dcp(...),
+    dcp_min, dcp_max) da la imagen de render_raster para cualquier rango
+    global; por el redondeo de dtype un pixel que cae justo en el borde de
+    un gris puede quedar en el vecino
+    """
+    values, band = _raster_bands(XN, YN, PP, size, levels)
+    values = values.astype(dtype)
+    return values if band is None else values[band]
+
+def write_png(out_file, image):
+    """
+    Guarda una imagen uint8 en escala de grises con cv2 (o PIL si no esta)
+    """
+    try:
+        import cv2
+    except ImportError:
+        from PIL import Image
+        Image.fromarray(image).save(out_file)
+        return
+    cv2.imwrite(out_file, image)
+
+def render_file(in_file, dcp_min, dcp_max, nx=20, size=256, normalized=False):
+    """
+    Imagen raster de un {idx}.txt sin escribirla a disco (ver render_raster)
+    """
+    M = np.loadtxt(f"{in_file}")
+    XN, YN, PP, py = resample_sections(M, nx)
+    return render_raster(XN, YN, PP, dcp_min, dcp_max, size=size, normalized=normalized)
+
+def save_contourf(out_file, XN, YN, PP, dcp_min, dcp_max):
+    """
+    Imagen original: contourf de 75 niveles en escala de grises, 256x256
+    """
+    import matplotlib.pyplot as plt
+
+    #%%
+    # Generar y guardar la imagen en formato PNG
+    '''
+    fig = plt.figure(1, figsize=(2, 2))
+    ax = fig.add_subplot(111)
+    ms = ax.pcolormesh(XN, YN, PP, vmin=-1.64, vmax=0, cmap='gray')
+    plt.colorbar(ms)
+    fig.tight_layout()
+    '''
+    # Guardar la figura en formato PNG
+    fig = plt.figure(1, figsize=(2, 2))
+    ax = fig.add_subplot(111)
+    ms = ax.contourf(XN, YN, PP, vmin=dcp_min, 
+                     vmax=dcp_max, levels=75, cmap='gray')
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    fig.tight_layout()  
+    ax.axis('off')
+    ax.tick_params(labelbottom=False,
+                    bottom=False,
+                    labelleft=False,
+                    left=False)
+    fig.tight_layout()    
+    fig.subplots_adjust(bottom = 0)
+    fig.subplots_adjust(top = 1)
+    fig.subplots_adjust(right = 1)
+    fig.subplots_adjust(left = 0)
+    
+    fig.savefig(out_file, format='png', dpi=128)
+    # Sin cerrar la figura 1 los ejes se acumulan de una imagen a otra
+    plt.close(fig)
+
+def render_grid(out_file, XN, YN, PP, dcp_min, dcp_max, renderer='matplotlib'):
+    """
+    Guarda la imagen dCp de una rejilla ya remuestreada (resample_sections)
+    """
+    if renderer == 'raster':
+        write_png(out_file, render_raster(XN, YN, PP, dcp_min, dcp_max))
+    else:
+        save_contourf(out_file, XN, YN, PP, dcp_min, dcp_max)
+
+def normalizador(in_file, out_file, dcp_min, dcp_max, nx=20, renderer='matplotlib'):
+    """
+    Remuestrea {idx}.txt en la rejilla normalizada y guarda la imagen dCp
+
+    renderer='matplotlib' genera la figura contourf original; 'raster' la
+    rasteriza directamente con render_raster (mismas bandas y grises,
+    pueden cambiar pixeles sueltos en los bordes de banda)
+    """
+    M = np.loadtxt(f"{in_file}")
+    XN, YN, PP, py = resample_sections(M, nx)
+    render_grid(out_file, XN, YN, PP, dcp_min, dcp_max, renderer=renderer)
+    
+    mt.log(f"Imagen guardada exitosamente como: {out_file}")
+    
+    # Si también quieres mostrar la imagen (opcional)
+   # plt.show()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import functools
+import multiprocessing as mp
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import paralelo as par
+import parametros as pm
+from cache_vsp import SolverCache
+
+
+def _campaign(output_dir, cache):
+    configurations = pm.scale_samples(np.random.default_rng(0).random((3, 6)))
+    os.makedirs(output_dir)
+    solver = functools.partial(par.vsp_solver, cache=cache, backend='vlm')
+    return par.run_campaign(configurations, output_dir=output_dir, n_workers=1, solver=solver)
+
+
+def test_relative_cache_in_pool(tmp_path, monkeypatch):
+    # Cache relativa al directorio de la campaña, como CPWING.CACHE_DIR; los
+    # workers trabajan en .scratch/worker_{pid}
+    monkeypatch.chdir(tmp_path)
+
+    cache = SolverCache('vsp_cache')
+    results = _campaign('first', cache)
+    assert [r["error"] for r in results] == [None] * 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (0, 3, 3)
+    assert os.path.isdir(tmp_path / 'vsp_cache')
+
+    # Segunda campaña: todo sale de la cache
+    cache = SolverCache('vsp_cache')
+    results = _campaign('second', cache)
+    assert [r["error"] for r in results] == [None] * 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 0)
+    assert (stats["total_hits"], stats["total_misses"]) == (3, 3)
+    for idx in range(3):
+        assert (open(tmp_path / 'first' / f"{idx}.slc", 'rb').read()
+                == open(tmp_path / 'second' / f"{idx}.slc", 'rb').read())
+
+
+def test_eviction_running_total(tmp_path):
+    src = tmp_path / "result.slc"
+    src.write_bytes(b"x" * 100)
+    cache = SolverCache(str(tmp_path / "cache"), max_bytes=250)
+    for i in range(5):
+        cache.store(SolverCache.key({"i": i}), str(src))
+    # Solo caben dos entradas; quedan las mas recientes
+    assert cache.stats()["bytes"] <= 250
+    assert os.path.exists(cache._entry(SolverCache.key({"i": 4})))
+    assert not os.path.exists(cache._entry(SolverCache.key({"i": 0})))
+
+
+def _lookups(directory, n):
+    cache = SolverCache(directory)
+    for i in range(n):
+        cache.fetch(SolverCache.key({"missing": i}), os.devnull)
+
+
+def test_totals_shared_between_processes(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = SolverCache(directory)
+    ctx = mp.get_context("spawn")
+    workers = [ctx.Process(target=_lookups, args=(directory, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # Ningun fallo se pierde entre procesos y el archivo no crece
+    stats = cache.stats()
+    assert (stats["misses"], stats["total_misses"]) == (200, 200)
+    assert sorted(os.listdir(directory)) == ["stats.json"]
+    assert SolverCache(directory).stats()["misses"] == 0
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import img_to_txt as it
+import parametros as pm
+import sintetico
+import test1 as t1
+
+
+def test_gray_round_trip_within_one_step():
+    configurations = pm.scale_samples(np.random.default_rng(0).random((5, 6)))
+    fields = sintetico.synthetic_field(configurations, nx=40, number_cut=30)
+    dcp_min, dcp_max = fields.min(), fields.max()
+    step = (dcp_max - dcp_min) / 256
+
+    for field in fields.reshape(len(fields), 30, 40):
+        gray = t1.quantize(field, dcp_min, dcp_max)
+        # Un punto por pixel: la diferencia es solo la de cuantizar
+        decoded = it.section_arrays(it.normalized_gray(gray), dcp_min, dcp_max,
+                                    num_sections=30, points_per_section=40)[:, 2]
+        error = decoded - field.ravel()
+        assert np.abs(error).max() <= step / 2 + 1e-12
+        # Sin sesgo: con g/255 la media se desplazaba hasta medio nivel
+        assert abs(error.mean()) < step / 8
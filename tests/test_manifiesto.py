@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from manifiesto import RunManifest
+
+
+def test_record_after_truncated_line(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = RunManifest(path)
+    manifest.record(0, "solve", "ok")
+    manifest.record(1, "solve", "ok")
+
+    # Caida a mitad de escribir el ultimo registro
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-10])
+
+    manifest = RunManifest(path)
+    assert manifest.get(0, "solve")["status"] == "ok"
+    assert manifest.get(1, "solve") is None
+    manifest.record(1, "solve", "ok")
+    manifest.record(2, "solve", "failed")
+
+    manifest = RunManifest(path)
+    assert manifest.get(1, "solve")["status"] == "ok"
+    assert manifest.get(2, "solve")["status"] == "failed"
+    assert manifest.get(1, "solve")["seq"] > manifest.get(0, "solve")["seq"]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metricas as mt
+
+
+def _campaign(path, start, indices):
+    # Una configuracion resuelta por segundo desde 'start'
+    log = mt.MetricsLog(path)
+    for k, idx in enumerate(indices):
+        log.write(idx, "solve", 1.0, time=start + k + 1)
+    return log
+
+
+def test_summary_current_run(tmp_path, capsys):
+    path = str(tmp_path / "metrics.jsonl")
+    first = _campaign(path, 0.0, range(10))
+    # Campaña reanudada un dia despues
+    second = _campaign(path, 86400.0, range(10, 25))
+    assert first.run != second.run
+
+    report = mt.summary(path)
+    out = capsys.readouterr().out
+    assert report.loc["solve", "n"] == 15
+    assert "15 configurations solved in 15.0 s (3600 configurations/hour)" in out
+
+    report = mt.summary(path, run=first.run)
+    out = capsys.readouterr().out
+    assert report.loc["solve", "n"] == 10
+    assert "10 configurations solved in 10.0 s (3600 configurations/hour)" in out
+
+    # Todas juntas: el reloj incluye el dia de pausa
+    report = mt.summary(path, run=None)
+    out = capsys.readouterr().out
+    assert report.loc["solve", "n"] == 25
+    assert "25 configurations solved in 86415.0 s (1 configurations/hour)" in out
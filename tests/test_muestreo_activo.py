@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import numpy as np
+from pyDOE2 import lhs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import muestreo_activo as ma
+import parametros as pm
+import sintetico
+
+
+def _error(models, X_test, Y_test):
+    mean, spread = ma.predict_ensemble(models, X_test)
+    return np.sqrt(np.mean((mean - Y_test)**2)) / np.std(Y_test)
+
+
+def test_select_batch_distinct():
+    rng = np.random.default_rng(0)
+    candidates = rng.random((200, 6))
+    score = rng.random(200)
+    chosen = ma.select_batch(candidates, score, 10, length=0.3)
+    assert len(chosen) == len(set(chosen.tolist())) == 10
+    assert chosen.min() >= 0 and chosen.max() < len(candidates)
+    assert chosen[0] == np.argmax(score)
+
+    # Mas lotes que candidatos: cada candidato una sola vez
+    chosen = ma.select_batch(candidates[:5], score[:5], 10, length=0.3)
+    assert sorted(chosen.tolist()) == [0, 1, 2, 3, 4]
+
+
+def test_active_sampling_beats_lhs():
+    n_variables = len(pm.parameter_space()[0])
+    X_test = lhs(n_variables, samples=300, random_state=123)
+    Y_test = sintetico.synthetic_field(pm.scale_samples(X_test))
+
+    configurations, fields = ma.active_sampling(sintetico.synthetic_field, n_initial=15,
+                                                batch_size=10, n_rounds=3,
+                                                n_candidates=500, seed=0)
+    assert len(configurations) == len(fields) == 45
+    active = _error(ma.fit_ensemble(pm.unit_samples(configurations), fields, seed=0),
+                    X_test, Y_test)
+
+    # Mismo numero de llamadas al solver con LHS uniforme
+    X = lhs(n_variables, samples=len(configurations), random_state=0)
+    uniform = _error(ma.fit_ensemble(X, sintetico.synthetic_field(pm.scale_samples(X)),
+                                     seed=0), X_test, Y_test)
+    assert active <= uniform, (active, uniform)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import test1 as t1
+from bench_normalizador import legacy_resample, synthetic_txt
+
+
+def _assert_same(M):
+    XN0, YN0, PP0 = legacy_resample(M)
+    XN1, YN1, PP1, py = t1.resample_sections(M)
+    assert np.allclose(XN0, XN1, atol=1e-12)
+    assert np.allclose(YN0, YN1, atol=1e-12)
+    assert np.allclose(PP0, PP1, atol=1e-12)
+
+
+def test_resample_matches_legacy():
+    for number_cut, chordwise_panels in [(20, 20), (20, 40), (50, 100)]:
+        _assert_same(synthetic_txt(number_cut, chordwise_panels))
+
+
+def test_resample_matches_legacy_irregular():
+    # Secciones de distinto numero de puntos y puntos con X repetida, que
+    # el bucle original descarta
+    M = synthetic_txt(6, 12)
+    sections = np.split(M, 6)
+    sections[1] = sections[1][::3]
+    sections[2] = np.insert(sections[2], 5, sections[2][4], axis=0)
+    sections[4] = sections[4][:9]
+    _assert_same(np.vstack(sections))
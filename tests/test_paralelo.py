@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import paralelo as par
+import parametros as pm
+import sintetico
+
+
+def failing_solver(config_idx, config):
+    # Con spawn el worker importa este modulo: debe estar a nivel de modulo
+    if config_idx == 1:
+        raise RuntimeError("VSPAERO diverged")
+    if config_idx == 2:
+        return None
+    return sintetico.stub_solver(config_idx, config)
+
+
+def _configurations(n):
+    return pm.scale_samples(np.random.default_rng(0).random((n, 6)))
+
+
+def test_run_campaign_stub_solver(tmp_path):
+    configurations = _configurations(4)
+    results = par.run_campaign(configurations, output_dir=str(tmp_path), n_workers=2,
+                               solver=sintetico.stub_solver)
+
+    assert [r["idx"] for r in results] == [0, 1, 2, 3]
+    for r in results:
+        assert r["error"] is None
+        assert r["path"] == os.path.join(str(tmp_path), f"{r['idx']}.slc")
+        assert os.path.getsize(r["path"]) > 0
+    assert not os.path.exists(tmp_path / ".scratch")
+
+
+def test_failing_solver_keeps_pool(tmp_path):
+    configurations = _configurations(4)
+    results = par.run_campaign(configurations, output_dir=str(tmp_path), n_workers=2,
+                               solver=failing_solver)
+
+    errors = {r["idx"]: r["error"] for r in results}
+    assert errors[0] is None and errors[3] is None
+    assert errors[1] == "RuntimeError: VSPAERO diverged"
+    assert errors[2].startswith("FileNotFoundError: 2.slc not generated")
+    assert sorted(os.listdir(tmp_path)) == ["0.slc", "3.slc"]
+
+
+def test_no_pending_no_scratch(tmp_path):
+    results = par.run_campaign(_configurations(2), output_dir=str(tmp_path), n_workers=2,
+                               solver=sintetico.stub_solver, indices=[])
+    assert results == []
+    assert os.listdir(tmp_path) == []
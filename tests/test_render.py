@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import test1 as t1
+import sintetico
+
+CONFIGS = np.array([
+    [10.0, 8.0, 2.0, 15.0, 2.0, 2.0, 50.0, 1.204],
+    [14.0, 12.0, 1.5, 30.0, 0.0, 4.0, 80.0, 1.112],
+    [8.0, 5.0, 3.0, 5.0, -2.0, 1.0, 35.0, 1.225],
+])
+
+
+def _columns(config):
+    """
+    Columnas de {idx}.txt (Y creciente, X decreciente) de un ala sintetica
+    """
+    ycuts, sections = sintetico.synthetic_sections(config)
+    rows = [np.column_stack((x[::-1], np.full(len(x), y), dcp[::-1]))
+            for y, (x, z, dcp) in zip(ycuts, sections)]
+    return np.round(np.vstack(rows), 4)
+
+
+def test_raster_matches_matplotlib(tmp_path):
+    grids = [t1.resample_sections(_columns(config)) for config in CONFIGS]
+    # Rango global comun, como en la campaña
+    dcp_min = min(float(PP.min()) for XN, YN, PP, py in grids)
+    dcp_max = max(float(PP.max()) for XN, YN, PP, py in grids)
+
+    for idx, (XN, YN, PP, py) in enumerate(grids):
+        png_mpl = str(tmp_path / f"{idx}_mpl.png")
+        png_raster = str(tmp_path / f"{idx}_raster.png")
+        t1.render_grid(png_mpl, XN, YN, PP, dcp_min, dcp_max, renderer='matplotlib')
+        t1.render_grid(png_raster, XN, YN, PP, dcp_min, dcp_max, renderer='raster')
+
+        A = cv2.imread(png_mpl, cv2.IMREAD_GRAYSCALE).astype(int)
+        B = cv2.imread(png_raster, cv2.IMREAD_GRAYSCALE).astype(int)
+        assert A.shape == B.shape
+        d = np.abs(A - B)
+
+        # Solo cambian pixeles sueltos en los bordes de banda, y a lo sumo
+        # a la banda vecina
+        lev = t1._contour_levels(float(PP.min()), float(PP.max()))
+        band = (lev[1] - lev[0]) / (dcp_max - dcp_min) * 256
+        assert d.mean() < 1, (idx, d.mean())
+        assert d.max() <= np.ceil(band), (idx, d.max(), band)
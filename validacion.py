@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import numpy as np
+import cv2
+import img_to_txt as it
+import denormalizer as dn
+import comparador as cm
+
+
+def validate_config(image, original, config, dcp_min, dcp_max,
+                    num_sections=20, points_per_section=20):
+    """
+    Ida y vuelta de una configuracion: reconstruye el campo desde su imagen
+    (como img_to_txt.reconstruct_original_format_corrected), lo denormaliza
+    con su geometria y lo compara con los puntos del {idx}.txt original
+
+    Parameters:
+    - image: imagen normalizada 0-1 [H, W] (fila 0 = punta), de una PNG
+      con img_to_txt.normalized_gray
+    - original: matriz X Y dCp del {idx}.txt
+    - config: fila de la tabla de configuraciones
+    - dcp_min, dcp_max: rango global con el que se genero la imagen
+
+    Returns:
+        dict: metricas de comparador.field_errors
+    """
+    normalized = it.section_arrays(image, dcp_min, dcp_max, num_sections, points_per_section)
+    reconstructed = dn.denormalize_arrays(normalized, config)
+    return cm.field_errors(original, reconstructed)
+
+
+def _validate_task(task):
+    idx, png_path, txt_path, config, dcp_min, dcp_max = task
+    inicio = time.perf_counter()
+    try:
+        img = cv2.imread(png_path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise ValueError(f"No se pudo cargar la imagen: {png_path}")
+        metrics = validate_config(it.normalized_gray(img), np.loadtxt(txt_path, ndmin=2), config,
+                                  dcp_min, dcp_max)
+    except Exception as exc:
+        return idx, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - inicio
+    return idx, metrics, None, time.perf_counter() - inicio
+
+
+def iter_validation(tasks, n_workers=None):
+    """
+    Valida en paralelo las tareas (idx, png, txt, config, dcp_min, dcp_max),
+    en el orden dado
+
+    Yields:
+        tuple: (idx, metricas o None, error o None, duracion)
+    """
+    tasks = list(tasks)
+    if n_workers == 1 or len(tasks) < 2:
+        for task in tasks:
+            yield _validate_task(task)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(tasks) // (4 * (n_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        yield from pool.map(_validate_task, tasks, chunksize=chunksize)
+
+
+def write_report(rows, report_path='validation_report.csv', top=10):
+    """
+    Ordena las configuraciones de peor a mejor RMSE, guarda la tabla en CSV
+    e imprime las 'top' peores
+
+    Parameters:
+    - rows: dicts con idx, rmse, max_abs, mean_abs, worst_section_y y
+      worst_section_rmse
+
+    Returns:
+        pd.DataFrame: el informe ordenado, indexado por idx
+    """
+    import pandas as pd
+
+    columns = ["idx", "rmse", "max_abs", "mean_abs", "n_compared",
+               "worst_section_y", "worst_section_rmse"]
+    report = pd.DataFrame(rows, columns=columns).set_index("idx")
+    report = report.sort_values("rmse", ascending=False)
+    report.to_csv(report_path)
+
+    print("\n" + "="*50)
+    print(f"Validation: {len(report)} configurations | RMSE median "
+          f"{report['rmse'].median():.4f} | worst {report['rmse'].max():.4f}")
+    print("="*50)
+    print(report.head(top).to_string(float_format=lambda v: f"{v:.4f}"))
+    print(f"Report saved to: {report_path}")
+    return report
+
+
+def summary_row(metrics):
+    """
+    Metricas escalares de una configuracion para el informe (y el
+    manifiesto): globales y de su peor seccion
+    """
+    worst = int(np.nanargmax(metrics["section_rmse"])) if len(metrics["section_rmse"]) else None
+    return {
+        "rmse": metrics["rmse"],
+        "max_abs": metrics["max_abs"],
+        "mean_abs": metrics["mean_abs"],
+        "n_compared": metrics["n_compared"],
+        "worst_section_y": float(metrics["section_y"][worst]) if worst is not None else np.nan,
+        "worst_section_rmse": float(metrics["section_rmse"][worst]) if worst is not None else np.nan,
+    }
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    import campana
+    from manifiesto import RunManifest
+
+    # Valida la campaña del directorio actual con el rango guardado en su
+    # manifiesto (el mismo con el que se renderizo cada imagen)
+    configurations = np.load('wing_configurations.npy')
+    manifest = RunManifest('campaign_manifest.jsonl')
+    campana.stage_validate(configurations, manifest)
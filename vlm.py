@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import numpy as np
+from sintetico import wing_planform, write_slc
+
+SPEED_OF_SOUND = 343.0  # m/s a nivel del mar
+
+
+def camber_line(xi, airfoil):
+    """
+    Linea media NACA de 4 cifras (Camber, CamberLoc como en CPWING.AIRFOIL)
+
+    Returns:
+        tuple: (z/c, dz/dx) en las posiciones xi de la cuerda
+    """
+    m = airfoil.get("Camber", 0.0)
+    p = airfoil.get("CamberLoc", 0.4)
+    xi = np.asarray(xi, dtype=float)
+    if m == 0.0:
+        return np.zeros_like(xi), np.zeros_like(xi)
+    front = xi < p
+    z = np.where(front, m / p**2 * (2 * p * xi - xi**2),
+                 m / (1 - p)**2 * (1 - 2 * p + 2 * p * xi - xi**2))
+    slope = np.where(front, 2 * m / p**2 * (p - xi), 2 * m / (1 - p)**2 * (p - xi))
+    return z, slope
+
+
+def _wing_w(px, py, nx, ny):
+    """
+    Velocidad vertical (plano z=0) en los puntos de control de las
+    herraduras de circulacion unidad cuyos segmentos ligados unen nodos
+    consecutivos en envergadura
+
+    Parameters:
+    - px, py: puntos de control [B, P]
+    - nx: X de los nodos de la linea ligada [B, cuerda, estaciones]
+    - ny: Y de los nodos [B, 1, estaciones] (igual en toda la cuerda); la
+      herradura (i, j) va del nodo (i, j) al (i, j + 1) y sus patas salen
+      hacia +x
+
+    Returns:
+        np.ndarray: influencias [B, P, cuerda * (estaciones - 1)]
+    """
+    B = px.shape[0]
+    dx = px[:, :, None, None] - nx[:, None]
+    dy = py[:, :, None, None] - ny[:, None]
+    r = np.sqrt(dx**2 + dy**2)
+    ux, uy = dx / r, dy / r
+
+    # Los puntos de control nunca caen sobre una pata (estaciones medias
+    # frente a nodos) ni sobre la recta de un segmento ligado (fracciones
+    # de cuerda 3/4 frente a 1/4), asi que no hay divisiones por cero.
+    # Patas semi-infinitas: se calculan una vez por nodo; la de B de una
+    # herradura y la de A de la siguiente son el mismo torbellino
+    leg = (1.0 + ux) / (4 * np.pi * dy)
+
+    # Segmento ligado A -> B con r1 = P - A, r2 = P - B
+    cross = dx[..., :-1] * dy[..., 1:] - dy[..., :-1] * dx[..., 1:]
+    dot = ((dx[..., :-1] - dx[..., 1:]) * (ux[..., :-1] - ux[..., 1:])
+           + (dy[..., :-1] - dy[..., 1:]) * (uy[..., :-1] - uy[..., 1:]))
+    bound = dot / (4 * np.pi * cross)
+
+    w = bound + leg[..., 1:] - leg[..., :-1]
+    return w.reshape(B, px.shape[1], -1)
+
+
+def _lattice(chordwise_panels, spanwise_panels):
+    """
+    Rejilla normalizada comun a todas las configuraciones: fracciones de
+    cuerda de los paneles y estaciones en semi-envergadura, agrupadas
+    (coseno) hacia la punta como el OutCluster de CPWING
+    """
+    xi = np.arange(chordwise_panels) / chordwise_panels
+    dxi = 1.0 / chordwise_panels
+    eta = np.sin(0.5 * np.pi * np.linspace(0.0, 1.0, spanwise_panels + 1))
+    return xi, dxi, eta
+
+
+def _interp_matrix(nodes, points):
+    """
+    Matriz [len(points), len(nodes)] de interpolacion lineal (np.interp)
+    """
+    points = np.clip(points, nodes[0], nodes[-1])
+    i = np.clip(np.searchsorted(nodes, points, side='right') - 1, 0, len(nodes) - 2)
+    t = (points - nodes[i]) / (nodes[i + 1] - nodes[i])
+    W = np.zeros((len(points), len(nodes)))
+    W[np.arange(len(points)), i] = 1.0 - t
+    W[np.arange(len(points)), i + 1] = t
+    return W
+
+
+def solve_batch(configurations, alpha=2.0, chordwise_panels=20, spanwise_panels=15,
+                number_cut=20, airfoil=None, speed_of_sound=SPEED_OF_SOUND, batch_size=4):
+    """
+    Red de torbellinos (herradura) sobre la planta trapezoidal de cada
+    configuracion, resuelta en bloque para varias configuraciones.
+
+    Superficie media plana con la pendiente de la linea media como
+    condicion de contorno, simetria respecto a la raiz (ala imagen) y
+    compresibilidad por Prandtl-Glauert: se resuelve el ala estirada 1/beta
+    en X y se conserva su circulacion. El dCp de cada panel es
+    -2 * Gamma / (V * dx) (negativo para sustentacion positiva, como el
+    .slc de VSPAERO) y se interpola a los number_cut cortes del CpSlicer.
+
+    La matriz de influencia solo depende de la geometria y del Mach: las
+    filas que solo cambian el angulo de ataque (parametros.condition_table)
+    comparten matriz y se resuelven como varios terminos independientes.
+
+    Parameters:
+    - configurations: filas de wing_configurations.npy [N, C]; si tienen
+      una columna 8 es el angulo de ataque de cada fila
+    - alpha: angulo de ataque [grados] de las filas sin columna de alpha
+    - chordwise_panels, spanwise_panels: paneles en cuerda y semi-envergadura
+    - number_cut: cortes entre la raiz y la punta
+    - airfoil: dict con Camber y CamberLoc (None = placa plana)
+    - batch_size: matrices de influencia (geometria y Mach) resueltas a la vez
+
+    Returns:
+        list: por configuracion (ycuts, sections) como en
+        sintetico.synthetic_sections, listos para write_slc
+    """
+    configurations = np.atleast_2d(np.asarray(configurations, dtype=float))
+    airfoil = airfoil or {}
+    xi, dxi, eta = _lattice(chordwise_panels, spanwise_panels)
+    eta_mid = 0.5 * (eta[:-1] + eta[1:])
+    eta_cut = np.linspace(0.0, 1.0, number_cut)
+    W_cut = _interp_matrix(eta_mid, eta_cut)
+
+    xi_center = xi + 0.5 * dxi
+    z_center, _ = camber_line(xi_center, airfoil)
+    _, slope = camber_line(xi + 0.75 * dxi, airfoil)
+    n_panels = chordwise_panels * spanwise_panels
+    alphas = np.radians(configurations[:, 8] if configurations.shape[1] > 8
+                        else np.full(len(configurations), alpha))
+    # Terminos independientes [N, paneles], paneles ordenados [cuerda, envergadura]
+    rhs = -np.repeat(np.sin(alphas)[:, None] - slope * np.cos(alphas)[:, None],
+                     spanwise_panels, axis=1)
+
+    # Un problema por geometria (area, AR, taper, flecha) y Mach
+    problems, inverse = np.unique(configurations[:, [0, 1, 2, 3, 6]], axis=0,
+                                  return_inverse=True)
+    inverse = inverse.ravel()
+    gamma = np.empty((len(configurations), n_panels))
+
+    for start in range(0, len(problems), batch_size):
+        block = problems[start:start + batch_size]
+        planform = np.array([wing_planform(problem) for problem in block])
+        semi_span = planform[:, 0:1, None] / 2
+        root_chord = planform[:, 1:2, None]
+        tip_chord = planform[:, 2:3, None]
+        tan_sweep = np.tan(np.radians(planform[:, 3:4, None]))
+        beta = np.sqrt(1.0 - (block[:, 4] / speed_of_sound)**2)[:, None, None]
+
+        def x_at(e, f):
+            # X estirada 1/beta de la fraccion de cuerda f en la estacion e
+            chord = root_chord + (tip_chord - root_chord) * e
+            return (e * semi_span * tan_sweep + chord * f) / beta
+
+        f_bound = (xi + 0.25 * dxi)[None, :, None]
+        f_control = (xi + 0.75 * dxi)[None, :, None]
+        em = eta_mid[None, None, :]
+
+        # Nodos de las lineas ligadas [B, cuerda, estaciones] y puntos de
+        # control [B, cuerda * envergadura]
+        nx = x_at(eta[None, None, :], f_bound)
+        ny = eta[None, None, :] * semi_span
+        shape = (len(block), n_panels)
+        px = x_at(em, f_control).reshape(shape)
+        py = np.broadcast_to(em * semi_span, (len(block), 1, spanwise_panels))
+        py = np.broadcast_to(py, (len(block), chordwise_panels, spanwise_panels)).reshape(shape)
+
+        # Ala real y ala imagen (y < 0): la herradura reflejada va de B' a A',
+        # que con los nodos reflejados y en orden inverso es otra vez j -> j + 1
+        A = _wing_w(px, py, nx, ny)
+        A += _wing_w(px, py, nx[..., ::-1], -ny[..., ::-1]).reshape(
+            shape + (chordwise_panels, spanwise_panels))[..., ::-1].reshape(shape + (-1,))
+
+        # Las filas de cada problema como columnas de un mismo termino
+        # independiente (rellenado con ceros hasta el problema con mas filas)
+        rows = [np.flatnonzero(inverse == start + u) for u in range(len(block))]
+        B = np.zeros((len(block), n_panels, max(len(r) for r in rows)))
+        for u, r in enumerate(rows):
+            B[u, :, :len(r)] = rhs[r].T
+        solution = np.linalg.solve(A, B)
+        for u, r in enumerate(rows):
+            gamma[r] = solution[u, :, :len(r)].T
+
+    results = []
+    for config, g in zip(configurations, gamma):
+        span, root_chord, tip_chord, sweep_angle = wing_planform(config)
+        ycuts = eta_cut * span / 2
+        chords = root_chord + (tip_chord - root_chord) * eta_cut
+        # dx fisico de cada panel en la estacion media
+        dx = (root_chord + (tip_chord - root_chord) * eta_mid) * dxi
+        dcp = -2.0 * g.reshape(chordwise_panels, spanwise_panels) / dx
+        dcp_cut = dcp @ W_cut.T                    # [cuerda, cortes]
+
+        sections = []
+        for k, y_cut in enumerate(ycuts):
+            x = y_cut * np.tan(np.radians(sweep_angle)) + chords[k] * xi_center
+            sections.append((x, z_center * chords[k], dcp_cut[:, k]))
+        results.append((ycuts, sections))
+    return results
+
+
+def vlm_solver(config_idx, config, **kwargs):
+    """
+    Sustituto de OpenVSP con la firma de los solvers de paralelo: escribe
+    {config_idx}.slc en el directorio actual
+
+    Parameters:
+    - kwargs: argumentos de solve_batch (CPWING.vlm_inputs para las mismas
+      entradas que VSPAERO)
+
+    Returns:
+        str: ruta del .slc
+    """
+    (ycuts, sections), = solve_batch(np.asarray(config)[None, :], **kwargs)
+    return write_slc(f"{config_idx}.slc", ycuts, sections)
+
+
+def iter_campaign(configurations, output_dir='.', indices=None, batch_size=4, **kwargs):
+    """
+    Igual que paralelo.iter_campaign pero en el propio proceso y por bloques
+    de batch_size configuraciones: sin pool ni OpenVSP
+
+    Parameters:
+    - kwargs: argumentos de solve_batch (CPWING.vlm_inputs para las mismas
+      entradas que VSPAERO)
+
+    Yields:
+        dict: {"idx", "path", "duration", "error"} por configuracion
+    """
+    if indices is None:
+        indices = range(len(configurations))
+    indices = [int(idx) for idx in indices]
+    os.makedirs(output_dir, exist_ok=True)
+
+    for start in range(0, len(indices), batch_size):
+        block = indices[start:start + batch_size]
+        inicio = time.perf_counter()
+        try:
+            solved = solve_batch(configurations[block], batch_size=batch_size, **kwargs)
+            error = None
+        except Exception as exc:
+            solved = [None] * len(block)
+            error = f"{type(exc).__name__}: {exc}"
+        duration = (time.perf_counter() - inicio) / len(block)
+
+        for idx, result in zip(block, solved):
+            path = os.path.join(output_dir, f"{idx}.slc")
+            if result is not None:
+                # Escritura atomica, como paralelo._solve_one
+                write_slc(f"{path}.tmp", *result)
+                os.replace(f"{path}.tmp", path)
+            yield {"idx": idx, "path": path if error is None else None,
+                   "duration": duration, "error": error}
+
+
+# Ejemplo de uso:
+if __name__ == "__main__":
+    from CPWING import vlm_inputs
+
+    # Resuelve wing_configurations.npy sin OpenVSP, con las entradas de
+    # CPWING, y deja los {idx}.slc en el directorio actual
+    configurations = np.load('wing_configurations.npy')
+    inicio = time.perf_counter()
+    for result in iter_campaign(configurations, **vlm_inputs()):
+        if result["error"] is not None:
+            print(f"❌ Error in configuration {result['idx']}: {result['error']}")
+    print(f"{len(configurations)} configurations solved in "
+          f"{time.perf_counter() - inicio:.2f} s")